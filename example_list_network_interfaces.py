@@ -30,7 +30,6 @@ Options:
 """
 
 from __future__ import print_function
-import ctypes
 import logging
 import signal
 import socket
@@ -39,12 +38,11 @@ import sys
 from docopt import docopt
 from libnl.error import errmsg
 from libnl.handlers import NL_CB_CUSTOM, NL_CB_VALID, NL_OK
-from libnl.linux_private.if_link import IFLA_IFNAME, IFLA_RTA
-from libnl.linux_private.netlink import NETLINK_ROUTE, NLMSG_LENGTH, NLM_F_DUMP, NLM_F_REQUEST
-from libnl.linux_private.rtnetlink import RTA_DATA, RTA_NEXT, RTA_OK, RTM_GETLINK, ifinfomsg, rtgenmsg
-from libnl.misc import get_string
-from libnl.msg import nlmsg_data, nlmsg_hdr
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_DUMP, NLM_F_REQUEST
+from libnl.linux_private.rtnetlink import RTM_GETLINK, ifinfomsg, rtgenmsg
+from libnl.msg import nlmsg_attrdata, nlmsg_attrlen, nlmsg_data, nlmsg_hdr
 from libnl.nl import nl_connect, nl_recvmsgs_default, nl_send_simple
+from libnl.route.link import link_schema
 from libnl.socket_ import nl_socket_alloc, nl_socket_modify_cb
 
 OPTIONS = docopt(__doc__) if __name__ == '__main__' else dict()
@@ -71,16 +69,11 @@ def callback(msg, _):
     # First convert `msg` into something more manageable.
     nlh = nlmsg_hdr(msg)
     iface = ifinfomsg(nlmsg_data(nlh))
-    hdr = IFLA_RTA(iface)
-    remaining = ctypes.c_int(nlh.nlmsg_len - NLMSG_LENGTH(iface.SIZEOF))
-
-    # Now iterate through each rtattr stored in `iface`.
-    while RTA_OK(hdr, remaining):
-        # Each rtattr (which is what hdr is) instance is only one type. Looping through all of them until we run into
-        # the ones we care about.
-        if hdr.rta_type == IFLA_IFNAME:
-            print('Found network interface {0}: {1}'.format(iface.ifi_index, get_string(RTA_DATA(hdr)).decode('ascii')))
-        hdr = RTA_NEXT(hdr, remaining)
+
+    # Now decode the attributes following `iface`. Attributes we don't care about (or the kernel didn't send) are None.
+    link = link_schema.decode(nlmsg_attrdata(nlh, iface.SIZEOF), nlmsg_attrlen(nlh, iface.SIZEOF))
+    if link.ifname is not None:
+        print('Found network interface {0}: {1}'.format(iface.ifi_index, link.ifname.decode('ascii')))
     return NL_OK
 
 
@@ -35,7 +35,6 @@ Options:
 """
 
 from __future__ import print_function
-import ctypes
 import fcntl
 import logging
 import math
@@ -44,11 +43,10 @@ import signal
 import socket
 import struct
 import sys
-import time
 
 from docopt import docopt
-from libnl.attr import nla_parse, nla_put_u32, nla_put, nla_put_nested, nla_parse_nested
-from libnl.error import errmsg
+from libnl.attr import nla_put_u32, nla_view
+from libnl.error import NLError, errmsg
 from libnl.nl80211 import nl80211
 from libnl.genl.ctrl import genl_ctrl_resolve, genl_ctrl_resolve_grp
 from libnl.genl.genl import genl_connect, genlmsg_attrdata, genlmsg_attrlen, genlmsg_put
@@ -58,7 +56,8 @@ from libnl.msg import nlmsg_alloc, nlmsg_data, nlmsg_hdr
 from libnl.nl import nl_send_auto, nl_recvmsgs
 from libnl.nl80211.helpers import parse_bss
 from libnl.nl80211.iw_scan import bss_policy
-from libnl.socket_ import nl_socket_alloc, nl_socket_add_membership, nl_socket_drop_membership
+from libnl.nl80211.scan import nl80211_scan
+from libnl.socket_ import nl_socket_alloc
 import libnl.handlers
 from terminaltables import AsciiTable
 
@@ -85,37 +84,6 @@ def ok(no_exit, func, *args, **kwargs):
     error('{0}() returned {1} ({2})'.format(func.__name__, ret, reason))
 
 
-def error_handler(_, err, arg):
-    """Updates the mutable integer `arg` with the error code."""
-    arg.value = err.error
-    return libnl.handlers.NL_STOP
-
-
-def ack_handler(_, arg):
-    """Updates the mutable integer `arg` with 0 as an acknowledgement."""
-    arg.value = 0
-    return libnl.handlers.NL_STOP
-
-
-def callback_trigger(msg, arg):
-    """Called when the kernel is done scanning. Only signals if it was successful or if it failed. No other data.
-
-    Positional arguments:
-    msg -- nl_msg class instance containing the data sent by the kernel.
-    arg -- mutable integer (ctypes.c_int()) to update with results.
-
-    Returns:
-    An integer, value of NL_SKIP. It tells libnl to stop calling other callbacks for this message and proceed with
-    processing the next kernel message.
-    """
-    gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(msg)))
-    if gnlh.cmd == nl80211.NL80211_CMD_SCAN_ABORTED:
-        arg.value = 1  # The scan was aborted for some reason.
-    elif gnlh.cmd == nl80211.NL80211_CMD_NEW_SCAN_RESULTS:
-        arg.value = 0  # The scan completed successfully. `callback_dump` will collect the results later.
-    return libnl.handlers.NL_SKIP
-
-
 def callback_dump(msg, results):
     """This is where SSIDs and their data is decoded from the binary data sent by the kernel.
 
@@ -125,22 +93,21 @@ def callback_dump(msg, results):
     msg -- nl_msg class instance containing the data sent by the kernel.
     results -- dictionary to populate with parsed data.
     """
-    bss = dict()  # To be filled by nla_parse_nested().
-
-    # First we must parse incoming data into manageable chunks and check for errors.
+    # First we must parse incoming data into manageable chunks and check for errors. Attributes are only indexed when
+    # they are looked up, so the other top level attributes are skipped over without being parsed.
     gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(msg)))
-    tb = {i: None for i in range(nl80211.NL80211_ATTR_MAX + 1)}
-    nla_parse(tb, nl80211.NL80211_ATTR_MAX, genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), None)
-    if not tb[nl80211.NL80211_ATTR_BSS]:
+    tb = nla_view(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), nl80211.NL80211_ATTR_MAX)
+    bss = tb.nested(nl80211.NL80211_ATTR_BSS, nl80211.NL80211_BSS_MAX)
+    if bss is None:
         print('WARNING: BSS info missing for an access point.')
         return libnl.handlers.NL_SKIP
-    if nla_parse_nested(bss, nl80211.NL80211_BSS_MAX, tb[nl80211.NL80211_ATTR_BSS], bss_policy):
+    if bss.validate(bss_policy):
         print('WARNING: Failed to parse nested attributes for an access point!')
         return libnl.handlers.NL_SKIP
-    if not bss[nl80211.NL80211_BSS_BSSID]:
+    if nl80211.NL80211_BSS_BSSID not in bss:
         print('WARNING: No BSSID detected for an access point!')
         return libnl.handlers.NL_SKIP
-    if not bss[nl80211.NL80211_BSS_INFORMATION_ELEMENTS]:
+    if nl80211.NL80211_BSS_INFORMATION_ELEMENTS not in bss:
         print('WARNING: No additional information available for an access point!')
         return libnl.handlers.NL_SKIP
 
@@ -150,78 +117,6 @@ def callback_dump(msg, results):
     return libnl.handlers.NL_SKIP
 
 
-def do_scan_trigger(sk, if_index, driver_id, mcid):
-    """Issues a scan request to the kernel and waits for it to reply with a signal.
-
-    This function issues NL80211_CMD_TRIGGER_SCAN which requires root privileges.
-
-    The way NL80211 works is first you issue NL80211_CMD_TRIGGER_SCAN and wait for the kernel to signal that the scan is
-    done. When that signal occurs, data is not yet available. The signal tells us if the scan was aborted or if it was
-    successful (if new scan results are waiting). This function handles that simple signal.
-
-    May exit the program (sys.exit()) if a fatal error occurs.
-
-    Positional arguments:
-    sk -- nl_sock class instance (from nl_socket_alloc()).
-    if_index -- interface index (integer).
-    driver_id -- nl80211 driver ID from genl_ctrl_resolve() (integer).
-    mcid -- nl80211 scanning group ID from genl_ctrl_resolve_grp() (integer).
-
-    Returns:
-    0 on success or a negative error code.
-    """
-    # First get the "scan" membership group ID and join the socket to the group.
-    _LOGGER.debug('Joining group %d.', mcid)
-    ret = nl_socket_add_membership(sk, mcid)  # Listen for results of scan requests (aborted or new results).
-    if ret < 0:
-        return ret
-
-    # Build the message to be sent to the kernel.
-    msg = nlmsg_alloc()
-    genlmsg_put(msg, 0, 0, driver_id, 0, 0, nl80211.NL80211_CMD_TRIGGER_SCAN, 0)  # Setup which command to run.
-    nla_put_u32(msg, nl80211.NL80211_ATTR_IFINDEX, if_index)  # Setup which interface to use.
-    ssids_to_scan = nlmsg_alloc()
-    nla_put(ssids_to_scan, 1, 0, b'')  # Scan all SSIDs.
-    nla_put_nested(msg, nl80211.NL80211_ATTR_SCAN_SSIDS, ssids_to_scan)  # Setup what kind of scan to perform.
-
-    # Setup the callbacks to be used for triggering the scan only.
-    err = ctypes.c_int(1)  # Used as a mutable integer to be updated by the callback function. Signals end of messages.
-    results = ctypes.c_int(-1)  # Signals if the scan was successful (new results) or aborted, or not started.
-    cb = libnl.handlers.nl_cb_alloc(libnl.handlers.NL_CB_DEFAULT)
-    libnl.handlers.nl_cb_set(cb, libnl.handlers.NL_CB_VALID, libnl.handlers.NL_CB_CUSTOM, callback_trigger, results)
-    libnl.handlers.nl_cb_err(cb, libnl.handlers.NL_CB_CUSTOM, error_handler, err)
-    libnl.handlers.nl_cb_set(cb, libnl.handlers.NL_CB_ACK, libnl.handlers.NL_CB_CUSTOM, ack_handler, err)
-    libnl.handlers.nl_cb_set(cb, libnl.handlers.NL_CB_SEQ_CHECK, libnl.handlers.NL_CB_CUSTOM,
-                             lambda *_: libnl.handlers.NL_OK, None)  # Ignore sequence checking.
-
-    # Now we send the message to the kernel, and retrieve the acknowledgement. The kernel takes a few seconds to finish
-    # scanning for access points.
-    _LOGGER.debug('Sending NL80211_CMD_TRIGGER_SCAN...')
-    ret = nl_send_auto(sk, msg)
-    if ret < 0:
-        return ret
-    while err.value > 0:
-        _LOGGER.debug('Retrieving NL80211_CMD_TRIGGER_SCAN acknowledgement...')
-        ret = nl_recvmsgs(sk, cb)
-        if ret < 0:
-            return ret
-    if err.value < 0:
-        error('Unknown error {0} ({1})'.format(err.value, errmsg[abs(err.value)]))
-
-    # Block until the kernel is done scanning or aborted the scan.
-    while results.value < 0:
-        _LOGGER.debug('Retrieving NL80211_CMD_TRIGGER_SCAN final response...')
-        ret = nl_recvmsgs(sk, cb)
-        if ret < 0:
-            return ret
-    if results.value > 0:
-        error('The kernel aborted the scan.')
-
-    # Done, cleaning up.
-    _LOGGER.debug('Leaving group %d.', mcid)
-    return nl_socket_drop_membership(sk, mcid)  # No longer need to receive multicast messages.
-
-
 def do_scan_results(sk, if_index, driver_id, results):
     """Retrieve the results of a successful scan (SSIDs and data about them).
 
@@ -338,25 +233,18 @@ def main():
     _LOGGER.debug('Finding the nl80211 scanning group ID...')
     mcid = ok(0, genl_ctrl_resolve_grp, sk, b'nl80211', b'scan')
 
-    # Scan for access points 1 or more (if requested) times.
-    if not OPTIONS['--no-sudo']:
-        print('Scanning for access points, may take about 8 seconds...')
-    else:
-        print("Attempting to read results of previous scan.")
+    # Scan for access points, or read the results of the previous scan.
     results = dict()
-    for i in range(2, -1, -1):  # Three tries on errors.
-        if not OPTIONS['--no-sudo']:
-            ret = ok(i, do_scan_trigger, sk, if_index, driver_id, mcid)
-            if ret < 0:
-                _LOGGER.warning('do_scan_trigger() returned %d, retrying in 5 seconds.', ret)
-                time.sleep(5)
-                continue
-        ret = ok(i, do_scan_results, sk, if_index, driver_id, results)
-        if ret < 0:
-            _LOGGER.warning('do_scan_results() returned %d, retrying in 5 seconds.', ret)
-            time.sleep(5)
-            continue
-        break
+    if OPTIONS['--no-sudo']:
+        print("Attempting to read results of previous scan.")
+        ok(0, do_scan_results, sk, if_index, driver_id, results)
+    else:
+        print('Scanning for access points, may take about 8 seconds...')
+        try:  # Triggers the scan and waits for the kernel to signal that it is done, then dumps the results.
+            scanned = nl80211_scan(sk, if_index, driver_id, mcid, timeout=30, parser=parse_bss)
+        except NLError as exc:
+            return error('nl80211_scan() failed with {0} ({1})'.format(-exc.error, errmsg[exc.error]))
+        results.update((bss['bssid'], bss) for bss in scanned if 'bssid' in bss and 'information_elements' in bss)
     if not results:
         print('No access points detected.')
         return
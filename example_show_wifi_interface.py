@@ -39,7 +39,7 @@ import sys
 
 from docopt import docopt
 from libnl.nl80211 import nl80211
-from libnl.attr import nla_data, nla_get_string, nla_get_u32, nla_parse, nla_put_u32
+from libnl.attr import nla_put_u32
 from libnl.error import errmsg
 from libnl.genl.ctrl import genl_ctrl_resolve
 from libnl.genl.genl import genl_connect, genlmsg_attrdata, genlmsg_attrlen, genlmsg_put
@@ -48,6 +48,7 @@ from libnl.linux_private.genetlink import genlmsghdr
 from libnl.linux_private.netlink import NLM_F_DUMP
 from libnl.msg import nlmsg_alloc, nlmsg_data, nlmsg_hdr
 from libnl.nl import nl_recvmsgs_default, nl_send_auto
+from libnl.nl80211.schema import nl80211_schema
 from libnl.socket_ import nl_socket_alloc, nl_socket_modify_cb
 from terminaltables import AsciiTable
 
@@ -78,27 +79,25 @@ def callback(msg, has_printed):
     # First convert `msg` into something more manageable.
     gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(msg)))
 
-    # Partially parse the raw binary data and place them in the `tb` dictionary.
-    tb = {i: None for i in range(nl80211.NL80211_ATTR_MAX + 1)}  # Need to populate dict with all possible keys.
-    nla_parse(tb, nl80211.NL80211_ATTR_MAX, genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), None)
+    # Decode the raw binary data into a record, fields of missing attributes are None.
+    attrs = nl80211_schema.decode(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0))
 
     # Now it's time to grab the juicy data!
-    if tb[nl80211.NL80211_ATTR_IFNAME]:
-        table.title = nla_get_string(tb[nl80211.NL80211_ATTR_IFNAME]).decode('ascii')
+    if attrs.ifname is not None:
+        table.title = attrs.ifname.decode('ascii')
     else:
         table.title = 'Unnamed Interface'
 
-    if tb[nl80211.NL80211_ATTR_WIPHY]:
-        wiphy_num = nla_get_u32(tb[nl80211.NL80211_ATTR_WIPHY])
-        wiphy = ('wiphy {0}' if OPTIONS['<interface>'] else 'phy#{0}').format(wiphy_num)
+    if attrs.wiphy is not None:
+        wiphy = ('wiphy {0}' if OPTIONS['<interface>'] else 'phy#{0}').format(attrs.wiphy)
         table.table_data.append(['NL80211_ATTR_WIPHY', wiphy])
 
-    if tb[nl80211.NL80211_ATTR_MAC]:
-        mac_address = ':'.join(format(x, '02x') for x in nla_data(tb[nl80211.NL80211_ATTR_MAC])[:6])
+    if attrs.mac is not None:
+        mac_address = ':'.join(format(x, '02x') for x in bytearray(attrs.mac)[:6])
         table.table_data.append(['NL80211_ATTR_MAC', mac_address])
 
-    if tb[nl80211.NL80211_ATTR_IFINDEX]:
-        table.table_data.append(['NL80211_ATTR_IFINDEX', str(nla_get_u32(tb[nl80211.NL80211_ATTR_IFINDEX]))])
+    if attrs.ifindex is not None:
+        table.table_data.append(['NL80211_ATTR_IFINDEX', str(attrs.ifindex)])
 
     # Print all data.
     if has_printed:
@@ -0,0 +1,180 @@
+"""asyncio integration for Netlink sockets.
+
+Drives an nl_sock from an asyncio event loop instead of blocking in nl_recvmsgs(). The socket is switched to
+non-blocking mode and watched with loop.add_reader(). Whenever it becomes readable the queued datagrams are parsed by
+an nl_mux (see libnl.mux), which reuses nl_recvmsgs_report() and routes the replies to the request they belong to by
+sequence number. Many requests can therefore be in flight on one socket at the same time, and messages that do not
+belong to any request (multicast notifications) are passed on to listeners.
+
+Requires Python 3.4 or newer. No coroutine syntax is used, all awaitables are asyncio.Future instances. Iterating over
+dumps with nl_async.dump() relies on asynchronous iteration (`async for`, StopAsyncIteration) and requires Python 3.5
+or newer.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+import asyncio
+import collections
+import sys
+
+from libnl.errno_ import NLE_BAD_SOCK
+from libnl.error import NLError
+from libnl.msg import nlmsg_get
+from libnl.mux import nl_mux
+
+_ASYNC_ITERATION = sys.version_info >= (3, 5)  # __aiter__/__anext__ protocol and StopAsyncIteration.
+
+
+class nl_dump_aiter(object):
+    """Asynchronous iterator over the replies of a dump, returned by nl_async.dump().
+
+    Use with `async for` (Python 3.5 or newer). Raises NLError if the request fails part way through. Only one
+    __anext__() may be pending at a time, a second one raises RuntimeError. Cancelling a pending __anext__() (e.g. with
+    asyncio.wait_for()) loses no replies, they are returned by the next call.
+    """
+
+    def __init__(self, loop, request):
+        self._loop = loop
+        self._request = request
+        self._queue = collections.deque()
+        self._waiter = None
+        request.on_reply = self._on_reply
+        request.add_done_callback(self._on_done)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if self._waiter is not None and not self._waiter.cancelled():
+            raise RuntimeError('__anext__() is already pending on this iterator')
+        self._waiter = None
+        future = asyncio.Future(loop=self._loop)
+        if self._queue:
+            future.set_result(self._queue.popleft())
+        elif self._request.done:
+            self._finish(future)
+        else:
+            self._waiter = future
+        return future
+
+    def _finish(self, future):
+        if self._request.error:
+            future.set_exception(NLError(self._request.error))
+        else:
+            future.set_exception(StopAsyncIteration())
+
+    def _on_reply(self, msg):
+        nlmsg_get(msg)  # Handed out after the callback returned.
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.cancelled():
+            waiter.set_result(msg)
+        else:
+            self._queue.append(msg)
+
+    def _on_done(self, _):
+        waiter, self._waiter = self._waiter, None
+        if waiter is not None and not waiter.cancelled():
+            self._finish(waiter)
+
+
+class nl_async(object):
+    """Netlink socket driven by an asyncio event loop.
+
+    Positional arguments:
+    sk -- connected Netlink socket (nl_sock class instance). Put into non-blocking mode.
+
+    Keyword arguments:
+    loop -- event loop to use, defaults to asyncio.get_event_loop().
+
+    Instance variables:
+    sk -- the Netlink socket (nl_sock class instance).
+    loop -- the event loop.
+    mux -- routes replies to requests (nl_mux class instance).
+    """
+
+    def __init__(self, sk, loop=None):
+        self.sk = sk
+        self.loop = loop or asyncio.get_event_loop()
+        self.mux = nl_mux(sk)
+        sk.socket_instance.setblocking(False)
+        self.loop.add_reader(sk.socket_instance.fileno(), self._on_readable)
+
+    def close(self):
+        """Stop watching the socket and fail all outstanding requests with NLE_BAD_SOCK. Does not close the socket."""
+        if self.sk.s_fd != -1:
+            self.loop.remove_reader(self.sk.s_fd)
+        self.mux.fail_all(-NLE_BAD_SOCK)
+
+    def add_listener(self, func):
+        """Call `func(msg)` for every valid message that does not belong to a request, e.g. multicast notifications.
+
+        Positional arguments:
+        func -- callable taking a Netlink message (nl_msg class instance).
+        """
+        self.mux.add_listener(func)
+
+    def remove_listener(self, func):
+        """Stop calling `func` for unsolicited messages.
+
+        Positional arguments:
+        func -- callable previously passed to add_listener().
+        """
+        self.mux.remove_listener(func)
+
+    def send_request(self, msg):
+        """Send a request and collect its replies.
+
+        The request is finalized with nl_complete_msg(). It completes on the ACK or NLMSG_DONE, or on the first
+        non-multipart reply if neither is expected (auto-ack disabled).
+
+        Positional arguments:
+        msg -- Netlink message (nl_msg class instance).
+
+        Returns:
+        asyncio.Future resolving to a list of reply messages (nl_msg class instances), or raising NLError.
+        """
+        return self._future(self.mux.send(msg))
+
+    def dump(self, msg):
+        """Send a request and iterate over its replies as they arrive. Requires Python 3.5 or newer.
+
+        Positional arguments:
+        msg -- Netlink message (nl_msg class instance), usually with NLM_F_DUMP set.
+
+        Returns:
+        nl_dump_aiter class instance.
+        """
+        if not _ASYNC_ITERATION:
+            raise NotImplementedError('Asynchronous iteration requires Python 3.5 or newer')
+        return nl_dump_aiter(self.loop, self.mux.send(msg, keep_replies=False))
+
+    def wait_for_ack(self, msg):
+        """Send a request and wait for the kernel to acknowledge it, discarding any replies.
+
+        Positional arguments:
+        msg -- Netlink message (nl_msg class instance).
+
+        Returns:
+        asyncio.Future resolving to None once acknowledged, or raising NLError.
+        """
+        return self._future(self.mux.send(msg, keep_replies=False))
+
+    def _future(self, request):
+        future = asyncio.Future(loop=self.loop)
+
+        def done(_):
+            if future.cancelled():
+                return
+            if request.error:
+                future.set_exception(NLError(request.error))
+            else:
+                future.set_result(request.replies)
+        request.add_done_callback(done)
+        return future
+
+    def _on_readable(self):
+        while self.mux.receive() > 0:
+            pass
@@ -8,13 +8,20 @@ License as published by the Free Software Foundation version 2.1
 of the License.
 """
 
+import array
 import ctypes
 import logging
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from libnl.errno_ import NLE_RANGE, NLE_INVAL, NLE_NOMEM
 from libnl.linux_private.netlink import nlattr, NLA_ALIGN, NLA_TYPE_MASK, NLA_HDRLEN, NLA_F_NESTED, NLMSG_ALIGN
 from libnl.misc import SIZEOF_U8, SIZEOF_U16, SIZEOF_U32, SIZEOF_U64, bytearray_ptr, get_string
-from libnl.msg_ import nlmsg_tail, nlmsg_data, nlmsg_datalen
+from libnl.msg_ import nlmsg_tail, nlmsg_data, nlmsg_datalen, nlmsg_grow
 from libnl.netlink_private.netlink import BUG
 
 _LOGGER = logging.getLogger(__name__)
@@ -28,6 +35,27 @@ NLA_FLAG = 6  # Flag.
 NLA_MSECS = 7  # Micro seconds (64bit).
 NLA_NESTED = 8  # Nested attributes.
 NLA_TYPE_MAX = NLA_NESTED
+_NLA_HDR = struct.Struct('=HH')
+_NLA_GETTERS = dict((s, struct.Struct('=' + f)) for s, f in ((SIZEOF_U8, 'B'), (SIZEOF_U16, 'H'), (SIZEOF_U32, 'I'),
+                                                             (SIZEOF_U64, 'Q')))
+
+
+def _array_typecodes():
+    """Map struct format characters of fixed size integers to array module typecodes with the same item size."""
+    typecodes = dict()
+    for fmt in 'BHIQbhiq':
+        size = struct.calcsize('=' + fmt)
+        for code in ('bhilq' if fmt.islower() else 'BHILQ'):
+            try:
+                if array.array(code).itemsize == size:
+                    typecodes[fmt] = code
+                    break
+            except ValueError:  # 'q' and 'Q' only exist on Python 3.3+.
+                continue
+    return typecodes
+
+
+_ARRAY_TYPECODES = _array_typecodes()
 
 
 def nla_attr_size(payload):
@@ -199,6 +227,91 @@ nla_attr_minlen.update({  # https://github.com/thom311/libnl/blob/libnl3_2_25/li
 })
 
 
+class nla_policy_compiled(dict):
+    """Attribute validation policy compiled by nla_policy_compile().
+
+    Still a dictionary of nla_policy class instances with nla types as keys, so it can be used anywhere a policy is
+    expected. The constraints are additionally stored in flat lists indexed by attribute type. Changes made to the
+    dictionary after compiling are not picked up.
+
+    Instance variables:
+    minlen -- minimal payload length of each attribute type (list of integers).
+    maxlen -- maximal payload length of each attribute type, 0 if unlimited (list of integers).
+    string -- True for each attribute type that must be NUL terminated (list of booleans).
+    checked -- attribute types with any constraint, in ascending order (tuple of integers).
+    """
+
+    def __init__(self, policy=None):
+        super(nla_policy_compiled, self).__init__(policy or dict())
+        self.minlen = list()
+        self.maxlen = list()
+        self.string = list()
+        self.checked = tuple()
+
+
+def nla_policy_compile(policy):
+    """Compile an attribute validation policy for nla_index.parse() and nla_validate_index().
+
+    Resolves the minimal length of each attribute type from its nla_policy and nla_attr_minlen once, instead of for
+    every attribute of every message parsed. Policies that are already compiled are returned as they are.
+
+    Positional arguments:
+    policy -- dictionary of nla_policy class instances as values, with nla types as keys.
+
+    Returns:
+    nla_policy_compiled class instance.
+    """
+    if isinstance(policy, nla_policy_compiled):
+        return policy
+    compiled = nla_policy_compiled(policy)
+    size = max(policy) + 1 if policy else 0
+    minlen, maxlen, string = [0] * size, [0] * size, [False] * size
+    for type_, pt in policy.items():
+        if not pt:
+            continue
+        if pt.type_ > NLA_TYPE_MAX:
+            raise BUG
+        if pt.minlen:
+            minlen[type_] = pt.minlen
+        elif pt.type_ != NLA_UNSPEC:
+            minlen[type_] = nla_attr_minlen[pt.type_]
+        maxlen[type_] = pt.maxlen
+        string[type_] = pt.type_ == NLA_STRING
+    compiled.minlen, compiled.maxlen, compiled.string = minlen, maxlen, string
+    compiled.checked = tuple(t for t in range(size) if minlen[t] or maxlen[t] or string[t])
+    return compiled
+
+
+def nla_validate_index(index, policy):
+    """Validate the attributes stored in an attribute index in one pass.
+
+    Only attribute types the policy constrains are looked at, and only the attribute the index kept for each type. To
+    check every attribute of a stream, including those replaced by a later one of the same type, pass the policy to
+    nla_index.parse() instead.
+
+    Positional arguments:
+    index -- attribute index (nla_index class instance).
+    policy -- compiled attribute validation policy (nla_policy_compiled class instance).
+
+    Returns:
+    0 on success or a negative error code.
+    """
+    attrs, buf = index.attrs, index.buf
+    minlen, maxlen, string = policy.minlen, policy.maxlen, policy.string
+    for type_ in policy.checked:
+        if type_ >= len(attrs):
+            break
+        attr = attrs[type_]
+        if attr is None:
+            continue
+        offset, length = attr
+        if length < minlen[type_] or (maxlen[type_] and length > maxlen[type_]):
+            return -NLE_RANGE
+        if string[type_] and buf[offset + length - 1] != 0:
+            return -NLE_INVAL
+    return 0
+
+
 def validate_nla(nla, maxtype, policy):
     """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L188
 
@@ -238,6 +351,397 @@ def validate_nla(nla, maxtype, policy):
     return 0
 
 
+class nla_index(object):
+    """Attribute index built with a single pass over a stream of attributes.
+
+    Instead of creating an nlattr instance per attribute, parse() reads the headers with struct.unpack_from() and stores
+    the payload offset and length of each attribute in a list indexed by attribute type. The typed getters read payloads
+    straight from the buffer. nla() wraps an attribute in an nlattr instance only when one is needed.
+
+    Attributes with a type greater than `maxtype` are ignored. If a type is found multiple times the last one wins, like
+    in nla_parse(). Given a compiled policy, parse() checks every attribute against it while walking the stream, also
+    those later replaced by another attribute of the same type, and stops at the first one that fails.
+
+    Positional arguments:
+    maxtype -- maximum attribute type expected and accepted, or None to accept all types (integer or None).
+
+    Instance variables:
+    maxtype -- maximum attribute type (integer or None).
+    buf -- bytearray the attributes are stored in.
+    attrs -- (payload offset, payload length) tuple or None, indexed by attribute type (list).
+    rem -- bytes left over after the last attribute (integer).
+    err -- 0, or the negative error code of the attribute that failed the policy (integer).
+    """
+
+    __slots__ = ('maxtype', 'buf', 'attrs', 'rem', 'err', '_stop')
+
+    def __init__(self, maxtype):
+        self.maxtype = maxtype
+        self.buf = bytearray()
+        self.attrs = [None] * (0 if maxtype is None else maxtype + 1)
+        self.rem = 0
+        self.err = 0
+        self._stop = None
+
+    def __contains__(self, type_):
+        return 0 <= type_ < len(self.attrs) and self.attrs[type_] is not None
+
+    def __iter__(self):
+        """Yield the types of all attributes present, in ascending order."""
+        return (t for t, a in enumerate(self.attrs) if a is not None)
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} maxtype={2} types={3}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.maxtype, list(self),
+        )
+        return answer
+
+    def parse(self, head, len_, policy=None):
+        """Index a stream of attributes, replacing the previous contents of the index.
+
+        Positional arguments:
+        head -- first nlattr with more in its bytearray payload (nlattr class instance).
+        len_ -- length of attribute stream (integer).
+
+        Keyword arguments:
+        policy -- compiled attribute validation policy (nla_policy_compiled class instance or None).
+
+        Returns:
+        This nla_index class instance.
+        """
+        buf = head.bytearray
+        if isinstance(buf, bytearray_ptr):
+            return self.parse_buffer(buf.pointee, buf.slice.start, len_, buf.slice.stop, policy)
+        return self.parse_buffer(buf, 0, len_, policy=policy)
+
+    def parse_buffer(self, buf, offset, len_, stop=None, policy=None):
+        """Index a stream of attributes stored at `offset` in `buf`, replacing the previous contents of the index.
+
+        If `policy` is given every attribute is validated as it is indexed. Indexing stops at the first attribute that
+        fails, and its error code is stored in `err`.
+
+        Positional arguments:
+        buf -- bytearray holding the attributes.
+        offset -- position of the first attribute in `buf` (integer).
+        len_ -- length of attribute stream (integer).
+
+        Keyword arguments:
+        stop -- end of the region nlattr instances returned by nla() may reference (integer or None).
+        policy -- compiled attribute validation policy (nla_policy_compiled class instance or None).
+
+        Returns:
+        This nla_index class instance.
+        """
+        self._stop = stop
+        self.err = 0
+        pos = offset
+        grow = self.maxtype is None
+        attrs = [None] * (0 if grow else self.maxtype + 1)
+        maxtype = NLA_TYPE_MASK & 0xffff if grow else self.maxtype
+        rem = min(len_, len(buf) - pos)
+        unpack_from = _NLA_HDR.unpack_from
+        if policy is None:
+            minlen, maxlen, string = (), (), ()
+        else:
+            minlen, maxlen, string = policy.minlen, policy.maxlen, policy.string
+        checked = len(minlen)
+        while rem >= NLA_HDRLEN:
+            length, type_ = unpack_from(buf, pos)
+            if length < NLA_HDRLEN or length > rem:
+                break
+            type_ &= NLA_TYPE_MASK
+            if type_ <= maxtype:
+                if type_ < checked:
+                    payload = length - NLA_HDRLEN
+                    if payload < minlen[type_] or (maxlen[type_] and payload > maxlen[type_]):
+                        self.err = -NLE_RANGE
+                    elif string[type_] and buf[pos + length - 1] != 0:
+                        self.err = -NLE_INVAL
+                    if self.err:
+                        break
+                if grow and type_ >= len(attrs):
+                    attrs.extend([None] * (type_ + 1 - len(attrs)))
+                if attrs[type_] is not None:
+                    _LOGGER.debug('Attribute of type %d found multiple times in message, previous attribute is being '
+                                  'ignored.', type_)
+                attrs[type_] = (pos + NLA_HDRLEN, length - NLA_HDRLEN)
+            totlen = NLA_ALIGN(length)
+            pos += totlen
+            rem -= totlen
+        self.buf = buf
+        self.attrs = attrs
+        self.rem = rem
+        return self
+
+    def nla(self, type_):
+        """Return the attribute of a type as an nlattr class instance, or None if it is missing."""
+        if type_ not in self:
+            return None
+        return nlattr(bytearray_ptr(self.buf, self.attrs[type_][0] - NLA_HDRLEN, self._stop))
+
+    def len(self, type_):
+        """Return the payload length of an attribute, or None if it is missing."""
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        return None if attr is None else attr[1]
+
+    def data(self, type_, default=None):
+        """Return a copy of the payload of an attribute (bytes), or `default` if it is missing."""
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        if attr is None:
+            return default
+        return bytes(self.buf[attr[0]:attr[0] + attr[1]])
+
+    def _get(self, type_, size, default):
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        if attr is None:
+            return default
+        return _NLA_GETTERS[size].unpack_from(self.buf, attr[0])[0]
+
+    def u8(self, type_, default=None):
+        """Return the payload of an 8 bit integer attribute, or `default` if it is missing."""
+        return self._get(type_, SIZEOF_U8, default)
+
+    def u16(self, type_, default=None):
+        """Return the payload of a 16 bit integer attribute, or `default` if it is missing."""
+        return self._get(type_, SIZEOF_U16, default)
+
+    def u32(self, type_, default=None):
+        """Return the payload of a 32 bit integer attribute, or `default` if it is missing."""
+        return self._get(type_, SIZEOF_U32, default)
+
+    def u64(self, type_, default=None):
+        """Return the payload of a 64 bit integer attribute, or `default` if it is missing."""
+        return self._get(type_, SIZEOF_U64, default)
+
+    def string(self, type_, default=None):
+        """Return the payload of a string attribute up to the first null byte (bytes), or `default` if it is missing."""
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        if attr is None:
+            return default
+        end = self.buf.find(b'\0', attr[0], attr[0] + attr[1])
+        return bytes(self.buf[attr[0]:attr[0] + attr[1] if end < 0 else end])
+
+    def flag(self, type_):
+        """Return True if a flag attribute is present, False otherwise."""
+        return type_ in self
+
+    def array(self, type_, fmt='B', default=None):
+        """Return the payload of a packed integer array attribute as an array.array, or `default` if it is missing."""
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        if attr is None:
+            return default
+        return _nla_array(self.buf, attr[0], attr[1], fmt)
+
+    def ndarray(self, type_, fmt='B', default=None):
+        """Return the payload of a packed integer array attribute as a NumPy array, or `default` if it is missing.
+
+        The array shares memory with the message, see nla_get_ndarray() for how long it stays valid.
+        """
+        attr = self.attrs[type_] if 0 <= type_ < len(self.attrs) else None
+        if attr is None:
+            return default
+        return _nla_ndarray(self.buf, attr[0], attr[1], fmt)
+
+
+class nla_view(object):
+    """Lazy view of a stream of attributes, e.g. the payload of a nested attribute.
+
+    Nothing is parsed until an attribute is looked up. The first lookup indexes the stream with nla_index, later
+    lookups reuse that index. Views of nested attributes are created on demand and cached, so only the containers that
+    are actually used get indexed. The typed accessors read payloads straight from the underlying buffer.
+
+    get() returns nlattr class instances, so a view can stand in for the dictionary filled by nla_parse().
+
+    Positional arguments:
+    head -- first nlattr with more in its bytearray payload (nlattr class instance).
+    len_ -- length of attribute stream (integer).
+
+    Keyword arguments:
+    maxtype -- maximum attribute type expected and accepted, or None to accept all types (integer or None).
+    """
+
+    __slots__ = ('maxtype', '_buf', '_offset', '_len', '_stop', '_index', '_nested')
+
+    def __init__(self, head, len_, maxtype=None):
+        buf = head.bytearray
+        if isinstance(buf, bytearray_ptr):
+            self._buf, self._offset, self._stop = buf.pointee, buf.slice.start, buf.slice.stop
+        else:
+            self._buf, self._offset, self._stop = buf, 0, None
+        self._len = len_
+        self.maxtype = maxtype
+        self._index = None
+        self._nested = None
+
+    @classmethod
+    def _from_buffer(cls, buf, offset, len_, stop, maxtype):
+        view = cls.__new__(cls)
+        view._buf, view._offset, view._len, view._stop = buf, offset, len_, stop
+        view.maxtype = maxtype
+        view._index = None
+        view._nested = None
+        return view
+
+    def __contains__(self, type_):
+        return type_ in self.index
+
+    def __getitem__(self, type_):
+        """Return a view of the nested attribute of a type. Raises KeyError if it is missing."""
+        view = self.nested(type_)
+        if view is None:
+            raise KeyError(type_)
+        return view
+
+    def __iter__(self):
+        """Yield the types of all attributes present, in ascending order."""
+        return iter(self.index)
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} len={2} indexed={3}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self._len, self._index is not None,
+        )
+        return answer
+
+    @property
+    def index(self):
+        """Attribute index of the stream (nla_index class instance), built on first access."""
+        if self._index is None:
+            self._index = nla_index(self.maxtype).parse_buffer(self._buf, self._offset, self._len, self._stop)
+        return self._index
+
+    def validate(self, policy):
+        """Validate every attribute of the stream, also those replaced by a later attribute of the same type.
+
+        If the view was not indexed yet, the index is built while validating.
+
+        Positional arguments:
+        policy -- dictionary of nla_policy class instances as values, with nla types as keys (or nla_policy_compiled).
+
+        Returns:
+        0 on success or a negative error code.
+        """
+        index = nla_index(self.maxtype).parse_buffer(self._buf, self._offset, self._len, self._stop,
+                                                     nla_policy_compile(policy))
+        if not index.err and self._index is None:
+            self._index = index
+        return index.err
+
+    def get(self, type_, default=None):
+        """Return the attribute of a type (nlattr class instance), or `default` if it is missing."""
+        nla = self.index.nla(type_)
+        return default if nla is None else nla
+
+    def nested(self, type_, maxtype=None):
+        """Return a view of the attributes nested in the attribute of a type, or None if it is missing.
+
+        Positional arguments:
+        type_ -- attribute type of the container (integer).
+
+        Keyword arguments:
+        maxtype -- maximum attribute type accepted inside the container, used when the view is first created (integer).
+
+        Returns:
+        nla_view class instance or None.
+        """
+        if self._nested is not None and type_ in self._nested:
+            return self._nested[type_]
+        attr = self.index.attrs[type_] if 0 <= type_ < len(self.index.attrs) else None
+        if attr is None:
+            return None
+        view = nla_view._from_buffer(self._buf, attr[0], attr[1], self._stop, maxtype)
+        if self._nested is None:
+            self._nested = dict()
+        self._nested[type_] = view
+        return view
+
+    def each(self, maxtype=None):
+        """Iterate over the attributes of the stream in order, including repeated types, without indexing it.
+
+        Useful for arrays of nested attributes such as CTRL_ATTR_MCAST_GROUPS.
+
+        Keyword arguments:
+        maxtype -- maximum attribute type accepted inside each yielded view (integer).
+
+        Returns:
+        Generator yielding (attribute type, nla_view class instance of its payload) tuples.
+        """
+        buf, pos = self._buf, self._offset
+        rem = min(self._len, len(buf) - pos)
+        while rem >= NLA_HDRLEN:
+            length, type_ = _NLA_HDR.unpack_from(buf, pos)
+            if length < NLA_HDRLEN or length > rem:
+                break
+            view = nla_view._from_buffer(buf, pos + NLA_HDRLEN, length - NLA_HDRLEN, self._stop, maxtype)
+            yield type_ & NLA_TYPE_MASK, view
+            totlen = NLA_ALIGN(length)
+            pos += totlen
+            rem -= totlen
+
+    def len(self, type_):
+        """Return the payload length of an attribute, or None if it is missing."""
+        return self.index.len(type_)
+
+    def data(self, type_, default=None):
+        """Return a copy of the payload of an attribute (bytes), or `default` if it is missing."""
+        return self.index.data(type_, default)
+
+    def u8(self, type_, default=None):
+        """Return the payload of an 8 bit integer attribute, or `default` if it is missing."""
+        return self.index.u8(type_, default)
+
+    def u16(self, type_, default=None):
+        """Return the payload of a 16 bit integer attribute, or `default` if it is missing."""
+        return self.index.u16(type_, default)
+
+    def u32(self, type_, default=None):
+        """Return the payload of a 32 bit integer attribute, or `default` if it is missing."""
+        return self.index.u32(type_, default)
+
+    def u64(self, type_, default=None):
+        """Return the payload of a 64 bit integer attribute, or `default` if it is missing."""
+        return self.index.u64(type_, default)
+
+    def string(self, type_, default=None):
+        """Return the payload of a string attribute up to the first null byte (bytes), or `default` if it is missing."""
+        return self.index.string(type_, default)
+
+    def flag(self, type_):
+        """Return True if a flag attribute is present, False otherwise."""
+        return type_ in self.index
+
+    def array(self, type_, fmt='B', default=None):
+        """Return the payload of a packed integer array attribute as an array.array, or `default` if it is missing."""
+        return self.index.array(type_, fmt, default)
+
+    def ndarray(self, type_, fmt='B', default=None):
+        """Return the payload of a packed integer array attribute as a NumPy array, or `default` if it is missing.
+
+        The array shares memory with the message, see nla_get_ndarray() for how long it stays valid.
+        """
+        return self.index.ndarray(type_, fmt, default)
+
+
+def nla_view_nested(nla, maxtype=None):
+    """Return a lazy view of the attributes nested in an attribute.
+
+    Positional arguments:
+    nla -- attribute containing the nested attributes (nlattr class instance).
+
+    Keyword arguments:
+    maxtype -- maximum attribute type expected and accepted (integer).
+
+    Returns:
+    nla_view class instance.
+    """
+    return nla_view(nlattr(nla_data(nla)), nla_len(nla), maxtype)
+
+
 def nla_parse(tb, maxtype, head, len_, policy):
     """Create attribute index based on a stream of attributes.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L242
@@ -247,34 +751,32 @@ def nla_parse(tb, maxtype, head, len_, policy):
     in order to maintain backwards compatibility. If `policy` is not None, the attribute will be validated using the
     specified policy.
 
+    The stream is scanned once by nla_index, which validates every attribute against the policy on the way, including
+    attributes later replaced by one of the same type. If `tb` is an nla_index class instance it is filled in place and
+    no nlattr instances are created at all, otherwise nlattr instances are only created for the attributes stored in
+    `tb`. Use a policy compiled with nla_policy_compile(), otherwise it is compiled on every call.
+
     Positional arguments:
-    tb -- dictionary to be filled (maxtype+1 elements).
+    tb -- dictionary to be filled (maxtype+1 elements) or nla_index class instance.
     maxtype -- maximum attribute type expected and accepted (integer).
     head -- first nlattr with more in its bytearray payload (nlattr class instance).
     len_ -- length of attribute stream (integer).
-    policy -- dictionary of nla_policy class instances as values, with nla types as keys.
+    policy -- dictionary of nla_policy class instances as values, with nla types as keys (or nla_policy_compiled).
 
     Returns:
     0 on success or a negative error code.
     """
-    rem = ctypes.c_int()
-    for nla in nla_for_each_attr(head, len_, rem):
-        type_ = nla_type(nla)
-        if type_ > maxtype:
-            continue
+    index = tb if isinstance(tb, nla_index) else nla_index(maxtype)
+    index.parse(head, len_, nla_policy_compile(policy) if policy else None)
+    if index.err < 0:
+        return index.err
 
-        if policy:
-            err = validate_nla(nla, maxtype, policy)
-            if err < 0:
-                return err
+    if index is not tb:
+        for type_ in index:
+            tb[type_] = index.nla(type_)
 
-        if type_ in tb and tb[type_]:
-            _LOGGER.debug('Attribute of type %d found multiple times in message, previous attribute is being ignored.',
-                          type_)
-        tb[type_] = nla
-
-    if rem.value > 0:
-        _LOGGER.debug('netlink: %d bytes leftover after parsing attributes.', rem.value)
+    if index.rem > 0:
+        _LOGGER.debug('netlink: %d bytes leftover after parsing attributes.', index.rem)
 
     return 0
 
@@ -343,7 +845,7 @@ def nla_reserve(msg, attrtype, attrlen):
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L456
 
     Reserves room for an attribute in the specified Netlink message and fills in the attribute header (type, length).
-    Returns None if there is insufficient space for the attribute.
+    The message grows as needed (see nlmsg_grow()). Returns None if there is insufficient space for the attribute.
 
     Any padding between payload and the start of the next attribute is zeroed out.
 
@@ -356,15 +858,15 @@ def nla_reserve(msg, attrtype, attrlen):
     nlattr class instance allocated to the new space or None on failure.
     """
     tlen = NLMSG_ALIGN(msg.nm_nlh.nlmsg_len) + nla_total_size(attrlen)
-    if tlen > msg.nm_size:
+    if not nlmsg_grow(msg, tlen):
         return None
 
     nla = nlattr(nlmsg_tail(msg.nm_nlh))
     nla.nla_type = attrtype
     nla.nla_len = nla_attr_size(attrlen)
 
-    if attrlen:
-        padlen = nla_padlen(attrlen)
+    padlen = nla_padlen(attrlen)
+    if attrlen and padlen:
         nla.bytearray[nla.nla_len:nla.nla_len + padlen] = bytearray(b'\0') * padlen
     msg.nm_nlh.nlmsg_len = tlen
 
@@ -629,6 +1131,78 @@ def nla_get_msecs(nla):
     return nla_get_u64(nla)
 
 
+def _nla_array(buf, offset, len_, fmt):
+    """Copy the `len_` bytes of packed integers stored at `offset` in `buf` into an array.array."""
+    try:
+        typecode = _ARRAY_TYPECODES[fmt]
+    except KeyError:  # Unknown, or no array typecode of that size on this interpreter (e.g. 'Q' on 32-bit Python 2).
+        raise ValueError('unsupported element format {0!r}'.format(fmt))
+    arr = array.array(typecode)
+    data = memoryview(buf)[offset:offset + len_ - len_ % arr.itemsize]
+    if hasattr(arr, 'frombytes'):
+        arr.frombytes(data)
+    else:
+        arr.fromstring(data.tobytes())
+    return arr
+
+
+def _nla_ndarray(buf, offset, len_, fmt):
+    """Return a NumPy array sharing the `len_` bytes of packed integers stored at `offset` in `buf`."""
+    if numpy is None:
+        raise ImportError('NumPy is not installed')
+    dtype = numpy.dtype('=' + fmt)
+    return numpy.frombuffer(buf, dtype, len_ // dtype.itemsize, offset)
+
+
+def _nla_payload(nla):
+    """Return the underlying buffer of an attribute, the offset of its payload in it and the payload length."""
+    buf = nla.bytearray
+    if isinstance(buf, bytearray_ptr):
+        return buf.pointee, buf.slice.start + NLA_HDRLEN, nla_len(nla)
+    return buf, NLA_HDRLEN, nla_len(nla)
+
+
+def nla_get_array(nla, fmt='B'):
+    """Return the payload of an attribute holding packed integers (e.g. IFLA_STATS64) as an array.array.
+
+    The payload is copied in a single operation, no per-element Python code runs. Trailing bytes that do not make up a
+    whole element are ignored.
+
+    Positional arguments:
+    nla -- attribute (nlattr class instance).
+
+    Keyword arguments:
+    fmt -- struct format character of the elements: 'B', 'H', 'I' or 'Q' for u8, u16, u32 or u64, and 'b', 'h', 'i'
+        or 'q' for their signed counterparts (string).
+
+    Returns:
+    array.array instance of the elements in host byte order. Raises ValueError if `fmt` is not supported, which includes
+    'Q' and 'q' on interpreters without a 64-bit array typecode (Python 2 on 32-bit platforms).
+    """
+    return _nla_array(*(_nla_payload(nla) + (fmt,)))
+
+
+def nla_get_ndarray(nla, fmt='B'):
+    """Return the payload of an attribute holding packed integers as a NumPy array, without copying it.
+
+    The returned array shares memory with the message: it sees later changes to the buffer, and the message cannot grow
+    while the array is alive. The caller must hold a reference on the message with nlmsg_get() for as long as it uses
+    the array, otherwise nlmsg_free() (e.g. by recvmsgs() on sockets that recycle messages) hands the buffer on to the
+    next message. Messages received with NL_MSG_NOCOPY point into the socket's receive buffer, which the next read
+    overwrites regardless, so copy the array (ndarray.copy()) to keep it. Requires NumPy.
+
+    Positional arguments:
+    nla -- attribute (nlattr class instance).
+
+    Keyword arguments:
+    fmt -- struct format character of the elements, see nla_get_array() (string).
+
+    Returns:
+    numpy.ndarray instance of the elements in host byte order.
+    """
+    return _nla_ndarray(*(_nla_payload(nla) + (fmt,)))
+
+
 def nla_put_nested(msg, attrtype, nested):
     """Add nested attributes to Netlink message.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L772
@@ -648,6 +1222,88 @@ def nla_put_nested(msg, attrtype, nested):
     return nla_put(msg, attrtype, nlmsg_datalen(nested.nm_nlh), nlmsg_data(nested.nm_nlh))
 
 
+def nla_nest_start(msg, attrtype):
+    """Start a new level of nested attributes.
+    https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L795
+
+    Reserves an empty attribute of type `attrtype` at the tail of `msg`. Attributes added afterwards are nested in it
+    until nla_nest_end() is called, which patches the container's length in place.
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    attrtype -- attribute type of container (integer).
+
+    Returns:
+    nlattr class instance of the container or None on failure.
+    """
+    start = nla_reserve(msg, attrtype, 0)
+    if start is None:
+        return None
+    _LOGGER.debug('msg 0x%x: attr <0x%x> %d: starting nesting', id(msg), id(start), start.nla_type)
+    return start
+
+
+def _nla_nest_len(msg, start):
+    """Return the number of bytes between the start of a nested attribute and the tail of the message."""
+    nlh = msg.nm_nlh
+    base = nlh.bytearray.slice.start if isinstance(nlh.bytearray, bytearray_ptr) else 0
+    return base + NLMSG_ALIGN(nlh.nlmsg_len) - start.bytearray.slice.start
+
+
+def nla_nest_end(msg, start):
+    """Finalize nesting of attributes.
+    https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L818
+
+    Corrects the length of the container attribute to include all attributes added since nla_nest_start(). The kernel
+    can't handle empty nested attributes, so an empty container is removed from the message again.
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    start -- container attribute returned by nla_nest_start() (nlattr class instance).
+
+    Returns:
+    0 on success or a negative error code.
+    """
+    len_ = _nla_nest_len(msg, start)
+    if len_ == NLA_HDRLEN:
+        nla_nest_cancel(msg, start)
+        return 0
+    start.nla_len = len_
+
+    pad = NLMSG_ALIGN(msg.nm_nlh.nlmsg_len) - msg.nm_nlh.nlmsg_len
+    if pad > 0:
+        # Attributes always end aligned, so this only happens if raw data was appended with nlmsg_append().
+        nlh = msg.nm_nlh
+        if not nlmsg_grow(msg, nlh.nlmsg_len + pad):
+            raise BUG
+        nlh.bytearray[nlh.nlmsg_len:nlh.nlmsg_len + pad] = bytearray(pad)
+        nlh.nlmsg_len += pad
+        _LOGGER.debug('msg 0x%x: attr <0x%x> %d: added %d bytes of padding', id(msg), id(start), start.nla_type, pad)
+
+    _LOGGER.debug('msg 0x%x: attr <0x%x> %d: closing nesting, len=%d', id(msg), id(start), start.nla_type,
+                  start.nla_len)
+    return 0
+
+
+def nla_nest_cancel(msg, attr):
+    """Cancel the addition of a nested attribute.
+    https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L860
+
+    Removes any partially added nested Netlink attributes from the message by resetting the message to the size before
+    the call to nla_nest_start(). The removed bytes are zeroed out.
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    attr -- container attribute returned by nla_nest_start() (nlattr class instance).
+    """
+    len_ = _nla_nest_len(msg, attr)
+    if len_ < 0:
+        raise BUG
+    if len_ > 0:
+        msg.nm_nlh.nlmsg_len -= len_
+        nlmsg_tail(msg.nm_nlh)[:len_] = bytearray(len_)
+
+
 def nla_parse_nested(tb, maxtype, nla, policy):
     """Create attribute index based on nested attribute.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/attr.c#L885
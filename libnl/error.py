@@ -50,6 +50,18 @@ errmsg.update({  # https://github.com/thom311/libnl/blob/libnl3_2_25/lib/error.c
 })
 
 
+class NLError(Exception):
+    """Raised by iterator APIs, which cannot return a negative error code to the caller.
+
+    Instance variables:
+    error -- libnl error code (positive NLE_* integer).
+    """
+
+    def __init__(self, error):
+        self.error = abs(error)
+        super(NLError, self).__init__(self.error, errmsg.get(self.error, ''))
+
+
 def nl_syserr2nlerr(error_):
     """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/error.c#L84"""
     error_ = abs(error_)
@@ -7,10 +7,8 @@ License as published by the Free Software Foundation version 2.1
 of the License.
 """
 
-import ctypes
-
 from libnl.attr import (nla_get_u16, nla_put_string, NLA_U16, NLA_STRING, NLA_U32, NLA_NESTED, nla_policy,
-                        nla_for_each_nested, nla_get_u32, nla_get_string, nla_parse_nested)
+                        nla_policy_compile, nla_view_nested)
 from libnl.cache import NL_ACT_UNSPEC
 from libnl.errno_ import NLE_OBJ_NOTFOUND, NLE_MISSING_ATTR
 from libnl.genl.family import (genl_family_get_id, genl_family_alloc, genl_family_set_id, genl_family_set_name,
@@ -33,6 +31,7 @@ from libnl.netlink_private.cache_api import nl_cache_ops, nl_msgtype
 from libnl.netlink_private.netlink import BUG
 from libnl.netlink_private.types import genl_family_grp
 from libnl.nl import nl_recvmsgs, nl_send_auto, wait_for_ack
+from libnl.schema import NLA_NESTED_ARRAY, nla_schema
 from libnl.socket_ import nl_socket_get_cb
 
 CTRL_VERSION = 0x0001
@@ -48,6 +47,7 @@ ctrl_policy.update({  # https://github.com/thom311/libnl/blob/libnl3_2_25/lib/ge
     CTRL_ATTR_OPS: nla_policy(type_=NLA_NESTED),
     CTRL_ATTR_MCAST_GROUPS: nla_policy(type_=NLA_NESTED),
 })
+ctrl_policy = nla_policy_compile(ctrl_policy)
 
 
 family_op_policy = {i: 0 for i in range(CTRL_ATTR_OP_MAX + 1)}
@@ -55,6 +55,7 @@ family_op_policy.update({  # https://github.com/thom311/libnl/blob/libnl3_2_25/l
     CTRL_ATTR_OP_ID: nla_policy(type_=NLA_U32),
     CTRL_ATTR_OP_FLAGS: nla_policy(type_=NLA_U32),
 })
+family_op_policy = nla_policy_compile(family_op_policy)
 
 
 family_grp_policy = {i: 0 for i in range(CTRL_ATTR_MCAST_GRP_MAX + 1)}
@@ -62,6 +63,24 @@ family_grp_policy.update({  # https://github.com/thom311/libnl/blob/libnl3_2_25/
     CTRL_ATTR_MCAST_GRP_NAME: nla_policy(type_=NLA_STRING),
     CTRL_ATTR_MCAST_GRP_ID: nla_policy(type_=NLA_U32),
 })
+family_grp_policy = nla_policy_compile(family_grp_policy)
+
+
+ctrl_schema = nla_schema('ctrl', {
+    CTRL_ATTR_FAMILY_ID: ('family_id', NLA_U16),
+    CTRL_ATTR_FAMILY_NAME: ('family_name', NLA_STRING),
+    CTRL_ATTR_VERSION: ('version', NLA_U32),
+    CTRL_ATTR_HDRSIZE: ('hdrsize', NLA_U32),
+    CTRL_ATTR_MAXATTR: ('maxattr', NLA_U32),
+    CTRL_ATTR_OPS: ('ops', NLA_NESTED_ARRAY, nla_schema('ctrl_op', {
+        CTRL_ATTR_OP_ID: ('id', NLA_U32),
+        CTRL_ATTR_OP_FLAGS: ('flags', NLA_U32),
+    })),
+    CTRL_ATTR_MCAST_GROUPS: ('mcast_groups', NLA_NESTED_ARRAY, nla_schema('ctrl_mcast_grp', {
+        CTRL_ATTR_MCAST_GRP_NAME: ('name', NLA_STRING),
+        CTRL_ATTR_MCAST_GRP_ID: ('id', NLA_U32),
+    })),
+})
 
 
 def ctrl_request_update(_, nl_sock_h):
@@ -86,20 +105,18 @@ def parse_mcast_grps(family, grp_attr):
     Returns:
     0 on success or a negative error code.
     """
-    remaining = ctypes.c_int()
     if not grp_attr:
         raise BUG
 
-    for nla in nla_for_each_nested(grp_attr, remaining):
-        tb = dict()
-        err = nla_parse_nested(tb, CTRL_ATTR_MCAST_GRP_MAX, nla, family_grp_policy)
+    for _, grp in nla_view_nested(grp_attr).each(CTRL_ATTR_MCAST_GRP_MAX):
+        err = grp.validate(family_grp_policy)
         if err < 0:
             return err
-        if not tb[CTRL_ATTR_MCAST_GRP_ID] or not tb[CTRL_ATTR_MCAST_GRP_NAME]:
-            return -NLE_MISSING_ATTR
 
-        id_ = nla_get_u32(tb[CTRL_ATTR_MCAST_GRP_ID])
-        name = nla_get_string(tb[CTRL_ATTR_MCAST_GRP_NAME])
+        id_ = grp.u32(CTRL_ATTR_MCAST_GRP_ID)
+        name = grp.string(CTRL_ATTR_MCAST_GRP_NAME)
+        if id_ is None or name is None:
+            return -NLE_MISSING_ATTR
 
         err = genl_family_add_grp(family, id_, name)
         if err < 0:
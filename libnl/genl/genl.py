@@ -97,7 +97,7 @@ def genlmsg_parse(nlh, hdrlen, tb, maxtype, policy):
     Positional arguments:
     nlh -- Netlink message header (nlmsghdr class instance).
     hdrlen -- length of user header (integer).
-    tb -- empty dict, to be updated with nlattr class instances to store parsed attributes.
+    tb -- empty dict, to be updated with nlattr class instances to store parsed attributes, or nla_index class instance.
     maxtype -- maximum attribute id expected (integer).
     policy -- dictionary of nla_policy class instances as values, with nla types as keys.
 
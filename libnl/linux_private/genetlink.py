@@ -7,8 +7,6 @@ License as published by the Free Software Foundation version 2.1
 of the License.
 """
 
-import ctypes
-
 from libnl.linux_private.netlink import NLMSG_MIN_TYPE, NLMSG_ALIGN
 from libnl.misc import Struct, SIZEOF_U8, SIZEOF_U16, bytearray_ptr
 
@@ -42,27 +40,27 @@ class genlmsghdr(Struct):
 
     @property
     def cmd(self):
-        return ctypes.c_uint8.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @cmd.setter
     def cmd(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_uint8(value or 0))
+        self._set_field(0, value)
 
     @property
     def version(self):
-        return ctypes.c_uint8.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @version.setter
     def version(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_uint8(value or 0))
+        self._set_field(1, value)
 
     @property
     def reserved(self):
-        return ctypes.c_uint16.from_buffer(self.bytearray[self._get_slicers(2)]).value
+        return self._get_field(2)
 
     @reserved.setter
     def reserved(self, value):
-        self.bytearray[self._get_slicers(2)] = bytearray(ctypes.c_uint16(value or 0))
+        self._set_field(2, value)
 
     @property
     def payload(self):
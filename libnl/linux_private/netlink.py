@@ -61,38 +61,38 @@ class sockaddr_nl(Struct):
     @property
     def nl_family(self):
         """AF_NETLINK."""
-        return ctypes.c_uint.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @nl_family.setter
     def nl_family(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_uint(value or 0))
+        self._set_field(0, value)
 
     @property
     def nl_pad(self):
         """Zero."""
-        return ctypes.c_ushort.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @nl_pad.setter
     def nl_pad(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_ushort(value or 0))
+        self._set_field(1, value)
 
     @property
     def nl_pid(self):
         """Port ID."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(2)]).value
+        return self._get_field(2)
 
     @nl_pid.setter
     def nl_pid(self, value):
-        self.bytearray[self._get_slicers(2)] = bytearray(ctypes.c_uint32(value or 0))
+        self._set_field(2, value)
 
     @property
     def nl_groups(self):
         """Port ID."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(3)]).value
+        return self._get_field(3)
 
     @nl_groups.setter
     def nl_groups(self, value):
-        self.bytearray[self._get_slicers(3)] = bytearray(ctypes.c_uint32(value or 0))
+        self._set_field(3, value)
 
 
 class nlmsghdr(Struct):
@@ -135,47 +135,47 @@ class nlmsghdr(Struct):
     @property
     def nlmsg_len(self):
         """Length of message including header."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @nlmsg_len.setter
     def nlmsg_len(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_uint32(value or 0))
+        self._set_field(0, value)
 
     @property
     def nlmsg_type(self):
         """Message content."""
-        return ctypes.c_uint16.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @nlmsg_type.setter
     def nlmsg_type(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_uint16(value or 0))
+        self._set_field(1, value)
 
     @property
     def nlmsg_flags(self):
         """Additional flags."""
-        return ctypes.c_uint16.from_buffer(self.bytearray[self._get_slicers(2)]).value
+        return self._get_field(2)
 
     @nlmsg_flags.setter
     def nlmsg_flags(self, value):
-        self.bytearray[self._get_slicers(2)] = bytearray(ctypes.c_uint16(value or 0))
+        self._set_field(2, value)
 
     @property
     def nlmsg_seq(self):
         """Sequence number."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(3)]).value
+        return self._get_field(3)
 
     @nlmsg_seq.setter
     def nlmsg_seq(self, value):
-        self.bytearray[self._get_slicers(3)] = bytearray(ctypes.c_uint32(value or 0))
+        self._set_field(3, value)
 
     @property
     def nlmsg_pid(self):
         """Sending process port ID."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(4)]).value
+        return self._get_field(4)
 
     @nlmsg_pid.setter
     def nlmsg_pid(self, value):
-        self.bytearray[self._get_slicers(4)] = bytearray(ctypes.c_uint32(value or 0))
+        self._set_field(4, value)
 
     @property
     def payload(self):
@@ -204,11 +204,12 @@ class nlmsgerr(Struct):
     """
     _REPR = '<{0}.{1} error={2[error]} msg={2[msg]}>'
     SIGNATURE = (SIZEOF_INT, nlmsghdr.SIZEOF)
+    FORMAT = ('i', None)
     SIZEOF = sum(SIGNATURE)
 
     @property
     def error(self):
-        return ctypes.c_int.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @property
     def msg(self):
@@ -258,19 +259,19 @@ class nlattr(Struct):
 
     @property
     def nla_len(self):
-        return ctypes.c_uint16.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @nla_len.setter
     def nla_len(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_uint16(value or 0))
+        self._set_field(0, value)
 
     @property
     def nla_type(self):
-        return ctypes.c_uint16.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @nla_type.setter
     def nla_type(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_uint16(value or 0))
+        self._set_field(1, value)
 
     @property
     def payload(self):
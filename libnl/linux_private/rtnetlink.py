@@ -7,8 +7,6 @@ License as published by the Free Software Foundation version 2.1
 of the License.
 """
 
-import ctypes
-
 from libnl.misc import Struct, SIZEOF_UBYTE, SIZEOF_USHORT, SIZEOF_INT, SIZEOF_UINT, bytearray_ptr
 
 RTNL_FAMILY_IPMR = 128
@@ -87,19 +85,19 @@ class rtattr(Struct):
 
     @property
     def rta_len(self):
-        return ctypes.c_ushort.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @rta_len.setter
     def rta_len(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_ushort(value or 0))
+        self._set_field(0, value)
 
     @property
     def rta_type(self):
-        return ctypes.c_ushort.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @rta_type.setter
     def rta_type(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_ushort(value or 0))
+        self._set_field(1, value)
 
     @property
     def payload(self):
@@ -136,11 +134,11 @@ class rtgenmsg(Struct):
     @property
     def rtgen_family(self):
         """rtgen family."""
-        return ctypes.c_ubyte.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @rtgen_family.setter
     def rtgen_family(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_ubyte(value or 0))
+        self._set_field(0, value)
 
 
 class ifinfomsg(Struct):
@@ -159,6 +157,7 @@ class ifinfomsg(Struct):
     _REPR = ('<{0}.{1} ifi_family={2[ifi_family]} ifi_type={2[ifi_type]} ifi_index={2[ifi_index]} '
              'ifi_flags={2[ifi_flags]} ifi_change={2[ifi_change]} payload={2[payload]}>')
     SIGNATURE = (SIZEOF_UBYTE, SIZEOF_UBYTE, SIZEOF_USHORT, SIZEOF_INT, SIZEOF_UINT, SIZEOF_UINT)
+    FORMAT = ('B', 'B', 'H', 'i', 'I', 'I')
     SIZEOF = sum(SIGNATURE)
 
     def __init__(self, ba, ifi_family=None, ifi_type=None, ifi_index=None, ifi_flags=None, ifi_change=None):
@@ -176,43 +175,43 @@ class ifinfomsg(Struct):
 
     @property
     def ifi_family(self):
-        return ctypes.c_ubyte.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @ifi_family.setter
     def ifi_family(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_ubyte(value or 0))
+        self._set_field(0, value)
 
     @property
     def ifi_type(self):
-        return ctypes.c_ushort.from_buffer(self.bytearray[self._get_slicers(2)]).value
+        return self._get_field(2)
 
     @ifi_type.setter
     def ifi_type(self, value):
-        self.bytearray[self._get_slicers(2)] = bytearray(ctypes.c_ushort(value or 0))
+        self._set_field(2, value)
 
     @property
     def ifi_index(self):
-        return ctypes.c_int.from_buffer(self.bytearray[self._get_slicers(3)]).value
+        return self._get_field(3)
 
     @ifi_index.setter
     def ifi_index(self, value):
-        self.bytearray[self._get_slicers(3)] = bytearray(ctypes.c_int(value or 0))
+        self._set_field(3, value)
 
     @property
     def ifi_flags(self):
-        return ctypes.c_uint.from_buffer(self.bytearray[self._get_slicers(4)]).value
+        return self._get_field(4)
 
     @ifi_flags.setter
     def ifi_flags(self, value):
-        self.bytearray[self._get_slicers(4)] = bytearray(ctypes.c_uint(value or 0))
+        self._set_field(4, value)
 
     @property
     def ifi_change(self):
-        return ctypes.c_uint.from_buffer(self.bytearray[self._get_slicers(5)]).value
+        return self._get_field(5)
 
     @ifi_change.setter
     def ifi_change(self, value):
-        self.bytearray[self._get_slicers(5)] = bytearray(ctypes.c_uint(value or 0))
+        self._set_field(5, value)
 
     @property
     def payload(self):
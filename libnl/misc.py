@@ -1,6 +1,7 @@
 """Misc code not defined in Netlink but used by it."""
 
 import ctypes
+import struct
 
 SIZEOF_INT = ctypes.sizeof(ctypes.c_int)
 SIZEOF_POINTER = ctypes.sizeof(ctypes.c_void_p)  # Platform dependant.
@@ -12,6 +13,13 @@ SIZEOF_U8 = ctypes.sizeof(ctypes.c_uint8)
 SIZEOF_UBYTE = ctypes.sizeof(ctypes.c_ubyte)
 SIZEOF_UINT = ctypes.sizeof(ctypes.c_uint)
 SIZEOF_USHORT = ctypes.sizeof(ctypes.c_ushort)
+_FORMATS = {SIZEOF_U8: 'B', SIZEOF_U16: 'H', SIZEOF_U32: 'I', SIZEOF_U64: 'Q'}  # Default (unsigned) field codecs.
+
+
+def _check_ptr_bounds(ba, end):
+    """Raise ValueError if a field ending at `end` lies past the end of a bytearray_ptr, as ctypes used to."""
+    if ba.slice.start + end > min(ba.slice.stop, len(ba.pointee)):
+        raise ValueError('Buffer size too small ({0} instead of at least {1} bytes)'.format(len(ba), end))
 
 
 class _DynamicDict(dict):
@@ -29,9 +37,41 @@ class _DynamicDict(dict):
         return value
 
 
-class Struct(object):
-    """A base class equivalent to a C struct of a fixed size, holding no pointers in the struct definition."""
+class _StructMeta(type):
+    """Compiles the SIGNATURE of every Struct subclass once, when the class is created.
+
+    Each field gets a fixed offset and a struct.Struct codec so properties never recompute offsets or copy slices.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(_StructMeta, cls).__init__(name, bases, namespace)
+        formats = cls.FORMAT or tuple(_FORMATS.get(s) for s in cls.SIGNATURE)
+        slicers, fields, offset = list(), list(), 0
+        for size, fmt in zip(cls.SIGNATURE, formats):
+            slicers.append(slice(offset, offset + size))
+            if fmt is None:
+                fields.append(None)  # Not a scalar (e.g. nested struct), only available through _get_slicers().
+            else:
+                codec = struct.Struct('=' + fmt)
+                mask = (1 << (codec.size * 8)) - 1
+                sign = (mask + 1) >> 1 if fmt.islower() else 0
+                fields.append((codec.unpack_from, codec.pack_into, offset, offset + codec.size, mask, sign))
+            offset += size
+        cls._SLICERS = tuple(slicers)
+        cls._FIELDS = tuple(fields)
+
+
+class Struct(_StructMeta('_StructBase', (object, ), dict(FORMAT=None, SIGNATURE=()))):
+    """A base class equivalent to a C struct of a fixed size, holding no pointers in the struct definition.
+
+    Class variables:
+    SIGNATURE -- size in bytes of every field, in order.
+    SIZEOF -- size of the struct in bytes.
+    FORMAT -- optional struct format character of every field (None for non-scalar fields). Defaults to unsigned
+        integers sized by SIGNATURE.
+    """
     _REPR = '<{0}.{1}>'
+    FORMAT = None
     SIGNATURE = ()
     SIZEOF = 0
 
@@ -69,13 +109,45 @@ class Struct(object):
         Returns:
         slice() object. E.g. `x = _get_slicers(0); ba_instance[x]`
         """
-        if not index:  # first item.
-            return slice(0, self.SIGNATURE[0])
         if index >= len(self.SIGNATURE):
             raise IndexError('index out of self.SIGNATURE range')
-        pad_start = sum(self.SIGNATURE[:index])
-        pad_stop = pad_start + self.SIGNATURE[index]
-        return slice(pad_start, pad_stop)
+        return self._SLICERS[index]
+
+    def _get_field(self, index):
+        """Decodes a scalar field straight from the underlying buffer.
+
+        Positional arguments:
+        index -- index of self.SIGNATURE to read.
+
+        Returns:
+        Integer value of the field.
+        """
+        unpack_from, _, offset, end, _, _ = self._FIELDS[index]
+        ba = self.bytearray
+        if isinstance(ba, bytearray_ptr):
+            _check_ptr_bounds(ba, end)
+            return unpack_from(ba.pointee, ba.slice.start + offset)[0]
+        return unpack_from(ba, offset)[0]
+
+    def _set_field(self, index, value):
+        """Encodes a scalar field straight into the underlying buffer.
+
+        Values are truncated to the size of the field the same way ctypes does (e.g. c_uint16(65536) is 0).
+
+        Positional arguments:
+        index -- index of self.SIGNATURE to write.
+        value -- integer to store (None is stored as 0).
+        """
+        _, pack_into, offset, end, mask, sign = self._FIELDS[index]
+        value = (value or 0) & mask
+        if value & sign:
+            value -= mask + 1
+        ba = self.bytearray
+        if isinstance(ba, bytearray_ptr):
+            _check_ptr_bounds(ba, end)
+            pack_into(ba.pointee, ba.slice.start + offset, value)
+        else:
+            pack_into(ba, offset, value)
 
 
 class ucred(Struct):
@@ -101,29 +173,29 @@ class ucred(Struct):
     @property
     def pid(self):
         """Process ID of the sending process."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(0)]).value
+        return self._get_field(0)
 
     @pid.setter
     def pid(self, value):
-        self.bytearray[self._get_slicers(0)] = bytearray(ctypes.c_int32(value or 0))
+        self._set_field(0, value)
 
     @property
     def uid(self):
         """User ID of the sending process."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(1)]).value
+        return self._get_field(1)
 
     @uid.setter
     def uid(self, value):
-        self.bytearray[self._get_slicers(1)] = bytearray(ctypes.c_int32(value or 0))
+        self._set_field(1, value)
 
     @property
     def gid(self):
         """Group ID of the sending process."""
-        return ctypes.c_uint32.from_buffer(self.bytearray[self._get_slicers(2)]).value
+        return self._get_field(2)
 
     @gid.setter
     def gid(self, value):
-        self.bytearray[self._get_slicers(2)] = bytearray(ctypes.c_int32(value or 0))
+        self._set_field(2, value)
 
 
 class msghdr(object):
@@ -192,6 +264,10 @@ class bytearray_ptr(object):
             stop += pointee.slice.start
             pointee = pointee.pointee
 
+        # Negative starts left after resolving reference the end of the pointee, like Python slices do.
+        if start < 0:
+            start = max(start + len(pointee), 0)
+
         self.pointee = pointee
         self.slice = slice(start, stop)
 
@@ -202,10 +278,25 @@ class bytearray_ptr(object):
         raise TypeError("'{0}' object doesn't support item deletion".format(self.__class__.__name__))
 
     def __getitem__(self, item):
-        return self.pointee[self.slice][item]
+        """Constant time for integer keys. Slices only copy the requested bytes, never the whole referenced region."""
+        start, stop = self.slice.start, self.slice.stop
+        length = min(stop, len(self.pointee)) - start
+        if isinstance(item, slice):
+            if item.step not in (None, 1):
+                return self.copy()[item]
+            i, j, _ = item.indices(max(length, 0))
+            return self.pointee[start + i:start + max(i, j)]
+        if item < 0:
+            item += length
+        if not 0 <= item < length:
+            raise IndexError('{0} index out of range'.format(self.__class__.__name__))
+        return self.pointee[start + item]
+
+    def __iter__(self):
+        return iter(self.copy())
 
     def __len__(self):
-        return len(self.pointee[self.slice])
+        return max(min(self.slice.stop, len(self.pointee)) - self.slice.start, 0)
 
     def __setitem__(self, key, value):
         # Handle integer keys (lookup).
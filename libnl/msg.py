@@ -15,25 +15,135 @@ import logging
 import os
 import resource
 import string
+import threading
 
 import libnl.linux_private.netlink
 from libnl.attr import nla_for_each_attr, nla_find, nla_is_nested, nla_len, nla_padlen, nla_data, nla_parse
 from libnl.cache_mngt import nl_msgtype_lookup, nl_cache_ops_associate_safe
 from libnl.errno_ import NLE_NOMEM, NLE_MSG_TOOSHORT
 from libnl.linux_private.genetlink import GENL_HDRLEN, genlmsghdr
-from libnl.misc import bytearray_ptr
-from libnl.msg_ import nlmsg_data, nlmsg_len
+from libnl.misc import bytearray_ptr, ucred
+from libnl.msg_ import nlmsg_data, nlmsg_grow, nlmsg_len
 from libnl.netlink_private.netlink import BUG
 from libnl.netlink_private.types import nl_msg, NL_MSG_CRED_PRESENT
 from libnl.utils import __type2str
 
 _LOGGER = logging.getLogger(__name__)
 default_msg_size = resource.getpagesize()
+initial_msg_size = 128  # Messages grow on demand, see nlmsg_grow().
 NL_AUTO_PORT = 0
 NL_AUTO_PID = NL_AUTO_PORT
 NL_AUTO_SEQ = 0
 
 
+def _resizable(buf):
+    """Check that a bytearray has no exports (memoryview, numpy arrays, ...), which prevent resizing it."""
+    try:
+        buf.append(0)
+    except BufferError:
+        return False
+    del buf[-1]
+    return True
+
+
+class nl_msg_pool(object):
+    """Bounded free list of released Netlink messages.
+
+    Messages whose last reference is dropped with nlmsg_free() are reset and kept here, together with their nlmsghdr,
+    sockaddr_nl instances and (page sized or smaller) buffer. nlmsg_alloc(), nlmsg_alloc_simple(), nlmsg_inherit(),
+    nlmsg_convert() and nlmsg_view() take messages from the pool before creating new ones. nl_send_simple() and
+    dump_error_msg() release the messages they allocate themselves. recvmsgs() only releases the messages it hands to
+    callbacks on sockets with recycling enabled (see nl_socket_enable_msg_recycle()). The pool may be shared by several
+    threads.
+
+    Keyword arguments:
+    max_size -- maximum number of messages kept (integer).
+
+    Instance variables:
+    max_size -- maximum number of messages kept, 0 disables the pool (integer).
+    hits -- number of messages taken from the pool (integer).
+    misses -- number of messages created because the pool was empty (integer).
+    """
+
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._free = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._free)
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} max_size={2} free={3} hits={4} misses={5}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.max_size, len(self._free), self.hits, self.misses,
+        )
+        return answer
+
+    def get(self):
+        """Take a message from the pool.
+
+        Returns:
+        Reset Netlink message (nl_msg class instance) or None if the pool is empty.
+        """
+        with self._lock:
+            if not self._free:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._free.pop()
+
+    def put(self, msg):
+        """Reset a message and keep it for reuse, unless the pool is full.
+
+        Positional arguments:
+        msg -- Netlink message without references (nl_msg class instance).
+
+        Returns:
+        True if the message was kept, False otherwise.
+        """
+        if len(self._free) >= self.max_size:
+            return False
+        msg.nm_protocol = 0
+        msg.nm_flags = 0
+        msg.nm_src.bytearray[:] = bytearray(libnl.linux_private.netlink.sockaddr_nl.SIZEOF)
+        msg.nm_dst.bytearray[:] = bytearray(libnl.linux_private.netlink.sockaddr_nl.SIZEOF)
+        msg.nm_creds = None
+        msg.nm_size = 0
+        buf = msg.nm_nlh.bytearray if msg.nm_nlh is not None else None
+        if isinstance(buf, bytearray) and len(buf) <= default_msg_size and _resizable(buf):
+            buf[:] = bytearray(len(buf))
+        else:
+            msg.nm_nlh = None  # Views, large buffers and buffers still exported (e.g. to a memoryview) are not kept.
+        with self._lock:
+            if len(self._free) >= self.max_size:
+                return False
+            self._free.append(msg)
+        return True
+
+    def clear(self):
+        """Drop all pooled messages and reset the counters."""
+        with self._lock:
+            del self._free[:]
+            self.hits = 0
+            self.misses = 0
+
+
+msg_pool = nl_msg_pool()
+
+
+def _nlmsg_new():
+    msg = msg_pool.get()
+    if msg is None:
+        msg = nl_msg()
+    msg.nm_refcnt = 1
+    return msg
+
+
 def nlmsg_size(payload):
     """Calculates size of Netlink message based on payload length.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L54
@@ -158,7 +268,7 @@ def nlmsg_parse(nlh, hdrlen, tb, maxtype, policy):
     Positional arguments:
     nlh -- Netlink message header (nlmsghdr class instance).
     hdrlen -- length of family specific header (integer).
-    tb -- dictionary of nlattr instances (length of maxtype+1).
+    tb -- dictionary of nlattr instances (length of maxtype+1) or nla_index class instance.
     maxtype -- maximum attribute type to be expected (integer).
     policy -- validation policy (nla_policy class instance).
 
@@ -185,24 +295,37 @@ def nlmsg_find_attr(nlh, hdrlen, attrtype):
     return nla_find(nlmsg_attrdata(nlh, hdrlen), nlmsg_attrlen(nlh, hdrlen), attrtype)
 
 
-def nlmsg_alloc(len_=default_msg_size):
+def nlmsg_alloc(len_=None):
     """Allocate a new Netlink message with maximum payload size specified.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L299
 
-    Allocates a new Netlink message without any further payload. The maximum payload size defaults to
-    resource.getpagesize() or as otherwise specified with nlmsg_set_default_size().
+    Allocates a new Netlink message without any further payload.
+
+    Unlike in C the size is not a hard limit. Without an explicit `len_` the buffer starts out small (initial_msg_size,
+    or the default size set with nlmsg_set_default_size() if that is smaller) and grows as data is added, see
+    nlmsg_grow(). An explicit `len_` is allocated right away.
+
+    Messages released with nlmsg_free() are recycled from msg_pool, including their buffer if it is large enough.
+
+    Keyword arguments:
+    len_ -- initial size of the message buffer in bytes (integer).
 
     Returns:
     Newly allocated Netlink message (nl_msg class instance).
     """
-    len_ = max(libnl.linux_private.netlink.nlmsghdr.SIZEOF, len_)
-    nm = nl_msg()
-    nm.nm_refcnt = 1
-    nm.nm_nlh = libnl.linux_private.netlink.nlmsghdr(bytearray(b'\0') * len_)
+    maxlen = max(libnl.linux_private.netlink.nlmsghdr.SIZEOF, default_msg_size if len_ is None else len_)
+    size = min(maxlen, initial_msg_size) if len_ is None else maxlen
+    nm = _nlmsg_new()
+    if nm.nm_nlh is None:
+        nm.nm_nlh = libnl.linux_private.netlink.nlmsghdr(bytearray(size))
+    elif len(nm.nm_nlh.bytearray) < size:
+        nm.nm_nlh.bytearray = bytearray(size)
+    else:
+        size = len(nm.nm_nlh.bytearray)  # Recycled buffer, zeroed by nl_msg_pool.put().
     nm.nm_protocol = -1
-    nm.nm_size = len_
+    nm.nm_size = size
     nm.nm_nlh.nlmsg_len = nlmsg_total_size(0)
-    _LOGGER.debug('msg 0x%x: Allocated new message, maxlen=%d', id(nm), len_)
+    _LOGGER.debug('msg 0x%x: Allocated new message, maxlen=%d', id(nm), maxlen)
     return nm
 
 
@@ -253,6 +376,10 @@ def nlmsg_set_default_size(max_):
     """Set the default maximum message payload size for allocated messages.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L365
 
+    Since messages grow on demand, this does not preallocate anything: nlmsg_alloc() without a size still starts out
+    with initial_msg_size bytes (or `max_` if smaller) and logs `max_` as the message's maxlen. The default size also
+    bounds the buffers msg_pool keeps for reuse, larger ones are dropped when their message is freed.
+
     Positional arguments:
     max_ -- size of payload in bytes (integer).
     """
@@ -275,7 +402,62 @@ def nlmsg_convert(hdr):
     nm = nlmsg_alloc(hdr.nlmsg_len)
     if not nm:
         return None
-    nm.nm_nlh.bytearray = hdr.bytearray.copy()[:hdr.nlmsg_len]
+    data = hdr.bytearray[:hdr.nlmsg_len]
+    buf = nm.nm_nlh.bytearray
+    size = max(hdr.nlmsg_len, libnl.linux_private.netlink.nlmsghdr.SIZEOF)
+    if len(buf) > size:  # A recycled buffer can be longer than the message.
+        if _resizable(buf):
+            del buf[size:]
+        else:  # Exported after it was recycled, leave it to its user.
+            buf = nm.nm_nlh.bytearray = bytearray(size)
+        nm.nm_size = size
+    buf[:len(data)] = data
+    return nm
+
+
+def nlmsg_view(hdr):
+    """Wrap a Netlink message received from a Netlink socket in an nl_msg without copying it.
+
+    The returned message references the receive buffer `hdr` points into. It is only valid for as long as that buffer
+    holds the message, which for messages handed to callbacks by recvmsgs() means until the callback returns. Use
+    nlmsg_copy() to keep the message around for longer.
+
+    Positional arguments:
+    hdr -- Netlink message received from netlink socket (nlmsghdr class instance).
+
+    Returns:
+    Netlink message (nl_msg class instance) sharing its buffer with `hdr`.
+    """
+    nm = _nlmsg_new()
+    nm.nm_protocol = -1
+    view = bytearray_ptr(hdr.bytearray, 0, hdr.nlmsg_len)
+    if nm.nm_nlh is None:
+        nm.nm_nlh = libnl.linux_private.netlink.nlmsghdr(view)
+    else:
+        nm.nm_nlh.bytearray = view
+    nm.nm_size = hdr.nlmsg_len
+    return nm
+
+
+def nlmsg_copy(msg):
+    """Copy a Netlink message into a newly allocated nl_msg.
+
+    Detaches messages created by nlmsg_view() from the receive buffer. The protocol, source and destination addresses
+    and credentials are carried over.
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+
+    Returns:
+    Newly allocated Netlink message (nl_msg class instance).
+    """
+    nm = nlmsg_convert(msg.nm_nlh)
+    nm.nm_protocol = msg.nm_protocol
+    nm.nm_flags = msg.nm_flags
+    nm.nm_src.bytearray[:] = msg.nm_src.bytearray
+    nm.nm_dst.bytearray[:] = msg.nm_dst.bytearray
+    if msg.nm_creds is not None:
+        nm.nm_creds = ucred(pid=msg.nm_creds.pid, uid=msg.nm_creds.uid, gid=msg.nm_creds.gid)
     return nm
 
 
@@ -291,7 +473,7 @@ def nlmsg_reserve(n, len_, pad):
     nlmsg_len_ = n.nm_nlh.nlmsg_len
     tlen = len_ if not pad else ((len_ + (pad - 1)) & ~(pad - 1))
 
-    if tlen + nlmsg_len_ > n.nm_size:
+    if not nlmsg_grow(n, tlen + nlmsg_len_):
         return None
 
     buf = bytearray_ptr(n.nm_nlh.bytearray, nlmsg_len_)
@@ -375,6 +557,38 @@ def nlmsg_hdr(msg):
     return msg.nm_nlh
 
 
+def nlmsg_get(msg):
+    """Acquire a reference on a Netlink message.
+    https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L548
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    """
+    msg.nm_refcnt += 1
+    _LOGGER.debug('New reference to message 0x%x, total %d', id(msg), msg.nm_refcnt)
+
+
+def nlmsg_free(msg):
+    """Release a reference from a Netlink message.
+    https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L561
+
+    Frees memory after the last reference has been released. Here that means the message is reset and handed to
+    msg_pool for reuse, so it must not be used afterwards, including any nlmsghdr or nlattr instances pointing into it.
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    """
+    if not msg:
+        return
+    msg.nm_refcnt -= 1
+    _LOGGER.debug('Returned message reference 0x%x, %d remaining', id(msg), msg.nm_refcnt)
+    if msg.nm_refcnt < 0:
+        raise BUG
+    if msg.nm_refcnt <= 0:
+        msg_pool.put(msg)
+        _LOGGER.debug('msg 0x%x: Freed', id(msg))
+
+
 def nlmsg_set_proto(msg, protocol):
     """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L584
 
@@ -386,8 +600,11 @@ def nlmsg_set_proto(msg, protocol):
 
 
 def nlmsg_set_src(msg, addr):
-    """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L599"""
-    msg.nm_src = addr
+    """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L599
+
+    The address is copied, like memcpy() does in C, so `addr` can be reused and pooled messages can be reset in place.
+    """
+    msg.nm_src.bytearray[:] = addr.bytearray
 
 
 def nlmsg_get_dst(msg):
@@ -632,6 +849,7 @@ def dump_error_msg(msg, ofd=_LOGGER.debug):
         ofd('  [ORIGINAL MESSAGE] %d octets', hdr.SIZEOF)
         errmsg = nlmsg_inherit(err.msg)
         print_hdr(ofd, errmsg)
+        nlmsg_free(errmsg)
 
 
 def print_msg(msg, ofd, hdr):
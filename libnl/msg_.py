@@ -55,3 +55,32 @@ def nlmsg_datalen(nlh):
 
 
 nlmsg_len = nlmsg_datalen  # Alias. https://github.com/thom311/libnl/blob/libnl3_2_25/lib/msg.c#L126
+
+
+def nlmsg_grow(msg, size):
+    """Make sure the buffer of a Netlink message can hold at least `size` bytes.
+
+    The buffer is extended in place and at least doubled in size, so the number of reallocations is logarithmic in the
+    final message size and bytearray_ptr instances pointing into the message stay valid. Messages that are views into
+    another buffer (see nlmsg_view()) cannot grow, nor can messages whose buffer is exported (e.g. to a memoryview).
+
+    Positional arguments:
+    msg -- Netlink message (nl_msg class instance).
+    size -- required size of the whole message in bytes (integer).
+
+    Returns:
+    True if the message can hold `size` bytes, False otherwise.
+    """
+    if size <= msg.nm_size:
+        return True
+    buf = msg.nm_nlh.bytearray
+    if isinstance(buf, bytearray_ptr):
+        return False
+    size = max(size, 2 * msg.nm_size)
+    if size > len(buf):
+        try:
+            buf.extend(bytearray(size - len(buf)))
+        except BufferError:  # Still exported (memoryview, numpy array, ...).
+            return False
+    msg.nm_size = size
+    return True
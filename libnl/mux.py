@@ -0,0 +1,268 @@
+"""Sequence number multiplexing of in-flight requests.
+
+recvmsgs() checks every reply against a single expected sequence number, which limits a socket to one outstanding
+request. nl_mux lifts that limit: requests are finalized with nl_complete_msg(), which gives each one its own sequence
+number, and sent back to back without waiting. Incoming replies, ACKs and errors are then routed to the request with
+the matching sequence number, so a batch of queries costs about one round trip instead of one per query.
+
+Messages that belong to no outstanding request (e.g. multicast notifications) are passed on to listeners.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+import logging
+
+from libnl.errno_ import NLE_AGAIN, NLE_DUMP_INTR
+from libnl.error import nl_syserr2nlerr
+from libnl.handlers import (NL_CB_ACK, NL_CB_CUSTOM, NL_CB_DUMP_INTR, NL_CB_FINISH, NL_CB_SEQ_CHECK, NL_CB_VALID,
+                            NL_OK, NL_SKIP, nl_cb_clone, nl_cb_err, nl_cb_set)
+from libnl.linux_private.netlink import NLM_F_ACK, NLM_F_DUMP, NLM_F_MULTI
+from libnl.msg import nlmsg_copy, nlmsg_get, nlmsg_hdr
+from libnl.netlink_private.types import NL_MSG_NOCOPY
+from libnl.nl import nl_complete_msg, nl_recvmsgs_report, nl_send, nl_send_batch
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class nl_mux_request(object):
+    """A request sent through nl_mux, completed when its ACK, NLMSG_DONE or error arrives.
+
+    Instance variables:
+    seq -- sequence number of the request (integer).
+    replies -- replies received so far, or None if they are not kept (list or None).
+    on_reply -- called with each reply message as it arrives (callable or None).
+    done -- True once the request completed (boolean).
+    error -- 0 on success or a negative error code, valid once done (integer).
+    open_ended -- True if no ACK or NLMSG_DONE is expected, so the first non-multipart reply completes the request.
+    interrupted -- True if the kernel flagged the dump as inconsistent (NLM_F_DUMP_INTR).
+    """
+
+    def __init__(self, seq, replies=None, on_reply=None, open_ended=False):
+        self.seq = seq
+        self.replies = replies
+        self.on_reply = on_reply
+        self.done = False
+        self.error = 0
+        self.open_ended = open_ended
+        self.interrupted = False
+        self._callbacks = list()
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} seq={2} done={3} error={4} replies={5}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.seq, self.done, self.error, None if self.replies is None else len(self.replies),
+        )
+        return answer
+
+    def add_done_callback(self, func):
+        """Call `func(request)` when the request completes, or right away if it already has.
+
+        Positional arguments:
+        func -- callable taking this nl_mux_request class instance.
+        """
+        if self.done:
+            func(self)
+        else:
+            self._callbacks.append(func)
+
+    def complete(self, error=0):
+        """Mark the request as done and run its done callbacks. Later calls are ignored.
+
+        Positional arguments:
+        error -- 0 on success or a negative error code (integer).
+        """
+        if self.done:
+            return
+        self.done = True
+        self.error = int(error)
+        callbacks, self._callbacks = self._callbacks, list()
+        for func in callbacks:
+            func(self)
+
+
+class nl_mux(object):
+    """Routes replies on a Netlink socket to any number of outstanding requests by sequence number.
+
+    Positional arguments:
+    sk -- connected Netlink socket (nl_sock class instance).
+
+    Instance variables:
+    sk -- the Netlink socket (nl_sock class instance).
+    cb -- callbacks used to parse incoming messages, cloned from the socket's (nl_cb class instance).
+    pending -- outstanding requests, indexed by sequence number (dict of nl_mux_request class instances).
+    """
+
+    def __init__(self, sk):
+        self.sk = sk
+        self.cb = nl_cb_clone(sk.s_cb)
+        self.pending = dict()
+        self._listeners = list()
+
+        # Sequence numbers are checked by routing replies to requests, not by strict ordering.
+        nl_cb_set(self.cb, NL_CB_SEQ_CHECK, NL_CB_CUSTOM, lambda *_: NL_OK, None)
+        nl_cb_set(self.cb, NL_CB_VALID, NL_CB_CUSTOM, self._on_valid, None)
+        nl_cb_set(self.cb, NL_CB_FINISH, NL_CB_CUSTOM, self._on_finish, None)
+        nl_cb_set(self.cb, NL_CB_ACK, NL_CB_CUSTOM, self._on_finish, None)
+        nl_cb_set(self.cb, NL_CB_DUMP_INTR, NL_CB_CUSTOM, self._on_dump_intr, None)
+        nl_cb_err(self.cb, NL_CB_CUSTOM, self._on_error, None)
+
+    def add_listener(self, func):
+        """Call `func(msg)` for every valid message that does not belong to a request, e.g. multicast notifications.
+
+        With recycling enabled on the socket (see nl_socket_enable_msg_recycle()), `func` must take a reference with
+        nlmsg_get() on messages it keeps after returning.
+
+        Positional arguments:
+        func -- callable taking a Netlink message (nl_msg class instance).
+        """
+        self._listeners.append(func)
+
+    def remove_listener(self, func):
+        """Stop calling `func` for unsolicited messages.
+
+        Positional arguments:
+        func -- callable previously passed to add_listener().
+        """
+        self._listeners.remove(func)
+
+    def send(self, msg, keep_replies=True, on_reply=None):
+        """Finalize a request with nl_complete_msg() and send it without waiting for the reply.
+
+        Positional arguments:
+        msg -- Netlink message (nl_msg class instance).
+
+        Keyword arguments:
+        keep_replies -- collect reply messages in the request's `replies` list (boolean).
+        on_reply -- called with each reply message as it arrives, takes a reference with nlmsg_get() on messages it
+            keeps if the socket recycles messages (callable or None).
+
+        Returns:
+        nl_mux_request class instance. If sending failed it is already done with a negative `error`.
+        """
+        request = self._register(msg, keep_replies, on_reply)
+        ret = nl_send(self.sk, msg)
+        if ret < 0:
+            self._complete(request.seq, ret)
+        return request
+
+    def send_batch(self, msgs, keep_replies=True):
+        """Finalize several requests and send them packed into as few datagrams as possible with nl_send_batch().
+
+        Use wait() afterwards to collect the ACKs, which are reported in the `error` attribute of each request. The
+        socket's receive buffer must be able to hold the replies to the whole batch, or the kernel drops them and
+        receiving fails with -NLE_NOMEM (see nl_socket_set_buffer_size()).
+
+        Positional arguments:
+        msgs -- Netlink messages (list of nl_msg class instances).
+
+        Keyword arguments:
+        keep_replies -- collect reply messages in the requests' `replies` lists (boolean).
+
+        Returns:
+        List of nl_mux_request class instances, in the order of `msgs`. If sending failed they are already done with a
+        negative `error`.
+        """
+        requests = [self._register(msg, keep_replies, None) for msg in msgs]
+        ret = nl_send_batch(self.sk, msgs)
+        if ret < 0:
+            for request in requests:
+                self._complete(request.seq, ret)
+        return requests
+
+    def receive(self):
+        """Read and route one batch of messages from the socket.
+
+        Blocks unless the socket is non-blocking. A receive error other than -NLE_AGAIN fails all pending requests.
+
+        Returns:
+        Number of messages processed, 0 on EOF, or a negative error code from nl_recvmsgs_report().
+        """
+        err = nl_recvmsgs_report(self.sk, self.cb)
+        if err < 0 and err != -NLE_AGAIN:
+            _LOGGER.debug('nl_mux(0x%x): Receive failed with %d', id(self), err)
+            self.fail_all(err)
+        return err
+
+    def wait(self, requests=None):
+        """Receive until all given requests are done.
+
+        Positional arguments:
+        requests -- iterable of nl_mux_request class instances, defaults to all pending requests.
+
+        Returns:
+        0 on success or a negative error code from nl_recvmsgs_report(). Errors of individual requests are reported
+        in their `error` attribute.
+        """
+        requests = list(self.pending.values() if requests is None else requests)
+        while not all(r.done for r in requests):
+            err = self.receive()
+            if err < 0:
+                return err
+        return 0
+
+    def fail_all(self, error):
+        """Complete all pending requests with an error.
+
+        Positional arguments:
+        error -- negative error code (integer).
+        """
+        for seq in list(self.pending):
+            self._complete(seq, error)
+
+    def _register(self, msg, keep_replies, on_reply):
+        nl_complete_msg(self.sk, msg)
+        nlh = nlmsg_hdr(msg)
+        request = nl_mux_request(nlh.nlmsg_seq, list() if keep_replies else None, on_reply,
+                                 not nlh.nlmsg_flags & (NLM_F_ACK | NLM_F_DUMP))
+        self.pending[request.seq] = request
+        return request
+
+    def _complete(self, seq, error=0):
+        request = self.pending.pop(seq, None)
+        if request is not None:
+            request.complete(error)
+
+    def _on_valid(self, msg, _):
+        nlh = nlmsg_hdr(msg)
+        request = self.pending.get(nlh.nlmsg_seq)
+        if request is None:
+            kept = bool(self._listeners)
+        else:
+            kept = request.replies is not None or request.on_reply is not None
+        copied = kept and self.sk.s_flags & NL_MSG_NOCOPY
+        if copied:
+            msg = nlmsg_copy(msg)  # Replies outlive the callback, copy only those someone receives.
+        if request is None:
+            for func in list(self._listeners):
+                func(msg)
+            return NL_OK
+        if request.replies is not None:
+            if not copied:
+                nlmsg_get(msg)  # With NL_MSG_RECYCLE, recvmsgs() releases its reference after this callback.
+            request.replies.append(msg)
+        if request.on_reply is not None:
+            request.on_reply(msg)
+        if request.open_ended and not nlh.nlmsg_flags & NLM_F_MULTI:
+            self._complete(nlh.nlmsg_seq)
+        return NL_OK
+
+    def _on_finish(self, msg, _):
+        seq = nlmsg_hdr(msg).nlmsg_seq
+        request = self.pending.get(seq)
+        self._complete(seq, -NLE_DUMP_INTR if request is not None and request.interrupted else 0)
+        return NL_OK
+
+    def _on_dump_intr(self, msg, _):
+        request = self.pending.get(nlmsg_hdr(msg).nlmsg_seq)
+        if request is not None:
+            request.interrupted = True
+        return NL_OK
+
+    def _on_error(self, _, err, __):
+        self._complete(err.msg.nlmsg_seq, -nl_syserr2nlerr(err.error))
+        return NL_SKIP
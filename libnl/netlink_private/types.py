@@ -7,6 +7,7 @@ License as published by the Free Software Foundation version 2.1
 of the License.
 """
 
+import collections
 import socket
 
 from libnl.linux_private.netlink import sockaddr_nl
@@ -18,6 +19,9 @@ NL_SOCK_PASSCRED = 1 << 1
 NL_OWN_PORT = 1 << 2
 NL_MSG_PEEK = 1 << 3
 NL_NO_AUTO_ACK = 1 << 4
+NL_MSG_NOCOPY = 1 << 5
+NL_RECV_DRAIN = 1 << 6
+NL_MSG_RECYCLE = 1 << 7
 NL_MSG_CRED_PRESENT = 1
 
 
@@ -61,6 +65,11 @@ class nl_sock(object):
     s_flags -- int.
     s_cb -- struct nl_cb.
     s_bufsize -- size_t.
+    s_rxbuf -- receive buffer reused by nl_recv() across reads, grown when a datagram does not fit (bytearray).
+    s_drain_msgs -- maximum number of datagrams read per batch in drain mode, 0 for no limit (integer).
+    s_drain_bytes -- stop reading further datagrams in drain mode once this many bytes are buffered, 0 for no limit.
+    s_rxpending -- datagrams read in drain mode but not dispatched yet, as (start, stop, nl_pid, nl_groups) tuples of
+        their position in `s_rxbuf` and their source address (collections.deque).
     socket_instance -- the actual socket.socket() instance.
     """
 
@@ -73,6 +82,10 @@ class nl_sock(object):
         self.s_flags = 0
         self.s_cb = None
         self.s_bufsize = None
+        self.s_rxbuf = bytearray()
+        self.s_drain_msgs = 0
+        self.s_drain_bytes = 0
+        self.s_rxpending = collections.deque()
         self.socket_instance = None
 
     def __repr__(self):
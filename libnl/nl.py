@@ -20,20 +20,21 @@ import socket
 import resource
 
 from libnl.errno_ import (NLE_BAD_SOCK, NLE_AF_NOSUPPORT, NLE_SEQ_MISMATCH, NLE_DUMP_INTR, NLE_MSG_OVERFLOW,
-                          NLE_MSG_TRUNC)
-from libnl.error import nl_syserr2nlerr
+                          NLE_MSG_TRUNC, NLE_AGAIN, NLE_INVAL)
+from libnl.error import NLError, nl_syserr2nlerr
 from libnl.handlers import (NL_OK, NL_CB_MSG_OUT, NL_CB_MSG_IN, NL_CB_SEQ_CHECK, NL_CB_INVALID, NL_SKIP,
                             NL_CB_DUMP_INTR, NL_CB_SEND_ACK, NL_CB_OVERRUN, NL_CB_SKIPPED, NL_CB_FINISH, NL_CB_ACK,
                             NL_STOP, NL_CB_VALID, nl_cb_clone, nl_cb_set, NL_CB_CUSTOM)
 from libnl.linux_private.netlink import (NLM_F_REQUEST, NLM_F_ACK, sockaddr_nl, nlmsghdr, NLMSG_DONE, NLMSG_ERROR,
                                          NLMSG_NOOP, NLMSG_OVERRUN, NLM_F_MULTI, NLM_F_DUMP_INTR, nlmsgerr,
-                                         NLMSG_ALIGNTO)
+                                         NLMSG_ALIGNTO, NLMSG_ALIGN)
 from libnl.misc import msghdr, ucred, bytearray_ptr
 from libnl.msg import (nlmsg_alloc_simple, nlmsg_append, NL_AUTO_PORT, nlmsg_get_dst, nlmsg_get_creds, nlmsg_set_src,
                        nlmsg_hdr, NL_AUTO_SEQ, nlmsg_convert, nlmsg_set_proto, nlmsg_data, nlmsg_size, nlmsg_ok,
-                       nlmsg_next)
+                       nlmsg_next, nlmsg_view, nlmsg_get, nlmsg_free)
 from libnl.netlink_private.netlink import nl_cb_call
-from libnl.netlink_private.types import NL_NO_AUTO_ACK, NL_SOCK_BUFSIZE_SET, NL_MSG_PEEK, NL_SOCK_PASSCRED
+from libnl.netlink_private.types import (NL_NO_AUTO_ACK, NL_SOCK_BUFSIZE_SET, NL_MSG_PEEK, NL_SOCK_PASSCRED,
+                                         NL_MSG_NOCOPY, NL_RECV_DRAIN, NL_MSG_RECYCLE)
 from libnl.socket_ import nl_socket_set_buffer_size, nl_socket_get_local_port
 
 _LOGGER = logging.getLogger(__name__)
@@ -113,7 +114,7 @@ def nl_sendmsg(sk, msg, hdr):
         return -NLE_BAD_SOCK
     nlmsg_set_src(msg, sk.s_local)
     cb = sk.s_cb
-    if cb.cb_set[NL_CB_MSG_OUT]:
+    if cb.cb_set.get(NL_CB_MSG_OUT):
         ret = nl_cb_call(cb, NL_CB_MSG_OUT, msg)
         if ret != NL_OK:
             return ret
@@ -202,10 +203,118 @@ def nl_send(sk, msg):
     if cb.cb_send_ow:
         return cb.cb_send_ow(sk, msg)
     hdr = nlmsg_hdr(msg)
-    iov = hdr.bytearray[:hdr.nlmsg_len]
+    iov = nlmsg_iov(hdr, hdr.nlmsg_len)
     return nl_send_iovec(sk, msg, iov, 1)
 
 
+def nlmsg_iov(nlh, length):
+    """Zero-copy view of the first `length` bytes of a Netlink message, for passing to socket send functions.
+
+    Positional arguments:
+    nlh -- Netlink message header (nlmsghdr class instance).
+    length -- number of bytes (integer). Clamped to the size of the message buffer.
+
+    Returns:
+    memoryview instance.
+    """
+    buf = nlh.bytearray
+    if isinstance(buf, bytearray_ptr):
+        start = buf.slice.start
+        return memoryview(buf.pointee)[start:start + min(length, len(buf))]
+    return memoryview(buf)[:length]
+
+
+def nl_send_batch(sk, msgs):
+    """Transmit several Netlink messages, packing as many as fit into each datagram.
+
+    Messages are placed back to back, each padded to NLMSG_ALIGNTO, and handed to a single socket.sendmsg() call per
+    datagram as a scatter/gather list that references the message buffers without copying them. A datagram holds as
+    many messages as fit into the socket's send buffer. The kernel processes the messages of a datagram in order and
+    replies to each of them separately.
+
+    Like nl_send() this does *not* finalize the messages, see nl_complete_msg(). All messages must go to the same peer:
+    the peer address of the socket, or the destination set with nlmsg_set_dst(). Credentials are not supported. Both
+    are checked for every message before anything is sent. If a send override is installed with nl_cb_overwrite_send()
+    every message is sent with nl_send().
+
+    This function triggers the `NL_CB_MSG_OUT` callback for every message.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    msgs -- Netlink messages (list of nl_msg class instances).
+
+    Returns:
+    Number of bytes sent on success or a negative error code, -NLE_INVAL if the messages have different destinations.
+    Datagrams before the failing one have been sent.
+    """
+    if sk.s_cb.cb_send_ow:
+        total = 0
+        for msg in msgs:
+            ret = nl_send(sk, msg)
+            if ret < 0:
+                return ret
+            total += ret
+        return total
+    if sk.s_fd < 0:
+        return -NLE_BAD_SOCK
+    if not msgs:
+        return 0
+
+    peers = set()
+    for msg in msgs:
+        if nlmsg_get_creds(msg):
+            raise NotImplementedError  # TODO https://github.com/Robpol86/libnl/issues/2
+        dst = nlmsg_get_dst(msg)
+        peer = dst if dst.nl_family == socket.AF_NETLINK else sk.s_peer
+        peers.add((peer.nl_pid, peer.nl_groups))
+    if len(peers) > 1:
+        return -NLE_INVAL
+    address = peers.pop()
+    if address == (0, 0):
+        address = None
+    try:
+        max_size = sk.socket_instance.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF) - 32  # See netlink_sendmsg().
+    except OSError as exc:
+        return -nl_syserr2nlerr(exc.errno)
+
+    cb = sk.s_cb
+    total = 0
+    iovs, size, count = list(), 0, 0
+    for i, msg in enumerate(msgs):
+        nlmsg_set_src(msg, sk.s_local)
+        if cb.cb_set.get(NL_CB_MSG_OUT):
+            ret = nl_cb_call(cb, NL_CB_MSG_OUT, msg)
+            if ret != NL_OK:
+                return ret
+
+        hdr = nlmsg_hdr(msg)
+        length = NLMSG_ALIGN(hdr.nlmsg_len)
+        iov = nlmsg_iov(hdr, length)
+        iovs.append(iov)
+        if len(iov) < length:
+            iovs.append(bytearray(length - len(iov)))
+        size += length
+        count += 1
+
+        if i + 1 < len(msgs) and size + NLMSG_ALIGN(nlmsg_hdr(msgs[i + 1]).nlmsg_len) <= max_size:
+            continue  # Next message fits into the same datagram.
+        try:
+            if not hasattr(sk.socket_instance, 'sendmsg'):
+                iovs = [bytearray(b'').join(iovs)]
+                ret = sk.socket_instance.sendto(iovs[0], 0, address) if address else sk.socket_instance.send(iovs[0])
+            elif address:
+                ret = sk.socket_instance.sendmsg(iovs, [], 0, address)
+            else:
+                ret = sk.socket_instance.sendmsg(iovs)
+        except OSError as exc:
+            return -nl_syserr2nlerr(exc.errno)
+        _LOGGER.debug('sent %d bytes in %d messages', ret, count)
+        total += ret
+        iovs, size, count = list(), 0, 0
+
+    return total
+
+
 def nl_complete_msg(sk, msg):
     """Finalize Netlink message.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/nl.c#L450
@@ -281,23 +390,32 @@ def nl_send_simple(sk, type_, flags, buf=None, size=0):
     if buf is not None and size:
         err = nlmsg_append(msg, buf, size, NLMSG_ALIGNTO)
         if err < 0:
+            nlmsg_free(msg)
             return err
-    return nl_send_auto(sk, msg)
+    err = nl_send_auto(sk, msg)
+    nlmsg_free(msg)
+    return err
 
 
-def nl_recv(sk, nla, buf, creds=None):
+def nl_recv(sk, nla, buf, creds=None, offset=0, nonblock=False):
     """Receive data from Netlink socket.
     https://github.com/thom311/libnl/blob/libnl3_2_25/lib/nl.c#L625
 
     Receives data from a connected netlink socket using recvmsg() and returns the number of bytes read. The read data is
     stored in a newly allocated buffer that is assigned to `buf`. The peer's netlink address will be stored in `nla`.
 
+    Data is read into the socket's receive buffer (`sk.s_rxbuf`), which is allocated once and reused for every read. If
+    `buf` is None the data is left there, starting at `offset`, instead of being appended to `buf`, and is only valid
+    until the next read.
+
     This function blocks until data is available to be read unless the socket has been put into non-blocking mode using
     nl_socket_set_nonblocking() in which case this function will return immediately with a return value of 0.
 
     The buffer size used when reading from the netlink socket and thus limiting the maximum size of a netlink message
     that can be read defaults to the size of a memory page (getpagesize()). The buffer size can be modified on a per
-    socket level using the function `nl_socket_set_msg_buf_size()`.
+    socket level using the function `nl_socket_set_msg_buf_size()`. The receive buffer grows whenever the kernel reports
+    a truncated datagram, and keeps its new size for subsequent reads. If it cannot be resized because it is still
+    exported (e.g. to a memoryview of an NL_MSG_NOCOPY message), a larger buffer replaces it instead.
 
     If message peeking is enabled using nl_socket_enable_msg_peek() the size of the message to be read will be
     determined using the MSG_PEEK flag prior to performing the actual read. This leads to an additional recvmsg() call
@@ -311,44 +429,59 @@ def nl_recv(sk, nla, buf, creds=None):
     Positional arguments:
     sk -- Netlink socket (nl_sock class instance) (input).
     nla -- Netlink socket structure to hold address of peer (sockaddr_nl class instance) (output).
-    buf -- destination bytearray() for message content (output).
+    buf -- destination bytearray() for message content, or None to leave it in `sk.s_rxbuf` (output).
     creds -- destination class instance for credentials (ucred class instance) (output).
+    offset -- position in `sk.s_rxbuf` to read to, preserving the data before it (integer).
+    nonblock -- return -NLE_AGAIN instead of blocking if no data is available (boolean).
 
     Returns:
-    Two-item tuple. First item is number of bytes read, 0 on EOF, 0 on no data event (non-blocking mode), or a negative
-    error code. Second item is the message content from the socket or None.
+    Number of bytes read (length of `buf` if given), 0 on EOF, 0 on no data event (non-blocking mode), or a negative
+    error code.
     """
     flags = 0
     page_size = resource.getpagesize() * 4
     if sk.s_flags & NL_MSG_PEEK:
         flags |= socket.MSG_PEEK | socket.MSG_TRUNC
-    iov_len = sk.s_bufsize or page_size
+    nonblock_flag = socket.MSG_DONTWAIT if nonblock else 0
+    iov_len = max(sk.s_bufsize or page_size, len(sk.s_rxbuf) - offset)
 
     if creds and sk.s_flags & NL_SOCK_PASSCRED:
         raise NotImplementedError  # TODO https://github.com/Robpol86/libnl/issues/2
 
     while True:  # This is the `goto retry` implementation.
+        if len(sk.s_rxbuf) < offset + iov_len:
+            try:
+                sk.s_rxbuf.extend(bytearray(offset + iov_len - len(sk.s_rxbuf)))
+            except BufferError:  # Still exported (e.g. NL_MSG_NOCOPY data), leave it to its user.
+                rxbuf = bytearray(offset + iov_len)
+                rxbuf[:offset] = memoryview(sk.s_rxbuf)[:offset]
+                sk.s_rxbuf = rxbuf
+        iov = memoryview(sk.s_rxbuf)[offset:] if offset else sk.s_rxbuf
         try:
-            if hasattr(sk.socket_instance, 'recvmsg'):
-                iov, _, msg_flags, address = sk.socket_instance.recvmsg(iov_len, 0, flags)
+            if hasattr(sk.socket_instance, 'recvmsg_into'):
+                n, _, msg_flags, address = sk.socket_instance.recvmsg_into([iov], 0, flags | nonblock_flag)
             else:
-                iov, address = sk.socket_instance.recvfrom(iov_len, flags)
+                n, address = sk.socket_instance.recvfrom_into(iov, 0, flags | nonblock_flag)
                 msg_flags = 0
         except OSError as exc:
             if exc.errno == errno.EINTR:
                 continue  # recvmsg() returned EINTR, retrying.
             return -nl_syserr2nlerr(exc.errno)
+        finally:
+            del iov  # Release the memoryview so s_rxbuf can be resized.
         nla.nl_family = sk.socket_instance.family  # recvmsg() in C does this, but not Python's.
-        if not iov:
+        if not n:
             return 0
 
         if msg_flags & socket.MSG_CTRUNC:
             raise NotImplementedError  # TODO https://github.com/Robpol86/libnl/issues/2
 
-        if iov_len < len(iov) or msg_flags & socket.MSG_TRUNC:
+        if iov_len < n or msg_flags & socket.MSG_TRUNC:
             # Provided buffer is not long enough.
-            # Enlarge it to size of n (which should be total length of the message) and try again.
-            iov_len = len(iov)
+            # Enlarge it to size of n (which should be total length of the message) and try again. Without MSG_PEEK the
+            # kernel only reports the truncated length, so at least double the buffer.
+            iov_len = max(n, iov_len * 2)
+            _LOGGER.debug('nl_recv(0x%x): Enlarging receive buffer to %d bytes', id(sk), iov_len)
             continue
 
         if flags:
@@ -362,254 +495,300 @@ def nl_recv(sk, nla, buf, creds=None):
         if creds and sk.s_flags * NL_SOCK_PASSCRED:
             raise NotImplementedError  # TODO https://github.com/Robpol86/libnl/issues/2
 
-        if iov:
-            buf += iov
-
+        if buf is None:
+            return n
+        buf += memoryview(sk.s_rxbuf)[:n]
         return len(buf)
 
 
-def recvmsgs(sk, cb):
+def nl_recv_drain(sk, nla, n, creds=None):
+    """Read datagrams already queued on a Netlink socket behind the `n` bytes at the start of its receive buffer.
+
+    Reads without blocking until the socket has no more data or the socket's drain budgets (`sk.s_drain_msgs` datagrams,
+    counting the one already read, and `sk.s_drain_bytes` bytes) are used up. Each datagram is placed at the next
+    NLMSG_ALIGNTO boundary in `sk.s_rxbuf` and queued in `sk.s_rxpending` with its source address, starting with the
+    datagram already read (whose source is in `nla`). recvmsgs() dispatches the queue one datagram at a time and
+    leaves whatever it did not get to for its next call, so nothing is lost when a callback or an error ends it early.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance) (input).
+    nla -- Netlink socket structure to hold address of peer (sockaddr_nl class instance) (output).
+    n -- number of bytes already in `sk.s_rxbuf` (integer).
+    creds -- destination class instance for credentials (ucred class instance) (output).
+
+    Returns:
+    Total number of bytes in `sk.s_rxbuf` or a negative error code. Datagrams read before an error stay queued.
+    """
+    pending = sk.s_rxpending
+    pending.append((0, n, nla.nl_pid, nla.nl_groups))
+    while (not sk.s_drain_msgs or len(pending) < sk.s_drain_msgs) and (not sk.s_drain_bytes or n < sk.s_drain_bytes):
+        offset = NLMSG_ALIGN(n)
+        ret = nl_recv(sk, nla, None, creds, offset, True)
+        if ret == -NLE_AGAIN or not ret:
+            break
+        if ret < 0:
+            return ret
+        n = offset + ret
+        pending.append((offset, n, nla.nl_pid, nla.nl_groups))
+    _LOGGER.debug('nl_recv_drain(0x%x): Read %d datagrams', id(sk), len(pending))
+    return n
+
+
+_SKIP = object()  # Stage verdict: stop processing the current message and move on to the next one.
+_SEQ_EXPECT = None  # Stage marker: the message terminates a request, increment the expected sequence number.
+
+
+class _recvmsgs_state(object):
+    """Per-call bookkeeping shared by recvmsgs() and its dispatch stages."""
+    __slots__ = ('multipart', 'interrupted', 'nrecv')
+
+    def __init__(self):
+        self.multipart = 0
+        self.interrupted = 0
+        self.nrecv = 0
+
+
+def _stage_cb(cb, type_):
+    """Stage calling callback `type_`, mapping its return value the way recvmsgs() does for every callback."""
+    def stage(msg, _, state):
+        err = nl_cb_call(cb, type_, msg)  # NL_CB_CALL(cb, type_, msg)
+        if err == NL_OK:
+            return None
+        if err == NL_SKIP:
+            return _SKIP
+        if err == NL_STOP:
+            return -NLE_DUMP_INTR if state.interrupted else state.nrecv
+        return -NLE_DUMP_INTR if state.interrupted else (err or state.nrecv)
+    return stage
+
+
+def _stage_seq(sk, cb):
+    """Stage enforcing strict sequence number ordering when auto-ack mode is enabled."""
+    invalid = _stage_cb(cb, NL_CB_INVALID) if cb.cb_set.get(NL_CB_INVALID) else None
+
+    def stage(msg, hdr, state):
+        if hdr.nlmsg_seq == sk.s_seq_expect:
+            return None
+        if invalid:
+            return invalid(msg, hdr, state)
+        return -NLE_SEQ_MISMATCH
+    return stage
+
+
+def _stage_flags(cb):
+    """Stage acting on NLM_F_MULTI, NLM_F_DUMP_INTR and NLM_F_ACK."""
+    dump_intr = _stage_cb(cb, NL_CB_DUMP_INTR) if cb.cb_set.get(NL_CB_DUMP_INTR) else None
+    send_ack = _stage_cb(cb, NL_CB_SEND_ACK) if cb.cb_set.get(NL_CB_SEND_ACK) else None
+
+    def stage(msg, hdr, state):
+        flags = hdr.nlmsg_flags
+        if flags & NLM_F_MULTI:
+            state.multipart = 1
+        if flags & NLM_F_DUMP_INTR:
+            if dump_intr:
+                verdict = dump_intr(msg, hdr, state)
+                if verdict is not None:
+                    return verdict
+            else:
+                # We have to continue reading to clear all messages until a NLMSG_DONE is received and report the
+                # inconsistency.
+                state.interrupted = 1
+        if flags & NLM_F_ACK and send_ack:
+            # Other side wishes to see an ack for this message.
+            return send_ack(msg, hdr, state)
+        return None
+    return stage
+
+
+def _stage_done(cb):
+    """Stage for NLMSG_DONE, which terminates a multipart message. The user may overrule slipping out of the loop by
+    skipping this packet."""
+    finish = _stage_cb(cb, NL_CB_FINISH) if cb.cb_set.get(NL_CB_FINISH) else None
+
+    def stage(msg, hdr, state):
+        state.multipart = 0
+        if finish:
+            return finish(msg, hdr, state)
+        return None
+    return stage
+
+
+def _stage_overrun(_, __, state):
+    """Default for NLMSG_OVERRUN: data got lost, quit parsing."""
+    return -NLE_DUMP_INTR if state.interrupted else -NLE_MSG_OVERFLOW
+
+
+def _stage_error(cb, nla):
+    """Stage for NLMSG_ERROR messages, which carry a nlmsgerr."""
+    invalid = _stage_cb(cb, NL_CB_INVALID) if cb.cb_set.get(NL_CB_INVALID) else None
+    ack = _stage_cb(cb, NL_CB_ACK) if cb.cb_set.get(NL_CB_ACK) else None
+
+    def stage(msg, hdr, state):
+        e = nlmsgerr(nlmsg_data(hdr))
+        if hdr.nlmsg_len < nlmsg_size(e.SIZEOF):
+            # Truncated error message, the default action is to stop parsing. The user may overrule this action by
+            # returning NL_SKIP or NL_PROCEED (dangerous).
+            if invalid:
+                return invalid(msg, hdr, state)
+            return -NLE_DUMP_INTR if state.interrupted else -NLE_MSG_TRUNC
+        if e.error:
+            # Error message reported back from kernel.
+            if not cb.cb_err:
+                return -NLE_DUMP_INTR if state.interrupted else -nl_syserr2nlerr(e.error)
+            err = cb.cb_err(nla, e, cb.cb_err_arg)
+            if err < 0:
+                return -NLE_DUMP_INTR if state.interrupted else err
+            if err == NL_SKIP:
+                return _SKIP
+            if err == NL_STOP:
+                return -NLE_DUMP_INTR if state.interrupted else -nl_syserr2nlerr(e.error)
+            return None
+        if ack:
+            return ack(msg, hdr, state)
+        return None
+    return stage
+
+
+def recvmsgs_plan(sk, cb, nla):
+    """Compile the callbacks in `cb` into the stages recvmsgs() runs for each message.
+
+    Stages whose callback is not set and which have no default action are left out, so the per-message work only
+    depends on the callbacks actually in use. Each stage is called with (msg, hdr, state) and returns None to continue
+    with the next stage, _SKIP to move on to the next message, or the value recvmsgs() should return. The _SEQ_EXPECT
+    marker is handled by recvmsgs() itself.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    cb -- callbacks (nl_cb class instance).
+    nla -- peer address passed to the error callback (sockaddr_nl class instance).
+
+    Returns:
+    Tuple of a dictionary of stage tuples keyed by message type and the stage tuple for all other (valid) messages.
+    """
+    common = list()
+    # Raw callback is the first, it gives the most control to the user and he can do his very own parsing.
+    if cb.cb_set.get(NL_CB_MSG_IN):
+        common.append(_stage_cb(cb, NL_CB_MSG_IN))
+    if cb.cb_set.get(NL_CB_SEQ_CHECK):
+        # Sequence number checking. The check may be done by the user, otherwise a very simple check is applied
+        # enforcing strict ordering.
+        common.append(_stage_cb(cb, NL_CB_SEQ_CHECK))
+    elif not sk.s_flags & NL_NO_AUTO_ACK:
+        # Only do sequence checking if auto-ack mode is enabled.
+        common.append(_stage_seq(sk, cb))
+    # We can't check for !NLM_F_MULTI since some Netlink users in the kernel are broken.
+    control = common + [_SEQ_EXPECT, _stage_flags(cb)]
+    common.append(_stage_flags(cb))
+
+    plan = {
+        NLMSG_DONE: tuple(control + [_stage_done(cb)]),
+        NLMSG_NOOP: tuple(control + ([_stage_cb(cb, NL_CB_SKIPPED)] if cb.cb_set.get(NL_CB_SKIPPED) else [])),
+        NLMSG_OVERRUN: tuple(control + [
+            _stage_cb(cb, NL_CB_OVERRUN) if cb.cb_set.get(NL_CB_OVERRUN) else _stage_overrun
+        ]),
+        NLMSG_ERROR: tuple(control + [_stage_error(cb, nla)]),
+    }
+    # Valid message (not checking for MULTIPART bit to get along with broken kernels. NL_SKIP has no effect on this.
+    valid = tuple(common + ([_stage_cb(cb, NL_CB_VALID)] if cb.cb_set.get(NL_CB_VALID) else []))
+    return plan, valid
+
+
+def recvmsgs(sk, cb, state=None):
     """https://github.com/thom311/libnl/blob/libnl3_2_25/lib/nl.c#L775
 
-    This is where callbacks are called.
+    This is where callbacks are called. The callbacks are compiled into a per message type list of stages once per
+    call (see recvmsgs_plan()). With NL_MSG_RECYCLE set on the socket, messages are released with nlmsg_free() once
+    their callbacks returned (see nl_socket_enable_msg_recycle()). In drain mode, datagrams a previous call did not get
+    to (see nl_recv_drain()) are dispatched before reading from the socket again.
 
     Positional arguments:
     sk -- Netlink socket (nl_sock class instance).
     cb -- callbacks (nl_cb class instance).
 
+    Keyword arguments:
+    state -- keep the progress of a multipart reply here across calls (_recvmsgs_state class instance). Instead of
+        reading until the reply is complete, recvmsgs() then returns after every read and the next call with the same
+        `state` picks up where it left off. `state.multipart` is set while the reply is not complete.
+
     Returns:
     Number of bytes received or a negative error code.
     """
-    multipart = 0
-    interrupted = 0
-    nrecv = 0
-    buf = bytearray()
+    step = state is not None
+    state = state or _recvmsgs_state()
+    buf = bytearray() if cb.cb_recv_ow else None  # Without an override nl_recv() leaves data in sk.s_rxbuf.
+    convert = nlmsg_view if sk.s_flags & NL_MSG_NOCOPY else nlmsg_convert
+    release = nlmsg_free if sk.s_flags & NL_MSG_RECYCLE else (lambda _: None)
 
     # nla is passed on to not only to nl_recv() but may also be passed to a function pointer provided by the caller
     # which may or may not initialize the variable. Thomas Graf.
     nla = sockaddr_nl()
     creds = ucred()
+    plan, valid = recvmsgs_plan(sk, cb, nla)
+    msg = None
 
     while True:  # This is the `goto continue_reading` implementation.
-        _LOGGER.debug('Attempting to read from 0x%x', id(sk))
-        n = ctypes.c_int(cb.cb_recv_ow(sk, nla, buf, creds) if cb.cb_recv_ow else nl_recv(sk, nla, buf, creds))
-        if n.value <= 0:
-            return n.value
-
-        _LOGGER.debug('recvmsgs(0x%x): Read %d bytes', id(sk), n.value)
-
-        hdr = nlmsghdr(bytearray_ptr(buf))
-        while nlmsg_ok(hdr, n):
-            _LOGGER.debug('recvmsgs(0x%x): Processing valid message...', id(sk))
-            msg = nlmsg_convert(hdr)
-            nlmsg_set_proto(msg, sk.s_proto)
-            nlmsg_set_src(msg, nla)
-            if creds:
-                raise NotImplementedError  # nlmsg_set_creds(msg, creds)
-            nrecv += 1
-
-            # Raw callback is the first, it gives the most control to the user and he can do his very own parsing.
-            if cb.cb_set[NL_CB_MSG_IN]:
-                err = nl_cb_call(cb, NL_CB_MSG_IN, msg)  # NL_CB_CALL(cb, NL_CB_MSG_IN, msg)
-                if err == NL_OK:
-                    pass
-                elif err == NL_SKIP:
-                    hdr = nlmsg_next(hdr, n)
-                    continue
-                elif err == NL_STOP:
-                    return -NLE_DUMP_INTR if interrupted else nrecv
-                else:
-                    return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-
-            if cb.cb_set[NL_CB_SEQ_CHECK]:
-                # Sequence number checking. The check may be done by the user, otherwise a very simple check is applied
-                # enforcing strict ordering.
-                err = nl_cb_call(cb, NL_CB_SEQ_CHECK, msg)  # NL_CB_CALL(cb, NL_CB_SEQ_CHECK, msg)
-                if err == NL_OK:
-                    pass
-                elif err == NL_SKIP:
-                    hdr = nlmsg_next(hdr, n)
-                    continue
-                elif err == NL_STOP:
-                    return -NLE_DUMP_INTR if interrupted else nrecv
-                else:
-                    return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-            elif not sk.s_flags & NL_NO_AUTO_ACK:
-                # Only do sequence checking if auto-ack mode is enabled.
-                if hdr.nlmsg_seq != sk.s_seq_expect:
-                    if cb.cb_set[NL_CB_INVALID]:
-                        err = nl_cb_call(cb, NL_CB_INVALID, msg)  # NL_CB_CALL(cb, NL_CB_INVALID, msg)
-                        if err == NL_OK:
-                            pass
-                        elif err == NL_SKIP:
-                            hdr = nlmsg_next(hdr, n)
-                            continue
-                        elif err == NL_STOP:
-                            return -NLE_DUMP_INTR if interrupted else nrecv
-                        else:
-                            return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-                    else:
-                        return -NLE_SEQ_MISMATCH
-
-            if hdr.nlmsg_type in (NLMSG_DONE, NLMSG_ERROR, NLMSG_NOOP, NLMSG_OVERRUN):
-                # We can't check for !NLM_F_MULTI since some Netlink users in the kernel are broken.
-                sk.s_seq_expect += 1
-                _LOGGER.debug('recvmsgs(0x%x): Increased expected sequence number to %d', id(sk), sk.s_seq_expect)
-
-            if hdr.nlmsg_flags & NLM_F_MULTI:
-                multipart = 1
-
-            if hdr.nlmsg_flags & NLM_F_DUMP_INTR:
-                if cb.cb_set[NL_CB_DUMP_INTR]:
-                    err = nl_cb_call(cb, NL_CB_DUMP_INTR, msg)  # NL_CB_CALL(cb, NL_CB_DUMP_INTR, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-                else:
-                    # We have to continue reading to clear all messages until a NLMSG_DONE is received and report the
-                    # inconsistency.
-                    interrupted = 1
-
-            if hdr.nlmsg_flags & NLM_F_ACK:
-                # Other side wishes to see an ack for this message.
-                if cb.cb_set[NL_CB_SEND_ACK]:
-                    err = nl_cb_call(cb, NL_CB_SEND_ACK, msg)  # NL_CB_CALL(cb, NL_CB_SEND_ACK, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-
-            if hdr.nlmsg_type == NLMSG_DONE:
-                # Messages terminates a multipart message, this is usually the end of a message and therefore we slip
-                # out of the loop by default. the user may overrule this action by skipping this packet.
-                multipart = 0
-                if cb.cb_set[NL_CB_FINISH]:
-                    err = nl_cb_call(cb, NL_CB_FINISH, msg)  # NL_CB_CALL(cb, NL_CB_FINISH, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-            elif hdr.nlmsg_type == NLMSG_NOOP:
-                # Message to be ignored, the default action is to skip this message if no callback is specified. The
-                # user may overrule this action by returning NL_PROCEED.
-                if cb.cb_set[NL_CB_SKIPPED]:
-                    err = nl_cb_call(cb, NL_CB_SKIPPED, msg)  # NL_CB_CALL(cb, NL_CB_SKIPPED, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-                else:
-                    hdr = nlmsg_next(hdr, n)
-                    continue
-            elif hdr.nlmsg_type == NLMSG_OVERRUN:
-                # Data got lost, report back to user. The default action is to quit parsing. The user may overrule this
-                # action by retuning NL_SKIP or NL_PROCEED (dangerous).
-                if cb.cb_set[NL_CB_OVERRUN]:
-                    err = nl_cb_call(cb, NL_CB_OVERRUN, msg)  # NL_CB_CALL(cb, NL_CB_OVERRUN, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-                else:
-                    return -NLE_DUMP_INTR if interrupted else -NLE_MSG_OVERFLOW
-            elif hdr.nlmsg_type == NLMSG_ERROR:
-                # Message carries a nlmsgerr.
-                e = nlmsgerr(nlmsg_data(hdr))
-                if hdr.nlmsg_len < nlmsg_size(e.SIZEOF):
-                    # Truncated error message, the default action is to stop parsing. The user may overrule this action
-                    # by returning NL_SKIP or NL_PROCEED (dangerous).
-                    if cb.cb_set[NL_CB_INVALID]:
-                        err = nl_cb_call(cb, NL_CB_INVALID, msg)  # NL_CB_CALL(cb, NL_CB_INVALID, msg)
-                        if err == NL_OK:
-                            pass
-                        elif err == NL_SKIP:
-                            hdr = nlmsg_next(hdr, n)
-                            continue
-                        elif err == NL_STOP:
-                            return -NLE_DUMP_INTR if interrupted else nrecv
-                        else:
-                            return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else -NLE_MSG_TRUNC
-                elif e.error:
-                    # Error message reported back from kernel.
-                    if cb.cb_err:
-                        err = cb.cb_err(nla, e, cb.cb_err_arg)
-                        if err < 0:
-                            return -NLE_DUMP_INTR if interrupted else err
-                        elif err == NL_SKIP:
-                            hdr = nlmsg_next(hdr, n)
-                            continue
-                        elif err == NL_STOP:
-                            return -NLE_DUMP_INTR if interrupted else -nl_syserr2nlerr(e.error)
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else -nl_syserr2nlerr(e.error)
-                elif cb.cb_set[NL_CB_ACK]:
-                    err = nl_cb_call(cb, NL_CB_ACK, msg)  # NL_CB_CALL(cb, NL_CB_ACK, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
-                        continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
+        pending = sk.s_rxpending if buf is None else None
+        if not pending:
+            _LOGGER.debug('Attempting to read from 0x%x', id(sk))
+            n = ctypes.c_int(cb.cb_recv_ow(sk, nla, buf, creds) if cb.cb_recv_ow else nl_recv(sk, nla, buf, creds))
+            if n.value > 0 and buf is None and sk.s_flags & NL_RECV_DRAIN:
+                n.value = nl_recv_drain(sk, nla, n.value, creds)
+            if n.value <= 0:
+                return n.value
+            _LOGGER.debug('recvmsgs(0x%x): Read %d bytes', id(sk), n.value)
+
+        while True:  # Drained datagrams are dispatched one at a time, each with its own source address.
+            if pending:
+                start, stop, nla.nl_pid, nla.nl_groups = pending.popleft()
+                n = ctypes.c_int(stop - start)
+                hdr = nlmsghdr(bytearray_ptr(sk.s_rxbuf, start, stop))
             else:
-                # Valid message (not checking for MULTIPART bit to get along with broken kernels. NL_SKIP has no effect
-                # on this.
-                if cb.cb_set[NL_CB_VALID]:
-                    err = nl_cb_call(cb, NL_CB_VALID, msg)  # NL_CB_CALL(cb, NL_CB_VALID, msg)
-                    if err == NL_OK:
-                        pass
-                    elif err == NL_SKIP:
-                        hdr = nlmsg_next(hdr, n)
+                hdr = nlmsghdr(bytearray_ptr(sk.s_rxbuf if buf is None else buf, 0, n.value))
+            while nlmsg_ok(hdr, n):
+                _LOGGER.debug('recvmsgs(0x%x): Processing valid message...', id(sk))
+                release(msg)
+                msg = convert(hdr)
+                nlmsg_set_proto(msg, sk.s_proto)
+                nlmsg_set_src(msg, nla)
+                if creds:
+                    raise NotImplementedError  # nlmsg_set_creds(msg, creds)
+                state.nrecv += 1
+
+                for stage in plan.get(hdr.nlmsg_type, valid):
+                    if stage is _SEQ_EXPECT:
+                        sk.s_seq_expect += 1
+                        _LOGGER.debug('recvmsgs(0x%x): Increased expected sequence number to %d', id(sk),
+                                      sk.s_seq_expect)
                         continue
-                    elif err == NL_STOP:
-                        return -NLE_DUMP_INTR if interrupted else nrecv
-                    else:
-                        return -NLE_DUMP_INTR if interrupted else (err or nrecv)
-
-            hdr = nlmsg_next(hdr, n)
-
-        del buf[:]
+                    verdict = stage(msg, hdr, state)
+                    if verdict is None:
+                        continue
+                    if verdict is _SKIP:
+                        break
+                    release(msg)
+                    return verdict
+
+                hdr = nlmsg_next(hdr, n)
+            if not pending:
+                break
+
+        release(msg)
+        msg = None
+        if buf is not None:
+            del buf[:]
         creds = None
 
-        if multipart:
+        if state.multipart:
+            if step:
+                return state.nrecv
             # Multipart message not yet complete, continue reading.
             continue
 
         err = 0
-        if interrupted:
+        if state.interrupted:
             return -NLE_DUMP_INTR
         if not err:
-            err = nrecv
+            err = state.nrecv
         return err
 
 
@@ -705,3 +884,61 @@ def nl_wait_for_ack(sk):
     cb = nl_cb_clone(sk.s_cb)
     nl_cb_set(cb, NL_CB_ACK, NL_CB_CUSTOM, lambda *_: NL_STOP, None)
     return int(nl_recvmsgs(sk, cb))
+
+
+def nl_dump_iter(sk, msg):
+    """Send a request and yield the messages of the reply as they arrive.
+
+    Sends `msg` with nl_send_auto() and then runs recvmsgs() one read at a time with a clone of the socket's callbacks,
+    so memory use is bounded by the size of a datagram (or of a drain mode batch) regardless of the size of the dump.
+    Iteration stops after NLMSG_DONE, after the ACK of a non-dump request, or (with auto-ack disabled) after the first
+    datagram of a non-multipart reply.
+
+    Nothing is sent until the first message is requested with next(). NL_CB_VALID, NL_CB_FINISH and NL_CB_ACK are used
+    by the iterator, the other callbacks of the socket apply as they do in nl_recvmsgs(). Yielded messages are
+    independent copies, unless NL_MSG_NOCOPY is set on the socket in which case they are views into the receive buffer
+    that are only valid until the next message is requested. Abandoning the iterator early leaves the rest of the reply
+    queued on the socket.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    msg -- Netlink message to send (nl_msg class instance).
+
+    Returns:
+    Generator yielding Netlink messages (nl_msg class instances). Raises NLError on send or receive errors, on error
+    replies from the kernel, on sequence number mismatches and on interrupted dumps.
+    """
+    err = nl_send_auto(sk, msg)
+    if err < 0:
+        raise NLError(err)
+    auto_ack = not sk.s_flags & NL_NO_AUTO_ACK
+    replies, finished = list(), list()
+
+    def on_valid(reply, _):
+        nlmsg_get(reply)  # Keep it past recvmsgs() releasing its reference.
+        replies.append(reply)
+        return NL_OK
+
+    def on_finish(*_):
+        finished.append(True)
+        return NL_OK
+
+    def on_ack(*_):
+        finished.append(True)
+        return NL_STOP
+
+    cb = nl_cb_clone(sk.s_cb)
+    nl_cb_set(cb, NL_CB_VALID, NL_CB_CUSTOM, on_valid, None)
+    nl_cb_set(cb, NL_CB_FINISH, NL_CB_CUSTOM, on_finish, None)
+    nl_cb_set(cb, NL_CB_ACK, NL_CB_CUSTOM, on_ack, None)
+    state = _recvmsgs_state()
+
+    while True:
+        err = recvmsgs(sk, cb, state)
+        if err < 0:
+            raise NLError(err)
+        for reply in replies:
+            yield reply
+        del replies[:]
+        if not err or finished or not (state.multipart or auto_ack):
+            return
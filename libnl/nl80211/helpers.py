@@ -1,29 +1,12 @@
 """Convenience methods for nl80211."""
 
 from datetime import timedelta
+import collections
 
 from libnl.nl80211 import nl80211
 from libnl.nl80211 import iw_scan
-import libnl.attr
-
-
-def _get(out_parsed, in_bss, key, parser_func):
-    """Handles calling the parser function to convert bytearray data into Python data types.
-
-    Positional arguments:
-    out_parsed -- dictionary to update with parsed data and string keys.
-    in_bss -- dictionary of integer keys and bytearray values.
-    key -- key string to lookup (must be a variable name in libnl.nl80211.nl80211).
-    parser_func -- function to call, with the bytearray data as the only argument.
-    """
-    short_key = key[12:].lower()
-    key_integer = getattr(nl80211, key)
-    if in_bss.get(key_integer) is None:
-        return dict()
-    data = parser_func(in_bss[key_integer])
-    if parser_func == libnl.attr.nla_data:
-        data = data[:libnl.attr.nla_len(in_bss[key_integer])]
-    out_parsed[short_key] = data
+from libnl.nl80211.iw_util import get_ssid
+from libnl.nl80211.schema import bss_schema
 
 
 def _fetch(in_parsed, *keys):
@@ -45,31 +28,106 @@ def _fetch(in_parsed, *keys):
     return None
 
 
-def parse_bss(bss):
+def _capability_names(data, frequency):
+    """Names of the capability bits of a BSS.
+
+    Positional arguments:
+    data -- NL80211_BSS_CAPABILITY bitmask (integer).
+    frequency -- frequency of the BSS in MHz, DMG (60 GHz) BSSes use other bits (integer).
+
+    Returns:
+    List of strings.
+    """
+    # http://git.kernel.org/cgit/linux/kernel/git/jberg/iw.git/tree/scan.c?id=v3.17#n1479
+    list_of_caps = list()
+    if frequency > 45000:
+        if data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_AP:
+            list_of_caps.append('DMG_ESS')
+        elif data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_PBSS:
+            list_of_caps.append('DMG_PCP')
+        elif data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_IBSS:
+            list_of_caps.append('DMG_IBSS')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_CBAP_ONLY:
+            list_of_caps.append('CBAP_Only')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_CBAP_SOURCE:
+            list_of_caps.append('CBAP_Src')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_PRIVACY:
+            list_of_caps.append('Privacy')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_ECPAC:
+            list_of_caps.append('ECPAC')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_SPECTRUM_MGMT:
+            list_of_caps.append('SpectrumMgmt')
+        if data & iw_scan.WLAN_CAPABILITY_DMG_RADIO_MEASURE:
+            list_of_caps.append('RadioMeasure')
+    else:
+        if data & iw_scan.WLAN_CAPABILITY_ESS:
+            list_of_caps.append('ESS')
+        if data & iw_scan.WLAN_CAPABILITY_IBSS:
+            list_of_caps.append('IBSS')
+        if data & iw_scan.WLAN_CAPABILITY_CF_POLLABLE:
+            list_of_caps.append('CfPollable')
+        if data & iw_scan.WLAN_CAPABILITY_CF_POLL_REQUEST:
+            list_of_caps.append('CfPollReq')
+        if data & iw_scan.WLAN_CAPABILITY_PRIVACY:
+            list_of_caps.append('Privacy')
+        if data & iw_scan.WLAN_CAPABILITY_SHORT_PREAMBLE:
+            list_of_caps.append('ShortPreamble')
+        if data & iw_scan.WLAN_CAPABILITY_PBCC:
+            list_of_caps.append('PBCC')
+        if data & iw_scan.WLAN_CAPABILITY_CHANNEL_AGILITY:
+            list_of_caps.append('ChannelAgility')
+        if data & iw_scan.WLAN_CAPABILITY_SPECTRUM_MGMT:
+            list_of_caps.append('SpectrumMgmt')
+        if data & iw_scan.WLAN_CAPABILITY_QOS:
+            list_of_caps.append('QoS')
+        if data & iw_scan.WLAN_CAPABILITY_SHORT_SLOT_TIME:
+            list_of_caps.append('ShortSlotTime')
+        if data & iw_scan.WLAN_CAPABILITY_APSD:
+            list_of_caps.append('APSD')
+        if data & iw_scan.WLAN_CAPABILITY_RADIO_MEASURE:
+            list_of_caps.append('RadioMeasure')
+        if data & iw_scan.WLAN_CAPABILITY_DSSS_OFDM:
+            list_of_caps.append('DSSS-OFDM')
+        if data & iw_scan.WLAN_CAPABILITY_DEL_BACK:
+            list_of_caps.append('DelayedBACK')
+        if data & iw_scan.WLAN_CAPABILITY_IMM_BACK:
+            list_of_caps.append('ImmediateBACK')
+    return list_of_caps
+
+
+def _status_name(status):
+    """Name of an NL80211_BSS_STATUS_* value (string)."""
+    if status == nl80211.NL80211_BSS_STATUS_AUTHENTICATED:
+        return 'authenticated'
+    if status == nl80211.NL80211_BSS_STATUS_ASSOCIATED:
+        return 'associated'
+    if status == nl80211.NL80211_BSS_STATUS_IBSS_JOINED:
+        return 'joined'
+    return 'unknown status: {0}'.format(status)
+
+
+def parse_bss(bss, wanted=None):
     """Parses data prepared by nla_parse() and nla_parse_nested() into Python-friendly formats.
 
     Automatically chooses the right data-type for each attribute and converts it into Python integers, strings, unicode,
     etc objects.
 
     Positional arguments:
-    bss -- dictionary with integer keys and nlattr values.
+    bss -- dictionary with integer keys and nlattr values, nla_view class instance or bss_schema record.
+
+    Keyword arguments:
+    wanted -- information elements to decode, passed to iw_scan.get_ies() (set). Keys derived from elements that are
+        not decoded (e.g. 'ssid' without element 0) hold their default value.
 
     Returns:
     New dictionary with the same integer keys and converted values. Excludes null/empty data from `bss`.
     """
-    # First parse data into Python data types. Weed out empty values.
-    intermediate = dict()
-    _get(intermediate, bss, 'NL80211_BSS_BSSID', libnl.attr.nla_data)  # MAC address of access point.
-    _get(intermediate, bss, 'NL80211_BSS_FREQUENCY', libnl.attr.nla_get_u32)  # Frequency in MHz.
-    _get(intermediate, bss, 'NL80211_BSS_TSF', libnl.attr.nla_get_msecs)  # Timing Synchronization Function.
-    _get(intermediate, bss, 'NL80211_BSS_BEACON_INTERVAL', libnl.attr.nla_get_u16)
-    _get(intermediate, bss, 'NL80211_BSS_CAPABILITY', libnl.attr.nla_get_u16)
-    _get(intermediate, bss, 'NL80211_BSS_INFORMATION_ELEMENTS', libnl.attr.nla_data)
-    _get(intermediate, bss, 'NL80211_BSS_SIGNAL_MBM', libnl.attr.nla_get_u32)
-    _get(intermediate, bss, 'NL80211_BSS_SIGNAL_UNSPEC', libnl.attr.nla_get_u8)
-    _get(intermediate, bss, 'NL80211_BSS_STATUS', libnl.attr.nla_get_u32)
-    _get(intermediate, bss, 'NL80211_BSS_SEEN_MS_AGO', libnl.attr.nla_get_u32)
-    _get(intermediate, bss, 'NL80211_BSS_BEACON_IES', libnl.attr.nla_data)
+    # First decode data into Python data types. Weed out missing values.
+    record = bss if isinstance(bss, bss_schema.record) else bss_schema.decode_tb(bss)
+    intermediate = dict((k, v) for k, v in zip(record._fields, record) if v is not None)
+    for key in ('bssid', 'information_elements', 'beacon_ies'):
+        if key in intermediate:
+            intermediate[key] = bytearray(intermediate[key])
 
     # Parse easy data into final Python types.
     parsed = dict()
@@ -82,88 +140,25 @@ def parse_bss(bss):
     if 'beacon_interval' in intermediate:
         parsed['beacon_interval'] = intermediate['beacon_interval']
     if 'signal_mbm' in intermediate:
-        data_u32 = intermediate['signal_mbm']
-        data_s32 = -(data_u32 & 0x80000000) + (data_u32 & 0x7fffffff)
-        parsed['signal_mbm'] = data_s32 / 100.0
+        parsed['signal_mbm'] = intermediate['signal_mbm'] / 100.0
     if 'signal_unspec' in intermediate:
         parsed['signal_unspec'] = intermediate['signal_unspec'] / 100.0
     if 'seen_ms_ago' in intermediate:
         parsed['seen_ms_ago'] = timedelta(milliseconds=intermediate['seen_ms_ago'])
 
     # Handle status.
-    if intermediate.get('status') == nl80211.NL80211_BSS_STATUS_AUTHENTICATED:
-        parsed['status'] = 'authenticated'
-    elif intermediate.get('status') == nl80211.NL80211_BSS_STATUS_ASSOCIATED:
-        parsed['status'] = 'associated'
-    elif intermediate.get('status') == nl80211.NL80211_BSS_STATUS_IBSS_JOINED:
-        parsed['status'] = 'joined'
-    elif 'status' in intermediate:
-        parsed['status'] = 'unknown status: {0}'.format(intermediate['status'])
+    if 'status' in intermediate:
+        parsed['status'] = _status_name(intermediate['status'])
 
     # Handle capability.
     if 'capability' in intermediate:
-        # http://git.kernel.org/cgit/linux/kernel/git/jberg/iw.git/tree/scan.c?id=v3.17#n1479
-        data = intermediate['capability']
-        list_of_caps = list()
-        if parsed['frequency'] > 45000:
-            if data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_AP:
-                list_of_caps.append('DMG_ESS')
-            elif data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_PBSS:
-                list_of_caps.append('DMG_PCP')
-            elif data & iw_scan.WLAN_CAPABILITY_DMG_TYPE_MASK == iw_scan.WLAN_CAPABILITY_DMG_TYPE_IBSS:
-                list_of_caps.append('DMG_IBSS')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_CBAP_ONLY:
-                list_of_caps.append('CBAP_Only')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_CBAP_SOURCE:
-                list_of_caps.append('CBAP_Src')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_PRIVACY:
-                list_of_caps.append('Privacy')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_ECPAC:
-                list_of_caps.append('ECPAC')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_SPECTRUM_MGMT:
-                list_of_caps.append('SpectrumMgmt')
-            if data & iw_scan.WLAN_CAPABILITY_DMG_RADIO_MEASURE:
-                list_of_caps.append('RadioMeasure')
-        else:
-            if data & iw_scan.WLAN_CAPABILITY_ESS:
-                list_of_caps.append('ESS')
-            if data & iw_scan.WLAN_CAPABILITY_IBSS:
-                list_of_caps.append('IBSS')
-            if data & iw_scan.WLAN_CAPABILITY_CF_POLLABLE:
-                list_of_caps.append('CfPollable')
-            if data & iw_scan.WLAN_CAPABILITY_CF_POLL_REQUEST:
-                list_of_caps.append('CfPollReq')
-            if data & iw_scan.WLAN_CAPABILITY_PRIVACY:
-                list_of_caps.append('Privacy')
-            if data & iw_scan.WLAN_CAPABILITY_SHORT_PREAMBLE:
-                list_of_caps.append('ShortPreamble')
-            if data & iw_scan.WLAN_CAPABILITY_PBCC:
-                list_of_caps.append('PBCC')
-            if data & iw_scan.WLAN_CAPABILITY_CHANNEL_AGILITY:
-                list_of_caps.append('ChannelAgility')
-            if data & iw_scan.WLAN_CAPABILITY_SPECTRUM_MGMT:
-                list_of_caps.append('SpectrumMgmt')
-            if data & iw_scan.WLAN_CAPABILITY_QOS:
-                list_of_caps.append('QoS')
-            if data & iw_scan.WLAN_CAPABILITY_SHORT_SLOT_TIME:
-                list_of_caps.append('ShortSlotTime')
-            if data & iw_scan.WLAN_CAPABILITY_APSD:
-                list_of_caps.append('APSD')
-            if data & iw_scan.WLAN_CAPABILITY_RADIO_MEASURE:
-                list_of_caps.append('RadioMeasure')
-            if data & iw_scan.WLAN_CAPABILITY_DSSS_OFDM:
-                list_of_caps.append('DSSS-OFDM')
-            if data & iw_scan.WLAN_CAPABILITY_DEL_BACK:
-                list_of_caps.append('DelayedBACK')
-            if data & iw_scan.WLAN_CAPABILITY_IMM_BACK:
-                list_of_caps.append('ImmediateBACK')
-        parsed['capability'] = list_of_caps
+        parsed['capability'] = _capability_names(intermediate['capability'], parsed['frequency'])
 
     # Handle (beacon) information elements.
     for k in ('information_elements', 'beacon_ies'):
         if k not in intermediate:
             continue
-        parsed[k] = iw_scan.get_ies(intermediate[k])
+        parsed[k] = iw_scan.get_ies(intermediate[k], wanted)
 
     # Make some data more human-readable.
     parsed['signal'] = parsed.get('signal_mbm', parsed.get('signal_unspec'))
@@ -173,3 +168,192 @@ def parse_bss(bss):
     parsed['extended_supported_rates'] = _fetch(parsed, 'Extended supported rates')
     parsed['channel_width'] = _fetch(parsed, 'HT operation', 'STA channel width')
     return parsed
+
+
+_bss_record_fields = ('bssid', 'frequency', 'signal_mbm', 'signal_unspec', 'capability', 'tsf', 'beacon_interval',
+                      'seen_ms_ago', 'status', 'ssid')
+
+
+class bss_record(collections.namedtuple('bss_record', _bss_record_fields)):
+    """Compact record of a BSS holding raw numeric values, see parse_bss_record().
+
+    Fields of missing attributes are None. Human readable values (as returned by parse_bss()) are computed on demand by
+    the properties.
+
+    Instance variables:
+    bssid -- MAC address of the access point as a 48 bit integer.
+    frequency -- frequency in MHz (integer).
+    signal_mbm -- signal strength in mBm, i.e. 100 * dBm (signed integer).
+    signal_unspec -- signal strength in unspecified units, scaled to 0..100 (integer).
+    capability -- NL80211_BSS_CAPABILITY bitmask (integer).
+    tsf -- Timing Synchronization Function in microseconds (integer).
+    beacon_interval -- beacon interval in TUs (integer).
+    seen_ms_ago -- milliseconds since the BSS was last seen (integer).
+    status -- NL80211_BSS_STATUS_* association status (integer).
+    ssid -- raw SSID, or mesh ID for mesh BSSes (bytes).
+    """
+
+    __slots__ = ()
+
+    @property
+    def bssid_str(self):
+        """MAC address of the access point, colon separated (string)."""
+        if self.bssid is None:
+            return None
+        return ':'.join(format((self.bssid >> shift) & 0xff, '02x') for shift in range(40, -8, -8))
+
+    @property
+    def signal(self):
+        """Signal strength in dBm, or in unspecified units if the driver does not report dBm (float)."""
+        if self.signal_mbm is not None:
+            return self.signal_mbm / 100.0
+        if self.signal_unspec is not None:
+            return self.signal_unspec / 100.0
+        return None
+
+    @property
+    def capability_names(self):
+        """Names of the capability bits (list of strings)."""
+        if self.capability is None:
+            return None
+        return _capability_names(self.capability, self.frequency)
+
+    @property
+    def status_name(self):
+        """Association status (string)."""
+        return None if self.status is None else _status_name(self.status)
+
+    @property
+    def ssid_str(self):
+        """SSID with non printable characters escaped like iw does (string)."""
+        return '' if self.ssid is None else get_ssid(None, bytearray(self.ssid))
+
+
+def _ie_data(ies, key):
+    """Raw payload of the first information element of a type, or None if it is missing."""
+    for found, pos, len_ in iw_scan.each_ie(ies, 0, len(ies)):
+        if found == key:
+            return bytes(ies[pos + 2:pos + 2 + len_])
+    return None
+
+
+def _raw_ssid(record):
+    """First non-empty SSID (or else mesh ID) of the information elements, then of the beacon IEs."""
+    fallback = None
+    for key in (0, 114):
+        for ies in (record.information_elements, record.beacon_ies):
+            data = None if ies is None else _ie_data(bytearray(ies), key)
+            if data:
+                return data
+            if fallback is None:
+                fallback = data
+    return fallback
+
+
+def parse_bss_record(bss):
+    """Converts BSS attributes into a compact bss_record with raw numeric values.
+
+    Unlike parse_bss() nothing is formatted and information elements are not decoded, apart from locating the SSID.
+    Records are small tuples, suitable for keeping large numbers of scan results in memory.
+
+    Positional arguments:
+    bss -- dictionary with integer keys and nlattr values, nla_view class instance or bss_schema record.
+
+    Returns:
+    bss_record class instance.
+    """
+    record = bss if isinstance(bss, bss_schema.record) else bss_schema.decode_tb(bss)
+    bssid = None
+    if record.bssid is not None:
+        bssid = 0
+        for octet in bytearray(record.bssid[:6]):
+            bssid = (bssid << 8) | octet
+    return bss_record(bssid, record.frequency, record.signal_mbm, record.signal_unspec, record.capability, record.tsf,
+                      record.beacon_interval, record.seen_ms_ago, record.status, _raw_ssid(record))
+
+
+bss_delta = collections.namedtuple('bss_delta', ('added', 'changed', 'removed'))
+
+
+class bss_table(object):
+    """BSSes seen by one or more wireless interfaces, merged incrementally from successive scan dumps.
+
+    Entries are bss_record class instances keyed by (wiphy, BSSID). merge() takes the records of one complete
+    NL80211_CMD_GET_SCAN dump and reports what changed since the previous one. Changes of the fields in `volatile`
+    (by default the TSF and the time since the BSS was last seen) update the stored record silently.
+
+    Keyword arguments:
+    max_age_ms -- entries last seen longer ago than this are dropped, None keeps them while the kernel reports them
+        (integer).
+    volatile -- fields ignored when looking for changes (iterable of strings).
+
+    Instance variables:
+    max_age_ms -- maximum NL80211_BSS_SEEN_MS_AGO of kept entries (integer or None).
+    volatile -- fields ignored when looking for changes (frozenset).
+    entries -- bss_record class instances by (wiphy, BSSID) tuple (dict).
+    """
+
+    def __init__(self, max_age_ms=30000, volatile=('tsf', 'seen_ms_ago')):
+        self.max_age_ms = max_age_ms
+        self.volatile = frozenset(volatile)
+        self.entries = dict()
+        self._compared = [i for i, f in enumerate(bss_record._fields) if f not in self.volatile]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} entries={2} max_age_ms={3}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            len(self.entries), self.max_age_ms,
+        )
+        return answer
+
+    def _changed_fields(self, old, new):
+        return tuple(bss_record._fields[i] for i in self._compared if old[i] != new[i])
+
+    def merge(self, records, wiphy=None):
+        """Merge the BSSes of a complete scan dump of one wiphy into the table.
+
+        Entries of `wiphy` missing from the dump, or seen longer than `max_age_ms` ago, are removed. Entries of other
+        wiphys are left alone.
+
+        Positional arguments:
+        records -- scan results (iterable of bss_record class instances, see parse_bss_record()).
+
+        Keyword arguments:
+        wiphy -- wiphy index of the dump, e.g. NL80211_ATTR_WIPHY (integer).
+
+        Returns:
+        bss_delta namedtuple: lists of added records, of (record, changed field names) tuples and of removed records.
+        """
+        added, changed, removed = list(), list(), list()
+        entries, max_age_ms = self.entries, self.max_age_ms
+        seen = set()
+        for record in records:
+            if record.bssid is None:
+                continue
+            key = (wiphy, record.bssid)
+            if max_age_ms is not None and record.seen_ms_ago is not None and record.seen_ms_ago > max_age_ms:
+                continue
+            seen.add(key)
+            old = entries.get(key)
+            entries[key] = record
+            if old is None:
+                added.append(record)
+                continue
+            fields = self._changed_fields(old, record)
+            if fields:
+                changed.append((record, fields))
+        for key in [k for k in entries if k[0] == wiphy and k not in seen]:
+            removed.append(entries.pop(key))
+        return bss_delta(added, changed, removed)
+
+    def clear(self):
+        """Drop all entries."""
+        self.entries.clear()
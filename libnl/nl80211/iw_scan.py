@@ -19,10 +19,13 @@ ACTION OF CONTRACT, NEGLIGENCE OR OTHER TORTIOUS ACTION, ARISING OUT OF
 OR IN CONNECTION WITH THE USE OR PERFORMANCE OF THIS SOFTWARE.
 """
 
+import collections
 import ctypes
+import hashlib
+import sys
 
-from libnl.attr import nla_policy, NLA_U32, NLA_U64, NLA_U16, NLA_U8
-from libnl.misc import SIZEOF_U8, SIZEOF_S8
+from libnl.attr import nla_policy, nla_policy_compile, NLA_U32, NLA_U64, NLA_U16, NLA_U8
+from libnl.misc import SIZEOF_U8, SIZEOF_S8, bytearray_ptr
 from libnl.nl80211 import nl80211
 from libnl.nl80211.iw_util import get_ssid, get_ht_capability, get_ht_mcs, ampdu_space
 
@@ -67,6 +70,7 @@ country_env_str = lambda e: {'I': 'Indoor only', 'O': 'Outdoor only', ' ': 'Indo
 wifi_wps_dev_passwd_id = lambda e: {0: 'Default (PIN)', 1: 'User-specified', 2: 'Machine-specified', 3: 'Rekey',
                                     4: 'PushButton', 5: 'Registrar-specified'}.get(e, '??')
 ht_secondary_offset = ('no secondary', 'above', '[reserved!]', 'below')
+_MEMORYVIEW_OF_INTS = sys.version_info >= (3,)  # Python 2 memoryviews yield 1 byte strings, printers expect integers.
 
 
 class ieee80211_country_ie_triplet(object):
@@ -216,7 +220,7 @@ def get_rsn_ie(defcipher, defauth, data):
 
     count = data[0] | (data[1] << 8)
     if 2 + (count * 4) > len(data):
-        answers['bogus tail data'] = data
+        answers['bogus tail data'] = bytearray(data)
         return answers
     answers['pairwise_ciphers'] = ' '.join(get_cipher(data[2 + (i * 4):]) for i in range(count))
     data = data[2 + (count * 4):]
@@ -226,7 +230,7 @@ def get_rsn_ie(defcipher, defauth, data):
         return answers
     count = data[0] | (data[1] << 8)
     if 2 + (count * 4) > len(data):
-        answers['bogus tail data'] = data
+        answers['bogus tail data'] = bytearray(data)
         return answers
     answers['authentication_suites'] = ' '.join(get_auth(data[2 + (i * 4):]) for i in range(count))
     data = data[2 + (count * 4):]
@@ -570,7 +574,7 @@ def get_ie(instance, key, data):
     if len(data) < instance.minlen or len(data) > instance.maxlen:
         if data:
             return {'<invalid: {0} byte(s)>'.format(len(data)): ' '.join(format(x, '02x') for x in data)}
-        return {'<invalid: no data>': data}
+        return {'<invalid: no data>': bytearray(data)}
     return {instance.name: instance.print_(key, data)}
 
 
@@ -677,7 +681,7 @@ def get_wifi_wps(_, data):
         elif subtype == 0x104a:
             answers['Version'] = data[4] >> 4, data[4] & 0xF
         elif subtype == 0x1011:
-            answers['Device name'] = data[4:sublen + 4]
+            answers['Device name'] = bytearray(data[4:sublen + 4])
         elif subtype == 0x1012:
             if sublen != 2:
                 answers['Device Password ID'] = 'invalid length %d'.format(sublen)
@@ -685,11 +689,11 @@ def get_wifi_wps(_, data):
                 id_ = data[4] << 8 | data[5]
                 answers['Device Password ID'] = (id_, wifi_wps_dev_passwd_id(id_))
         elif subtype == 0x1021:
-            answers['Manufacturer'] = data[4:sublen + 4]
+            answers['Manufacturer'] = bytearray(data[4:sublen + 4])
         elif subtype == 0x1023:
-            answers['Model'] = data[4:sublen + 4]
+            answers['Model'] = bytearray(data[4:sublen + 4])
         elif subtype == 0x1024:
-            answers['Model Number'] = data[4:sublen + 4]
+            answers['Model Number'] = bytearray(data[4:sublen + 4])
         elif subtype == 0x103b:
             val = data[4]
             answers['Response Type'] = (val, 'AP' if val == 3 else '')
@@ -698,7 +702,7 @@ def get_wifi_wps(_, data):
         elif subtype == 0x1041:
             answers['Selected Registrar'] = data[4]
         elif subtype == 0x1042:
-            answers['Serial Number'] = data[4:sublen + 4]
+            answers['Serial Number'] = bytearray(data[4:sublen + 4])
         elif subtype == 0x1044:
             val = data[4]
             answers['Wi-Fi Protected Setup State'] = (val, {1: 'Unconfigured', 2: 'Configured'}.get(val, ''))
@@ -794,28 +798,175 @@ def get_vendor(data):
     return {unknown_key: unknown_value}
 
 
-def get_ies(ie):
+class ie_cache(object):
+    """Least recently used cache of decoded information elements.
+
+    Access points send the same information elements scan after scan. get_ies() keeps what it decoded here, keyed by
+    a SHA-1 digest of the raw elements and the `wanted` filter, and only decodes elements it has not seen recently.
+    Callers get a copy of the cached dictionary, so changing it does not change the cache.
+
+    Keyword arguments:
+    max_size -- maximum number of decoded element blobs kept (integer).
+
+    Instance variables:
+    max_size -- maximum number of decoded element blobs kept, 0 disables the cache (integer).
+    hits -- number of lookups answered from the cache (integer).
+    misses -- number of lookups that had to decode (integer).
+    evictions -- number of entries dropped to stay within `max_size` (integer).
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} max_size={2} entries={3} hits={4} misses={5} evictions={6}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.max_size, len(self._entries), self.hits, self.misses, self.evictions,
+        )
+        return answer
+
+    def get(self, key):
+        """Look up decoded elements and mark them as most recently used.
+
+        Positional arguments:
+        key -- digest of the raw elements and the filter (tuple).
+
+        Returns:
+        Copy of the decoded elements (dict) or None if they are not cached.
+        """
+        answers = self._entries.pop(key, None)
+        if answers is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries[key] = answers
+        return _copy_answers(answers)
+
+    def put(self, key, answers):
+        """Keep a copy of decoded elements, evicting the least recently used entries if the cache is full.
+
+        Positional arguments:
+        key -- digest of the raw elements and the filter (tuple).
+        answers -- decoded elements (dict).
+        """
+        if self.max_size <= 0:
+            return
+        self._entries.pop(key, None)
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._entries[key] = _copy_answers(answers)
+
+    def clear(self):
+        """Drop all cached entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def _copy_answers(value):
+    """Copy the mutable containers of decoded elements, immutable values are shared."""
+    if isinstance(value, dict):
+        return dict((k, _copy_answers(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_copy_answers(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_answers(v) for v in value)
+    if isinstance(value, bytearray):
+        return bytearray(value)
+    return value
+
+
+ies_cache = ie_cache()
+
+
+def each_ie(buf, pos, end):
+    """Yield the ID, offset and payload length of each information element stored from `pos` to `end` in `buf`.
+
+    The walk stops like iw's does, when fewer bytes are left than the element header or its length byte claims. The
+    payload of element `key` at `offset` is `buf[offset + 2:min(offset + 2 + len_, end)]`.
+
+    Positional arguments:
+    buf -- bytearray holding the information elements.
+    pos -- position of the first information element in `buf` (integer).
+    end -- end of the information elements in `buf` (integer).
+
+    Returns:
+    Generator yielding (key, offset, len_) tuples of integers.
+    """
+    while end - pos >= 2 and end - pos >= buf[pos + 1]:
+        len_ = buf[pos + 1]
+        yield buf[pos], pos, len_
+        pos += len_ + 2
+
+
+def _vendor_wanted(wanted, buf, pos, end):
+    """Return True if the element at `pos` is a vendor specific element with its (OUI, type) tuple in `wanted`."""
+    if buf[pos] != 221 or buf[pos + 1] < 4 or end - pos < 6:
+        return False
+    return (bytes(buf[pos + 2:pos + 5]), buf[pos + 5]) in wanted
+
+
+def get_ies(ie, wanted=None):
     """http://git.kernel.org/cgit/linux/kernel/git/jberg/iw.git/tree/scan.c?id=v3.17#n1456
 
+    Information elements are walked by offset. On Python 3 each printer gets a memoryview of its element instead of a
+    copy, data kept in the returned dictionary is copied out of it.
+
+    Decoded elements are kept in `ies_cache`, identical elements seen again are copied from there instead.
+
+    With `wanted`, only the listed elements are decoded and everything else is skipped without being formatted. It
+    holds element IDs (e.g. 48 for RSN) and, for vendor specific elements, (OUI, type) tuples such as (ms_oui, 1) for
+    WPA. Element ID 221 selects all vendor specific elements.
+
     Positional arguments:
-    ie -- bytearray data to read.
+    ie -- bytearray data to read (bytearray or bytearray_ptr).
+
+    Keyword arguments:
+    wanted -- element IDs and (OUI bytes, type integer) tuples to decode, None decodes all elements (set).
 
     Returns:
     Dictionary of all parsed data. In the iw tool it prints everything to terminal. This function returns a dictionary
     with string keys (being the "titles" of data printed by iw), and data values (integers/strings/etc).
     """
+    if isinstance(ie, bytearray_ptr):
+        buf, pos, end = ie.pointee, ie.slice.start, ie.slice.start + len(ie)
+    else:
+        buf, pos, end = ie, 0, len(ie)
+    if ies_cache.max_size <= 0:
+        return _get_ies(buf, pos, end, wanted)
+    key = (hashlib.sha1(memoryview(buf)[pos:end]).digest(), None if wanted is None else frozenset(wanted))
+    answers = ies_cache.get(key)
+    if answers is None:
+        answers = _get_ies(buf, pos, end, wanted)
+        ies_cache.put(key, answers)
+    return answers
+
+
+def _get_ies(buf, pos, end, wanted):
+    """Decode the information elements stored from `pos` to `end` in `buf`, see get_ies()."""
+    view = memoryview(buf) if _MEMORYVIEW_OF_INTS else buf
     answers = dict()
-    while len(ie) >= 2 and len(ie) >= ie[1]:
-        key = ie[0]  # Should be key in `ieprinters` dict.
-        len_ = ie[1]  # Length of this information element.
-        data = ie[2:len_ + 2]  # Data for this information element.
+    for key, pos, len_ in each_ie(buf, pos, end):  # Key should be in `ieprinters` dict.
+        if wanted is not None and key not in wanted and not _vendor_wanted(wanted, buf, pos, end):
+            continue
+        data = view[pos + 2:min(pos + 2 + len_, end)]  # Data for this information element.
         if key in ieprinters and ieprinters[key].flags & 1:
             answers.update(get_ie(ieprinters[key], key, data))
         elif key == 221:
             answers.update(get_vendor(data))
         else:
             answers['Unknown IE ({0})'.format(key)] = ' '.join(format(x, '02x') for x in data)
-        ie = ie[len_ + 2:]
     return answers
 
 
@@ -836,3 +987,4 @@ bss_policy.update({  # http://git.kernel.org/cgit/linux/kernel/git/jberg/iw.git/
     nl80211.NL80211_BSS_BEACON_TSF: nla_policy(),
     nl80211.NL80211_BSS_PRESP_DATA: nla_policy(),
 })
+bss_policy = nla_policy_compile(bss_policy)
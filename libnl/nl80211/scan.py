@@ -0,0 +1,203 @@
+"""Event driven scanning: trigger a scan, wait for it to complete and dump the results.
+
+The "scan" multicast group of nl80211 reports the end of every scan with NL80211_CMD_NEW_SCAN_RESULTS or
+NL80211_CMD_SCAN_ABORTED. nl80211_scan() sends NL80211_CMD_TRIGGER_SCAN and then waits for that notification with
+select() and a deadline, routing the trigger's ACK and the notifications through an nl_mux. If another scan is already
+running on the wiphy the kernel refuses the trigger with EBUSY; the scan is then triggered again as soon as the running
+one ends (on any interface of the wiphy), instead of after a fixed delay. The wiphy can also be busy with something that
+sends no scan notification, so the trigger is retried after a short interval if no notification arrives. The results
+are fetched with NL80211_CMD_GET_SCAN once the scan completed.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+import logging
+import select
+import time
+
+from libnl.attr import nla_nest_end, nla_nest_start, nla_put, nla_put_u32, nla_view
+from libnl.errno_ import NLE_AGAIN, NLE_BUSY, NLE_INTR, NLE_OBJ_NOTFOUND
+from libnl.error import NLError
+from libnl.genl.ctrl import genl_ctrl_resolve, genl_ctrl_resolve_grp
+from libnl.genl.genl import genlmsg_attrdata, genlmsg_attrlen, genlmsg_put
+from libnl.linux_private.genetlink import genlmsghdr
+from libnl.linux_private.netlink import NLM_F_DUMP
+from libnl.msg import nlmsg_alloc, nlmsg_data, nlmsg_hdr
+from libnl.mux import nl_mux
+from libnl.nl80211 import nl80211
+from libnl.nl80211.helpers import parse_bss_record
+from libnl.nl80211.iw_scan import bss_policy
+from libnl.socket_ import nl_socket_add_membership, nl_socket_drop_membership
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def nl80211_scan_msg(driver_id, if_index, freqs=None, ssids=None):
+    """Build an NL80211_CMD_TRIGGER_SCAN request.
+
+    Positional arguments:
+    driver_id -- nl80211 family ID from genl_ctrl_resolve() (integer).
+    if_index -- interface index (integer).
+
+    Keyword arguments:
+    freqs -- frequencies in MHz to scan, None scans all channels (iterable of integers).
+    ssids -- SSIDs to probe for, None sends a wildcard probe only (iterable of bytes).
+
+    Returns:
+    Netlink message (nl_msg class instance).
+    """
+    msg = nlmsg_alloc()
+    genlmsg_put(msg, 0, 0, driver_id, 0, 0, nl80211.NL80211_CMD_TRIGGER_SCAN, 0)
+    nla_put_u32(msg, nl80211.NL80211_ATTR_IFINDEX, if_index)
+    nest = nla_nest_start(msg, nl80211.NL80211_ATTR_SCAN_SSIDS)
+    for i, ssid in enumerate([b''] if ssids is None else ssids, 1):
+        nla_put(msg, i, len(ssid), bytearray(ssid))
+    nla_nest_end(msg, nest)
+    if freqs is not None:
+        nest = nla_nest_start(msg, nl80211.NL80211_ATTR_SCAN_FREQUENCIES)
+        for i, freq in enumerate(freqs, 1):
+            nla_put_u32(msg, i, freq)
+        nla_nest_end(msg, nest)
+    return msg
+
+
+def _attrs(msg):
+    """Top level attributes of an nl80211 message (nla_view class instance) and its command (integer)."""
+    gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(msg)))
+    return nla_view(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), nl80211.NL80211_ATTR_MAX), gnlh.cmd
+
+
+def _poll(mux, until, deadline):
+    """Receive on the multiplexed socket until `until()` is true. Returns False if `deadline` passed before that."""
+    fd = mux.sk.socket_instance.fileno()
+    while not until():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        if not select.select([fd], [], [], remaining)[0]:
+            continue
+        err = mux.receive()
+        if err < 0 and err != -NLE_AGAIN:
+            raise NLError(err)
+    return True
+
+
+def _flush(mux):
+    """Process the messages already queued on the multiplexed socket without blocking."""
+    fd = mux.sk.socket_instance.fileno()
+    while select.select([fd], [], [], 0)[0]:
+        err = mux.receive()
+        if err < 0 and err != -NLE_AGAIN:
+            raise NLError(err)
+        if not err:
+            break
+
+
+def _wait(mux, until, deadline):
+    """Like _poll(), but raises NLError(NLE_AGAIN) once `deadline` passed."""
+    if not _poll(mux, until, deadline):
+        raise NLError(NLE_AGAIN)
+
+
+def nl80211_scan(sk, if_index, driver_id=None, mcid=None, wiphy=None, timeout=10.0, retry_interval=1.0, freqs=None,
+                 ssids=None, parser=parse_bss_record):
+    """Trigger a scan, wait until it completes and return its results.
+
+    Triggering scans requires root privileges. The socket joins the nl80211 "scan" multicast group for the duration of
+    the call.
+
+    Positional arguments:
+    sk -- Generic Netlink socket (nl_sock class instance, from genl_connect()).
+    if_index -- interface index (integer).
+
+    Keyword arguments:
+    driver_id -- nl80211 family ID, resolved with genl_ctrl_resolve() if None (integer).
+    mcid -- nl80211 "scan" multicast group ID, resolved with genl_ctrl_resolve_grp() if None (integer).
+    wiphy -- index of the interface's wiphy, looked up with NL80211_CMD_GET_INTERFACE if None (integer).
+    timeout -- seconds to wait for the scan, including waiting for a scan already running on the wiphy (float).
+    retry_interval -- seconds to wait for the wiphy to report the end of a running scan before triggering again after
+        EBUSY (float).
+    freqs -- frequencies in MHz to scan, None scans all channels (iterable of integers).
+    ssids -- SSIDs to probe for, None sends a wildcard probe only (iterable of bytes).
+    parser -- called with the nla_view of each BSS's attributes to build the results (callable).
+
+    Returns:
+    List of `parser` results, one per BSS. Raises NLError on errors: NLE_AGAIN if the scan did not complete within
+    `timeout`, NLE_INTR if the kernel aborted it, or the error of the failed request.
+    """
+    deadline = time.time() + timeout
+    if driver_id is None:
+        driver_id = genl_ctrl_resolve(sk, b'nl80211')
+    if mcid is None:
+        mcid = genl_ctrl_resolve_grp(sk, b'nl80211', b'scan')
+    for ret in (driver_id, mcid):
+        if ret < 0:
+            raise NLError(ret)
+
+    ret = nl_socket_add_membership(sk, mcid)
+    if ret < 0:
+        raise NLError(ret)
+    try:
+        mux = nl_mux(sk)
+        if wiphy is None:
+            msg = nlmsg_alloc()
+            genlmsg_put(msg, 0, 0, driver_id, 0, 0, nl80211.NL80211_CMD_GET_INTERFACE, 0)
+            nla_put_u32(msg, nl80211.NL80211_ATTR_IFINDEX, if_index)
+            request = mux.send(msg)
+            _wait(mux, lambda: request.done, deadline)
+            if request.error < 0:
+                raise NLError(request.error)
+            for reply in request.replies:
+                wiphy = _attrs(reply)[0].u32(nl80211.NL80211_ATTR_WIPHY)
+            if wiphy is None:
+                raise NLError(NLE_OBJ_NOTFOUND)
+        events = list()
+
+        def on_event(msg):
+            attrs, cmd = _attrs(msg)
+            if cmd not in (nl80211.NL80211_CMD_NEW_SCAN_RESULTS, nl80211.NL80211_CMD_SCAN_ABORTED):
+                return
+            if attrs.u32(nl80211.NL80211_ATTR_WIPHY) == wiphy or attrs.u32(nl80211.NL80211_ATTR_IFINDEX) == if_index:
+                events.append(cmd)
+        mux.add_listener(on_event)
+
+        while True:
+            # Notifications queued so far belong to earlier scans. Once the trigger succeeded no other scan runs on the
+            # wiphy, so later ones belong to this scan, even if they arrive together with the ACK.
+            _flush(mux)
+            del events[:]
+            _LOGGER.debug('Sending NL80211_CMD_TRIGGER_SCAN for interface %d', if_index)
+            request = mux.send(nl80211_scan_msg(driver_id, if_index, freqs, ssids), keep_replies=False)
+            _wait(mux, lambda: request.done, deadline)
+            if request.error == 0:
+                _wait(mux, lambda: events, deadline)
+                break
+            if request.error != -NLE_BUSY:
+                raise NLError(request.error)
+            if not _poll(mux, lambda: events, min(deadline, time.time() + retry_interval)) and time.time() >= deadline:
+                raise NLError(NLE_AGAIN)
+            _LOGGER.debug('Wiphy %d was busy, triggering again', wiphy)
+        if events[0] == nl80211.NL80211_CMD_SCAN_ABORTED:
+            raise NLError(NLE_INTR)
+
+        msg = nlmsg_alloc()
+        genlmsg_put(msg, 0, 0, driver_id, 0, NLM_F_DUMP, nl80211.NL80211_CMD_GET_SCAN, 0)
+        nla_put_u32(msg, nl80211.NL80211_ATTR_IFINDEX, if_index)
+        _LOGGER.debug('Sending NL80211_CMD_GET_SCAN for interface %d', if_index)
+        request = mux.send(msg)
+        _wait(mux, lambda: request.done, deadline)
+        if request.error < 0:
+            raise NLError(request.error)
+    finally:
+        nl_socket_drop_membership(sk, mcid)
+
+    results = list()
+    for reply in request.replies:
+        bss = _attrs(reply)[0].nested(nl80211.NL80211_ATTR_BSS, nl80211.NL80211_BSS_MAX)
+        if bss is None or bss.validate(bss_policy):
+            continue
+        results.append(parser(bss))
+    return results
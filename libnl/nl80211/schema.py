@@ -0,0 +1,108 @@
+"""Attribute schemas of nl80211 (see libnl.schema).
+
+bss_schema describes the NL80211_BSS_* attributes nested in NL80211_ATTR_BSS (scan results), sta_info_schema the
+NL80211_STA_INFO_* attributes nested in NL80211_ATTR_STA_INFO (station dumps) and nl80211_schema the top level
+NL80211_ATTR_* attributes of wiphy, interface, station and scan messages.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+from libnl.attr import NLA_FLAG, NLA_NESTED, NLA_STRING, NLA_U16, NLA_U32, NLA_U64, NLA_U8, NLA_UNSPEC
+from libnl.nl80211 import nl80211
+from libnl.schema import NLA_S32, NLA_S8, nla_schema
+
+bss_schema = nla_schema('bss', {
+    nl80211.NL80211_BSS_BSSID: ('bssid', NLA_UNSPEC),
+    nl80211.NL80211_BSS_FREQUENCY: ('frequency', NLA_U32),
+    nl80211.NL80211_BSS_TSF: ('tsf', NLA_U64),
+    nl80211.NL80211_BSS_BEACON_INTERVAL: ('beacon_interval', NLA_U16),
+    nl80211.NL80211_BSS_CAPABILITY: ('capability', NLA_U16),
+    nl80211.NL80211_BSS_INFORMATION_ELEMENTS: ('information_elements', NLA_UNSPEC),
+    nl80211.NL80211_BSS_SIGNAL_MBM: ('signal_mbm', NLA_S32),
+    nl80211.NL80211_BSS_SIGNAL_UNSPEC: ('signal_unspec', NLA_U8),
+    nl80211.NL80211_BSS_STATUS: ('status', NLA_U32),
+    nl80211.NL80211_BSS_SEEN_MS_AGO: ('seen_ms_ago', NLA_U32),
+    nl80211.NL80211_BSS_BEACON_IES: ('beacon_ies', NLA_UNSPEC),
+    nl80211.NL80211_BSS_CHAN_WIDTH: ('chan_width', NLA_U32),
+    nl80211.NL80211_BSS_BEACON_TSF: ('beacon_tsf', NLA_U64),
+    nl80211.NL80211_BSS_PRESP_DATA: ('presp_data', NLA_FLAG),
+})
+
+
+rate_info_schema = nla_schema('rate_info', {
+    nl80211.NL80211_RATE_INFO_BITRATE: ('bitrate', NLA_U16),
+    nl80211.NL80211_RATE_INFO_MCS: ('mcs', NLA_U8),
+    nl80211.NL80211_RATE_INFO_40_MHZ_WIDTH: ('width_40_mhz', NLA_FLAG),
+    nl80211.NL80211_RATE_INFO_SHORT_GI: ('short_gi', NLA_FLAG),
+    nl80211.NL80211_RATE_INFO_BITRATE32: ('bitrate32', NLA_U32),
+    nl80211.NL80211_RATE_INFO_VHT_MCS: ('vht_mcs', NLA_U8),
+    nl80211.NL80211_RATE_INFO_VHT_NSS: ('vht_nss', NLA_U8),
+    nl80211.NL80211_RATE_INFO_80_MHZ_WIDTH: ('width_80_mhz', NLA_FLAG),
+    nl80211.NL80211_RATE_INFO_80P80_MHZ_WIDTH: ('width_80p80_mhz', NLA_FLAG),
+    nl80211.NL80211_RATE_INFO_160_MHZ_WIDTH: ('width_160_mhz', NLA_FLAG),
+})
+
+
+sta_info_schema = nla_schema('sta_info', {
+    nl80211.NL80211_STA_INFO_INACTIVE_TIME: ('inactive_time', NLA_U32),
+    nl80211.NL80211_STA_INFO_RX_BYTES: ('rx_bytes', NLA_U32),
+    nl80211.NL80211_STA_INFO_TX_BYTES: ('tx_bytes', NLA_U32),
+    nl80211.NL80211_STA_INFO_LLID: ('llid', NLA_U16),
+    nl80211.NL80211_STA_INFO_PLID: ('plid', NLA_U16),
+    nl80211.NL80211_STA_INFO_PLINK_STATE: ('plink_state', NLA_U8),
+    nl80211.NL80211_STA_INFO_SIGNAL: ('signal', NLA_S8),
+    nl80211.NL80211_STA_INFO_TX_BITRATE: ('tx_bitrate', NLA_NESTED, rate_info_schema),
+    nl80211.NL80211_STA_INFO_RX_PACKETS: ('rx_packets', NLA_U32),
+    nl80211.NL80211_STA_INFO_TX_PACKETS: ('tx_packets', NLA_U32),
+    nl80211.NL80211_STA_INFO_TX_RETRIES: ('tx_retries', NLA_U32),
+    nl80211.NL80211_STA_INFO_TX_FAILED: ('tx_failed', NLA_U32),
+    nl80211.NL80211_STA_INFO_SIGNAL_AVG: ('signal_avg', NLA_S8),
+    nl80211.NL80211_STA_INFO_RX_BITRATE: ('rx_bitrate', NLA_NESTED, rate_info_schema),
+    nl80211.NL80211_STA_INFO_BSS_PARAM: ('bss_param', NLA_NESTED),
+    nl80211.NL80211_STA_INFO_CONNECTED_TIME: ('connected_time', NLA_U32),
+    nl80211.NL80211_STA_INFO_STA_FLAGS: ('sta_flags', NLA_UNSPEC),
+    nl80211.NL80211_STA_INFO_BEACON_LOSS: ('beacon_loss', NLA_U32),
+    nl80211.NL80211_STA_INFO_T_OFFSET: ('t_offset', NLA_U64),
+    nl80211.NL80211_STA_INFO_LOCAL_PM: ('local_pm', NLA_U32),
+    nl80211.NL80211_STA_INFO_PEER_PM: ('peer_pm', NLA_U32),
+    nl80211.NL80211_STA_INFO_NONPEER_PM: ('nonpeer_pm', NLA_U32),
+    nl80211.NL80211_STA_INFO_RX_BYTES64: ('rx_bytes64', NLA_U64),
+    nl80211.NL80211_STA_INFO_TX_BYTES64: ('tx_bytes64', NLA_U64),
+    nl80211.NL80211_STA_INFO_CHAIN_SIGNAL: ('chain_signal', NLA_NESTED),
+    nl80211.NL80211_STA_INFO_CHAIN_SIGNAL_AVG: ('chain_signal_avg', NLA_NESTED),
+    nl80211.NL80211_STA_INFO_EXPECTED_THROUGHPUT: ('expected_throughput', NLA_U32),
+})
+
+
+nl80211_schema = nla_schema('nl80211', {
+    nl80211.NL80211_ATTR_WIPHY: ('wiphy', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_NAME: ('wiphy_name', NLA_STRING),
+    nl80211.NL80211_ATTR_IFINDEX: ('ifindex', NLA_U32),
+    nl80211.NL80211_ATTR_IFNAME: ('ifname', NLA_STRING),
+    nl80211.NL80211_ATTR_IFTYPE: ('iftype', NLA_U32),
+    nl80211.NL80211_ATTR_MAC: ('mac', NLA_UNSPEC),
+    nl80211.NL80211_ATTR_STA_INFO: ('sta_info', NLA_NESTED, sta_info_schema),
+    nl80211.NL80211_ATTR_WIPHY_BANDS: ('wiphy_bands', NLA_NESTED),
+    nl80211.NL80211_ATTR_WIPHY_FREQ: ('wiphy_freq', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_CHANNEL_TYPE: ('wiphy_channel_type', NLA_U32),
+    nl80211.NL80211_ATTR_GENERATION: ('generation', NLA_U32),
+    nl80211.NL80211_ATTR_BSS: ('bss', NLA_NESTED, bss_schema),
+    nl80211.NL80211_ATTR_SSID: ('ssid', NLA_UNSPEC),
+    nl80211.NL80211_ATTR_WIPHY_RETRY_SHORT: ('wiphy_retry_short', NLA_U8),
+    nl80211.NL80211_ATTR_WIPHY_RETRY_LONG: ('wiphy_retry_long', NLA_U8),
+    nl80211.NL80211_ATTR_WIPHY_FRAG_THRESHOLD: ('wiphy_frag_threshold', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_RTS_THRESHOLD: ('wiphy_rts_threshold', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_COVERAGE_CLASS: ('wiphy_coverage_class', NLA_U8),
+    nl80211.NL80211_ATTR_WIPHY_TX_POWER_LEVEL: ('wiphy_tx_power_level', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_ANTENNA_TX: ('wiphy_antenna_tx', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_ANTENNA_RX: ('wiphy_antenna_rx', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_ANTENNA_AVAIL_TX: ('wiphy_antenna_avail_tx', NLA_U32),
+    nl80211.NL80211_ATTR_WIPHY_ANTENNA_AVAIL_RX: ('wiphy_antenna_avail_rx', NLA_U32),
+    nl80211.NL80211_ATTR_WDEV: ('wdev', NLA_U64),
+    nl80211.NL80211_ATTR_CHANNEL_WIDTH: ('channel_width', NLA_U32),
+    nl80211.NL80211_ATTR_CENTER_FREQ1: ('center_freq1', NLA_U32),
+    nl80211.NL80211_ATTR_CENTER_FREQ2: ('center_freq2', NLA_U32),
+})
@@ -0,0 +1,45 @@
+"""Links (Network Devices) (lib/route/link.c).
+https://github.com/thom311/libnl/blob/libnl3_2_25/lib/route/link.c
+
+link_schema describes the IFLA_* attributes following the ifinfomsg header of RTM_NEWLINK messages, as declared by
+link_policy in C.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+from libnl.attr import NLA_NESTED, NLA_STRING, NLA_U32, NLA_U8, NLA_UNSPEC
+from libnl.linux_private import if_link
+from libnl.schema import nla_schema
+
+link_schema = nla_schema('link', {
+    if_link.IFLA_ADDRESS: ('address', NLA_UNSPEC),
+    if_link.IFLA_BROADCAST: ('broadcast', NLA_UNSPEC),
+    if_link.IFLA_IFNAME: ('ifname', NLA_STRING),
+    if_link.IFLA_MTU: ('mtu', NLA_U32),
+    if_link.IFLA_LINK: ('link', NLA_U32),
+    if_link.IFLA_QDISC: ('qdisc', NLA_STRING),
+    if_link.IFLA_STATS: ('stats', NLA_UNSPEC),
+    if_link.IFLA_MASTER: ('master', NLA_U32),
+    if_link.IFLA_TXQLEN: ('txqlen', NLA_U32),
+    if_link.IFLA_MAP: ('map', NLA_UNSPEC),
+    if_link.IFLA_WEIGHT: ('weight', NLA_U32),
+    if_link.IFLA_OPERSTATE: ('operstate', NLA_U8),
+    if_link.IFLA_LINKMODE: ('linkmode', NLA_U8),
+    if_link.IFLA_LINKINFO: ('linkinfo', NLA_NESTED),
+    if_link.IFLA_NET_NS_PID: ('net_ns_pid', NLA_U32),
+    if_link.IFLA_IFALIAS: ('ifalias', NLA_STRING),
+    if_link.IFLA_NUM_VF: ('num_vf', NLA_U32),
+    if_link.IFLA_STATS64: ('stats64', NLA_UNSPEC),
+    if_link.IFLA_AF_SPEC: ('af_spec', NLA_NESTED),
+    if_link.IFLA_GROUP: ('group', NLA_U32),
+    if_link.IFLA_NET_NS_FD: ('net_ns_fd', NLA_U32),
+    if_link.IFLA_PROMISCUITY: ('promiscuity', NLA_U32),
+    if_link.IFLA_NUM_TX_QUEUES: ('num_tx_queues', NLA_U32),
+    if_link.IFLA_NUM_RX_QUEUES: ('num_rx_queues', NLA_U32),
+    if_link.IFLA_CARRIER: ('carrier', NLA_U8),
+    if_link.IFLA_PHYS_PORT_ID: ('phys_port_id', NLA_UNSPEC),
+    if_link.IFLA_CARRIER_CHANGES: ('carrier_changes', NLA_U32),
+})
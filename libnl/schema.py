@@ -0,0 +1,206 @@
+"""Declarative attribute schemas and generated decoders.
+
+A family declares its attributes once, as attribute type -> (name, data type, nested schema), e.g.:
+
+    bss_schema = nla_schema('bss', {
+        NL80211_BSS_BSSID: ('bssid', NLA_UNSPEC),
+        NL80211_BSS_FREQUENCY: ('frequency', NLA_U32),
+    })
+
+nla_schema then builds a record class (a namedtuple with one field per attribute) and a decoder specialized for the
+schema: a table indexed by attribute type holding the record slot and payload converter of each attribute. Decoding
+walks the attribute stream once with struct.unpack_from() and converts each known attribute straight from the buffer,
+without creating nlattr instances or dictionaries. Missing attributes are None in the record.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+import collections
+import struct
+
+from libnl.attr import (NLA_FLAG, NLA_MSECS, NLA_NESTED, NLA_STRING, NLA_TYPE_MAX, NLA_U16, NLA_U32, NLA_U64, NLA_U8,
+                        NLA_UNSPEC)
+from libnl.linux_private.netlink import NLA_ALIGN, NLA_HDRLEN, NLA_TYPE_MASK
+from libnl.misc import bytearray_ptr
+
+NLA_NESTED_ARRAY = NLA_TYPE_MAX + 1  # Nested attributes, each one a container decoded with the nested schema.
+NLA_S8 = NLA_TYPE_MAX + 2  # 8 bit signed integer.
+NLA_S16 = NLA_TYPE_MAX + 3  # 16 bit signed integer.
+NLA_S32 = NLA_TYPE_MAX + 4  # 32 bit signed integer.
+NLA_S64 = NLA_TYPE_MAX + 5  # 64 bit signed integer.
+
+_NLA_HDR = struct.Struct('=HH')
+_NLA_STRUCTS = {NLA_U8: struct.Struct('=B'), NLA_U16: struct.Struct('=H'), NLA_U32: struct.Struct('=I'),
+                NLA_U64: struct.Struct('=Q'), NLA_MSECS: struct.Struct('=Q'), NLA_S8: struct.Struct('=b'),
+                NLA_S16: struct.Struct('=h'), NLA_S32: struct.Struct('=i'), NLA_S64: struct.Struct('=q')}
+
+
+def _integer(codec):
+    unpack_from, size = codec.unpack_from, codec.size
+    return lambda buf, offset, len_: None if len_ < size else unpack_from(buf, offset)[0]
+
+
+def _string(buf, offset, len_):
+    end = buf.find(b'\0', offset, offset + len_)
+    return bytes(buf[offset:offset + len_ if end < 0 else end])
+
+
+def _unspec(buf, offset, len_):
+    return bytes(buf[offset:offset + len_])
+
+
+def _flag(*_):
+    return True
+
+
+def _each(buf, offset, len_):
+    """Yield the payload offset and length of each attribute of a stream."""
+    rem = min(len_, len(buf) - offset)
+    while rem >= NLA_HDRLEN:
+        length = _NLA_HDR.unpack_from(buf, offset)[0]
+        if length < NLA_HDRLEN or length > rem:
+            break
+        yield offset + NLA_HDRLEN, length - NLA_HDRLEN
+        totlen = NLA_ALIGN(length)
+        offset += totlen
+        rem -= totlen
+
+
+class nla_schema(object):
+    """Attributes of a family or nested container, with a decoder generated from them.
+
+    Data types are the NLA_* constants of libnl.attr, NLA_NESTED_ARRAY or the signed NLA_S8 to NLA_S64 of this module.
+    NLA_U* integers are decoded as unsigned and NLA_S* ones as signed, strings up to the first null byte and NLA_UNSPEC
+    payloads as bytes. Integer attributes with a payload shorter than their data type are malformed and decode as None. NLA_NESTED and NLA_NESTED_ARRAY attributes without a nested schema are kept as raw bytes too.
+
+    Positional arguments:
+    name -- name of the record class (string).
+    attrs -- (name, data type) or (name, data type, nested schema) tuples, with attribute types as keys (dict).
+
+    Instance variables:
+    name -- name of the record class (string).
+    attrs -- attribute declarations (dict).
+    record -- record class, a namedtuple with the attribute names as fields in ascending attribute type order.
+    types -- attribute type of each field, by name (dict).
+    maxtype -- highest declared attribute type (integer).
+    """
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = dict(attrs)
+        ordered = sorted(self.attrs)
+        self.maxtype = ordered[-1] if ordered else 0
+        self.types = dict((self.attrs[t][0], t) for t in ordered)
+        self.record = collections.namedtuple(name, [self.attrs[t][0] for t in ordered])
+        self._empty = [None] * len(ordered)
+        self._table = [None] * (self.maxtype + 1)
+        for slot, type_ in enumerate(ordered):
+            self._table[type_] = (slot, self._converter(*self.attrs[type_]))
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} name={2} fields={3}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.name, len(self.types),
+        )
+        return answer
+
+    @staticmethod
+    def _converter(_, data_type, nested=None):
+        if data_type in _NLA_STRUCTS:
+            return _integer(_NLA_STRUCTS[data_type])
+        if data_type == NLA_STRING:
+            return _string
+        if data_type == NLA_FLAG:
+            return _flag
+        if data_type == NLA_NESTED and nested is not None:
+            return nested.decode_buffer
+        if data_type == NLA_NESTED_ARRAY and nested is not None:
+            decode = nested.decode_buffer
+            return lambda buf, offset, len_: [decode(buf, o, l) for o, l in _each(buf, offset, len_)]
+        if data_type in (NLA_UNSPEC, NLA_NESTED, NLA_NESTED_ARRAY):
+            return _unspec
+        raise ValueError('unknown attribute data type {0}'.format(data_type))
+
+    def decode_buffer(self, buf, offset, len_):
+        """Decode a stream of attributes stored at `offset` in `buf` into a record.
+
+        Positional arguments:
+        buf -- bytearray holding the attributes.
+        offset -- position of the first attribute in `buf` (integer).
+        len_ -- length of attribute stream (integer).
+
+        Returns:
+        Instance of `record`.
+        """
+        values = list(self._empty)
+        table, size = self._table, self.maxtype
+        unpack_from = _NLA_HDR.unpack_from
+        rem = min(len_, len(buf) - offset)
+        while rem >= NLA_HDRLEN:
+            length, type_ = unpack_from(buf, offset)
+            if length < NLA_HDRLEN or length > rem:
+                break
+            type_ &= NLA_TYPE_MASK
+            if type_ <= size and table[type_] is not None:
+                slot, convert = table[type_]
+                values[slot] = convert(buf, offset + NLA_HDRLEN, length - NLA_HDRLEN)
+            totlen = NLA_ALIGN(length)
+            offset += totlen
+            rem -= totlen
+        return self.record._make(values)
+
+    def decode(self, head, len_):
+        """Decode a stream of attributes into a record.
+
+        Positional arguments:
+        head -- first nlattr with more in its bytearray payload (nlattr class instance).
+        len_ -- length of attribute stream (integer).
+
+        Returns:
+        Instance of `record`.
+        """
+        buf = head.bytearray
+        if isinstance(buf, bytearray_ptr):
+            return self.decode_buffer(buf.pointee, buf.slice.start, len_)
+        return self.decode_buffer(buf, 0, len_)
+
+    def decode_nested(self, nla):
+        """Decode the attributes nested in an attribute into a record.
+
+        Positional arguments:
+        nla -- attribute containing the nested attributes (nlattr class instance).
+
+        Returns:
+        Instance of `record`.
+        """
+        buf = nla.bytearray
+        if isinstance(buf, bytearray_ptr):
+            return self.decode_buffer(buf.pointee, buf.slice.start + NLA_HDRLEN, nla.nla_len - NLA_HDRLEN)
+        return self.decode_buffer(buf, NLA_HDRLEN, nla.nla_len - NLA_HDRLEN)
+
+    def decode_tb(self, tb):
+        """Decode attributes already indexed by nla_parse() or an nla_view into a record.
+
+        Positional arguments:
+        tb -- nlattr class instances (or None), with attribute types as keys (dict or nla_view class instance).
+
+        Returns:
+        Instance of `record`.
+        """
+        values = list(self._empty)
+        for type_, entry in enumerate(self._table):
+            nla = None if entry is None else tb.get(type_)
+            if nla is None:
+                continue
+            buf = nla.bytearray
+            if isinstance(buf, bytearray_ptr):
+                buf, offset = buf.pointee, buf.slice.start
+            else:
+                offset = 0
+            values[entry[0]] = entry[1](buf, offset + NLA_HDRLEN, nla.nla_len - NLA_HDRLEN)
+        return self.record._make(values)
@@ -21,7 +21,8 @@ from libnl.handlers import NL_CB_DEFAULT, nl_cb_alloc, NL_CB_VERBOSE, NL_CB_DEBU
 from libnl.linux_private.netlink import NETLINK_ADD_MEMBERSHIP, NETLINK_DROP_MEMBERSHIP
 from libnl.misc import __init
 from libnl.netlink_private.netlink import BUG
-from libnl.netlink_private.types import nl_sock, NL_OWN_PORT, NL_SOCK_BUFSIZE_SET
+from libnl.netlink_private.types import (nl_sock, NL_OWN_PORT, NL_SOCK_BUFSIZE_SET, NL_MSG_NOCOPY,
+                                         NL_RECV_DRAIN, NL_MSG_RECYCLE)
 
 _LOGGER = logging.getLogger(__name__)
 _PREVIOUS_LOCAL_PORT = None
@@ -296,3 +297,73 @@ def nl_socket_set_buffer_size(sk, rxbuf, txbuf):
 
     sk.s_flags |= NL_SOCK_BUFSIZE_SET
     return 0
+
+
+def nl_socket_enable_msg_nocopy(sk):
+    """Hand received messages to callbacks without copying them out of the receive buffer.
+
+    Messages passed to callbacks by nl_recvmsgs() are then only valid until the callback returns. Callbacks that need to
+    hold on to a message must take their own copy with nlmsg_copy().
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    """
+    sk.s_flags |= NL_MSG_NOCOPY
+
+
+def nl_socket_disable_msg_nocopy(sk):
+    """Copy every received message into its own buffer before handing it to callbacks (the default).
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    """
+    sk.s_flags &= ~NL_MSG_NOCOPY
+
+
+def nl_socket_enable_msg_recycle(sk):
+    """Release received messages to msg_pool with nlmsg_free() once their callbacks returned, like C does.
+
+    Saves allocations when receiving many messages. A released message and its buffer are reset and reused for the next
+    allocation, so callbacks that keep a message, or anything pointing into it (nlmsghdr, nlattr, memoryview or
+    ndarray instances), must take a reference with nlmsg_get() and release it with nlmsg_free() when done.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    """
+    sk.s_flags |= NL_MSG_RECYCLE
+
+
+def nl_socket_disable_msg_recycle(sk):
+    """Leave received messages to the garbage collector once their callbacks returned (the default).
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    """
+    sk.s_flags &= ~NL_MSG_RECYCLE
+
+
+def nl_socket_enable_drain(sk, max_msgs=64, max_bytes=262144):
+    """Let nl_recvmsgs() batch up pending datagrams before dispatching them.
+
+    After each blocking read, further datagrams already queued on the socket are read without blocking until none are
+    left (EAGAIN) or one of the budgets is reached. All of them are then handed to callbacks in a single pass.
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+
+    Keyword arguments:
+    max_msgs -- maximum number of datagrams per batch, 0 for no limit (integer).
+    max_bytes -- stop reading once this many bytes are buffered, 0 for no limit (integer).
+    """
+    sk.s_drain_msgs = max_msgs
+    sk.s_drain_bytes = max_bytes
+    sk.s_flags |= NL_RECV_DRAIN
+
+
+def nl_socket_disable_drain(sk):
+    """Read and dispatch a single datagram at a time in nl_recvmsgs() (the default).
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    """
+    sk.s_flags &= ~NL_RECV_DRAIN
@@ -0,0 +1,117 @@
+"""Precompiled request templates.
+
+Requests that are sent over and over (e.g. NL80211_CMD_GET_STATION per interface, RTM_GETLINK dumps or
+CTRL_CMD_GETFAMILY) only differ in their sequence number, port ID and maybe a few attribute values. nl_msg_template
+serializes such a request once. Every send then restores the serialized bytes into a reused nl_msg and stamps the
+selected attribute values in place with struct.pack_into(). nl_complete_msg() fills in `nlmsg_seq` and `nlmsg_pid` as
+usual, so a stamped template is sent like any other message.
+
+This library is free software; you can redistribute it and/or
+modify it under the terms of the GNU Lesser General Public
+License as published by the Free Software Foundation version 2.1
+of the License.
+"""
+
+import struct
+
+from libnl.linux_private.netlink import NLA_HDRLEN, nlattr, nlmsghdr
+from libnl.misc import bytearray_ptr
+from libnl.msg import NL_AUTO_PORT, NL_AUTO_SEQ, nlmsg_alloc, nlmsg_find_attr, nlmsg_hdr
+from libnl.nl import nl_send_auto
+
+
+class nl_msg_template(object):
+    """A request serialized once and stamped with new values for every send.
+
+    The template is taken from a fully built message. Its sequence number and port ID are cleared so that
+    nl_complete_msg() assigns fresh ones each time.
+
+    Attribute values that change between sends are declared in `fields`, mapping a field name to a tuple of the
+    attribute and its struct format character(s) without byte order (e.g. 'I' for u32, 'H' for u16 or '6s' for a MAC
+    address). The attribute is either a top level attribute type (integer), looked up after `hdrlen` bytes of family
+    header, or an nlattr instance pointing into `msg` (e.g. returned by nla_reserve() or found in a nested attribute).
+    ValueError is raised for an nlattr instance that points elsewhere.
+
+    Positional arguments:
+    msg -- fully built Netlink message (nl_msg class instance).
+
+    Keyword arguments:
+    hdrlen -- length of the family specific header, used to look up attributes by type (integer).
+    fields -- attribute values to stamp per send (dict).
+
+    Instance variables:
+    data -- the serialized request (bytes).
+    protocol -- the protocol of `msg` (integer).
+    msg -- the message reused by stamp() (nl_msg class instance).
+    fields -- payload offset and codec of each field, by name (dict of (integer, struct.Struct) tuples).
+    """
+
+    def __init__(self, msg, hdrlen=0, fields=None):
+        nlh = nlmsg_hdr(msg)
+        buf = nlh.bytearray
+        pointee, base = (buf.pointee, buf.slice.start) if isinstance(buf, bytearray_ptr) else (buf, 0)
+        self.fields = dict()
+        for name, (attr, fmt) in (fields or dict()).items():
+            if not isinstance(attr, nlattr):
+                found = nlmsg_find_attr(nlh, hdrlen, attr)
+                if found is None:
+                    raise KeyError('attribute {0} of field {1!r} not in message'.format(attr, name))
+                attr = found
+            elif not isinstance(attr.bytearray, bytearray_ptr) or attr.bytearray.pointee is not pointee:
+                raise ValueError('attribute of field {0!r} does not point into the message'.format(name))
+            codec = struct.Struct('=' + fmt)
+            if codec.size > attr.nla_len - NLA_HDRLEN:
+                raise ValueError('field {0!r} does not fit its attribute'.format(name))
+            self.fields[name] = (attr.bytearray.slice.start - base + NLA_HDRLEN, codec)
+
+        data = nlmsghdr(bytearray(buf[:nlh.nlmsg_len]))
+        data.nlmsg_seq = NL_AUTO_SEQ
+        data.nlmsg_pid = NL_AUTO_PORT
+        self.data = bytes(data.bytearray)
+        self.protocol = msg.nm_protocol
+        self.msg = nlmsg_alloc(len(self.data))
+
+    def __repr__(self):
+        answer_base = '<{0}.{1} len={2} fields={3}>'
+        answer = answer_base.format(
+            self.__class__.__module__,
+            self.__class__.__name__,
+            len(self.data), sorted(self.fields),
+        )
+        return answer
+
+    def stamp(self, **values):
+        """Restore the serialized request and pack the given field values into it.
+
+        The returned message is reused by the next call, so it must not be kept after it was sent.
+
+        Keyword arguments:
+        values -- new value of each field to change, by name. Fields not given keep their template value.
+
+        Returns:
+        Netlink message ready for nl_send_auto() (nl_msg class instance).
+        """
+        msg = self.msg
+        buf = msg.nm_nlh.bytearray
+        buf[:len(self.data)] = self.data
+        for name, value in values.items():
+            offset, codec = self.fields[name]
+            codec.pack_into(buf, offset, value)
+        msg.nm_protocol = self.protocol
+        return msg
+
+
+def nl_send_template(sk, template, **values):
+    """Stamp a request template and transmit it with nl_send_auto().
+
+    Positional arguments:
+    sk -- Netlink socket (nl_sock class instance).
+    template -- request template (nl_msg_template class instance).
+
+    Keyword arguments:
+    values -- new value of each template field to change, by name.
+
+    Returns:
+    Number of bytes sent on success or a negative error code.
+    """
+    return nl_send_auto(sk, template.stamp(**values))
@@ -24,6 +24,11 @@ def match(expected, log, is_regex=False):
     return True
 
 
+def freed(log):
+    assert match('nlmsg_free: Returned message reference 0x[a-f0-9]+, 0 remaining', log, True)
+    return match('nlmsg_free: msg 0x[a-f0-9]+: Freed', log, True)
+
+
 @pytest.mark.skipif('not os.path.exists("/sys/module/mac80211")')
 def test_ctrl_cmd_getfamily_hex_dump(log):
     """// gcc a.c $(pkg-config --cflags --libs libnl-genl-3.0) && NLDBG=4 ./a.out
@@ -652,6 +657,7 @@ def test_genl_ctrl_resolve(log):
     assert match('print_hdr:     .flags = 5 <REQUEST,ACK>', log)
     assert match('print_hdr:     .seq = \d{10}', log, True)
     assert match('print_hdr:     .port = \d{3,}', log, True)
+    assert freed(log)
     assert match('nl_msg_dump: ---------------------------  END NETLINK MESSAGE   ---------------------------', log)
     assert match('recvmsgs: recvmsgs\(0x[a-f0-9]+\): Increased expected sequence number to \d{10}', log, True)
 
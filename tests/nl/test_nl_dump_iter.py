@@ -0,0 +1,72 @@
+import socket
+
+import pytest
+
+from libnl.errno_ import NLE_NODEV
+from libnl.error import NLError
+from libnl.handlers import NL_CB_CUSTOM, NL_CB_MSG_IN, NL_OK
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_DUMP, NLM_F_REQUEST
+from libnl.linux_private.rtnetlink import RTM_GETLINK, RTM_NEWLINK, ifinfomsg, rtgenmsg
+from libnl.msg import nlmsg_alloc_simple, nlmsg_append, nlmsg_hdr
+from libnl.nl import nl_connect, nl_dump_iter
+from libnl.socket_ import nl_socket_alloc, nl_socket_free, nl_socket_modify_cb
+
+
+def getlink_dump():
+    msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP)
+    rt_hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+    nlmsg_append(msg, rt_hdr, rt_hdr.SIZEOF, 4)
+    return msg
+
+
+def test_dump(ifaces):
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    replies = list(nl_dump_iter(sk, getlink_dump()))
+    assert len(ifaces) == len(replies)
+    assert all(RTM_NEWLINK == nlmsg_hdr(m).nlmsg_type for m in replies)
+
+    # The socket is left ready for the next request.
+    assert len(ifaces) == len(list(nl_dump_iter(sk, getlink_dump())))
+    nl_socket_free(sk)
+
+
+def test_single_and_error(ifacesi):
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST)
+    ifi = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_index=ifacesi[0][0])
+    nlmsg_append(msg, ifi, ifi.SIZEOF, 4)
+    replies = list(nl_dump_iter(sk, msg))
+    assert 1 == len(replies)
+    assert ifacesi[0][0] == ifinfomsg(nlmsg_hdr(replies[0]).bytearray[16:]).ifi_index
+
+    msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST)
+    ifi = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_index=max(i for i, _ in ifacesi) + 1000)
+    nlmsg_append(msg, ifi, ifi.SIZEOF, 4)
+    with pytest.raises(NLError) as exc:
+        next(nl_dump_iter(sk, msg))
+    assert NLE_NODEV == exc.value.error
+    nl_socket_free(sk)
+
+
+def test_lazy_with_socket_callbacks(ifaces):
+    """The request goes out on the first next(), received messages pass through the socket's other callbacks."""
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    seen = list()
+
+    def msg_in(msg, _):
+        seen.append(nlmsg_hdr(msg).nlmsg_type)
+        return NL_OK
+    nl_socket_modify_cb(sk, NL_CB_MSG_IN, NL_CB_CUSTOM, msg_in, None)
+    seq = sk.s_seq_next
+    replies = nl_dump_iter(sk, getlink_dump())
+    assert seq == sk.s_seq_next
+
+    first = next(replies)
+    assert seq + 1 == sk.s_seq_next
+    assert RTM_NEWLINK == nlmsg_hdr(first).nlmsg_type
+    assert len(ifaces) == 1 + len(list(replies))
+    assert [RTM_NEWLINK] * len(ifaces) == seen[:-1]  # Followed by NLMSG_DONE.
+    nl_socket_free(sk)
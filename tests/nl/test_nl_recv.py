@@ -1,7 +1,10 @@
 import binascii
 import re
+import socket
 
-from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_REQUEST, sockaddr_nl
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_DUMP, NLM_F_REQUEST, nlmsghdr, sockaddr_nl
+from libnl.linux_private.rtnetlink import RTM_GETLINK, RTM_NEWLINK, rtgenmsg
+from libnl.netlink_private.types import NL_MSG_PEEK
 from libnl.nl import nl_connect, nl_send_simple, nl_recv
 from libnl.socket_ import nl_socket_alloc, nl_socket_free
 
@@ -57,3 +60,27 @@ def test_nl_recv():
     buf_hex = binascii.hexlify(buf).decode('ascii')
     assert re.match(r'240000000200000000000000....000000000000100000000000050000000000....0000', buf_hex)
     assert 16 == nla.nl_family
+
+
+def test_nl_recv_reuses_buffer():
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    sk.s_bufsize = 32
+    sk.s_flags |= NL_MSG_PEEK
+    rt_hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+    assert 20 == nl_send_simple(sk, RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP, rt_hdr, rt_hdr.SIZEOF)
+
+    nla = sockaddr_nl()
+    n = nl_recv(sk, nla, None)
+    assert 32 < n <= len(sk.s_rxbuf)
+    assert RTM_NEWLINK == nlmsghdr(sk.s_rxbuf).nlmsg_type
+
+    sk.s_flags &= ~NL_MSG_PEEK
+    sk.s_rxbuf = bytearray(65536)
+    rxbuf = sk.s_rxbuf
+    buf = bytearray()
+    while buf[4:6] != bytearray(b'\x03\x00'):  # Read until NLMSG_DONE.
+        del buf[:]
+        assert 0 < nl_recv(sk, nla, buf)
+    assert rxbuf is sk.s_rxbuf
+    nl_socket_free(sk)
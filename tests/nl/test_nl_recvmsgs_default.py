@@ -3,10 +3,15 @@ import socket
 
 import pytest
 
+import libnl.msg
+from libnl.handlers import NL_CB_ACK, NL_CB_CUSTOM, NL_CB_VALID, NL_OK, NL_STOP
 from libnl.linux_private.netlink import NLM_F_REQUEST, NETLINK_ROUTE, NLM_F_DUMP
-from libnl.linux_private.rtnetlink import RTM_GETLINK, rtgenmsg
-from libnl.nl import nl_connect, nl_send_simple, nl_recvmsgs_default
-from libnl.socket_ import nl_socket_alloc, nl_socket_free
+from libnl.linux_private.rtnetlink import RTM_GETLINK, RTM_NEWLINK, ifinfomsg, rtgenmsg
+from libnl.misc import bytearray_ptr
+from libnl.msg import nl_msg_pool, nlmsg_copy, nlmsg_data, nlmsg_get, nlmsg_hdr
+from libnl.nl import nl_connect, nl_send_simple, nl_recvmsgs_default, nl_recvmsgs_report, nl_wait_for_ack
+from libnl.socket_ import (nl_socket_alloc, nl_socket_enable_drain, nl_socket_enable_msg_nocopy,
+                           nl_socket_enable_msg_recycle, nl_socket_free, nl_socket_modify_cb)
 
 
 def match(expected, log, is_regex=False):
@@ -18,6 +23,11 @@ def match(expected, log, is_regex=False):
     return True
 
 
+def freed(log):
+    assert match('nlmsg_free: Returned message reference 0x[a-f0-9]+, 0 remaining', log, True)
+    return match('nlmsg_free: msg 0x[a-f0-9]+: Freed', log, True)
+
+
 @pytest.mark.usefixtures('nlcb_debug')
 def test_error(log):
     """// gcc a.c $(pkg-config --cflags --libs libnl-genl-3.0) && NLDBG=4 NLCB=debug ./a.out
@@ -109,6 +119,7 @@ def test_error(log):
     assert match('print_hdr:     .port = \d{3,}', log, True)
     assert match('nl_msg_dump: ---------------------------  END NETLINK MESSAGE   ---------------------------', log)
     assert match('nl_sendmsg: sent 16 bytes', log)
+    assert freed(log)
     assert not log
 
     assert 0 == nl_recvmsgs_default(sk)
@@ -133,6 +144,7 @@ def test_error(log):
     assert match('print_hdr:     .flags = 5 <REQUEST,ACK>', log)
     assert match('print_hdr:     .seq = \d{10}', log, True)
     assert match('print_hdr:     .port = \d{3,}', log, True)
+    assert freed(log)
     assert match('nl_msg_dump: ---------------------------  END NETLINK MESSAGE   ---------------------------', log)
     assert match('recvmsgs: recvmsgs\(0x[a-f0-9]+\): Increased expected sequence number to \d{4,}', log, True)
     assert match('nl_ack_handler_debug: -- Debug: ACK: type=ERROR length=36 flags=<> sequence-nr=\d{10,} pid=\d{3,}',
@@ -289,6 +301,7 @@ def test_multipart(log, ifaces):
     assert match('dump_hex:     11 00 00 00                                     ....', log)
     assert match('nl_msg_dump: ---------------------------  END NETLINK MESSAGE   ---------------------------', log)
     assert match('nl_sendmsg: sent 20 bytes', log)
+    assert freed(log)
     assert not log
 
     assert 0 == nl_recvmsgs_default(sk)
@@ -394,6 +407,7 @@ def test_multipart_verbose(log, ifaces):
     assert match('nlmsg_reserve: msg 0x[a-f0-9]+: Reserved 4 \(1\) bytes, pad=4, nlmsg_len=20', log, True)
     assert match('nlmsg_append: msg 0x[a-f0-9]+: Appended 1 bytes with padding 4', log, True)
     assert match('nl_sendmsg: sent 20 bytes', log)
+    assert freed(log)
     assert not log
 
     assert 0 == nl_recvmsgs_default(sk)
@@ -418,3 +432,128 @@ def test_multipart_verbose(log, ifaces):
 
     nl_socket_free(sk)
     assert not log
+
+
+def test_multipart_nocopy(ifaces):
+    """Messages handed to callbacks reference the receive buffer, nlmsg_copy() detaches them."""
+    views, copies = list(), list()
+
+    def callback(msg, _):
+        views.append(isinstance(nlmsg_hdr(msg).bytearray, bytearray_ptr))
+        copies.append(nlmsg_copy(msg))
+        return NL_OK
+
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_enable_msg_nocopy(sk)
+    nl_socket_modify_cb(sk, NL_CB_VALID, NL_CB_CUSTOM, callback, None)
+    rt_hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+    assert 20 == nl_send_simple(sk, RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP, rt_hdr, rt_hdr.SIZEOF)
+    assert 0 == nl_recvmsgs_default(sk)
+    nl_socket_free(sk)
+
+    assert [True] * len(ifaces) == views
+    assert len(ifaces) == len(copies)
+    for msg in copies:
+        nlh = nlmsg_hdr(msg)
+        assert isinstance(nlh.bytearray, bytearray)
+        assert RTM_NEWLINK == nlh.nlmsg_type
+        assert nlh.nlmsg_len == len(nlh.bytearray)
+
+
+def test_recycle(ifacesi, monkeypatch):
+    """Received messages are only handed back to the pool if the socket recycles them."""
+    monkeypatch.setattr(libnl.msg, 'msg_pool', nl_msg_pool())
+
+    def dump(recycle, take_ref):
+        kept = list()
+
+        def callback(msg, _):
+            if take_ref:
+                nlmsg_get(msg)
+            kept.append(msg)
+            return NL_OK
+
+        sk = nl_socket_alloc()
+        nl_connect(sk, NETLINK_ROUTE)
+        if recycle:
+            nl_socket_enable_msg_recycle(sk)
+        nl_socket_modify_cb(sk, NL_CB_VALID, NL_CB_CUSTOM, callback, None)
+        rt_hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+        assert 20 == nl_send_simple(sk, RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP, rt_hdr, rt_hdr.SIZEOF)
+        assert 0 == nl_recvmsgs_default(sk)
+        nl_socket_free(sk)
+        return kept
+
+    indexes = [i for i, _ in ifacesi]
+    for recycle, take_ref in ((False, False), (True, True)):
+        kept = dump(recycle, take_ref)
+        assert len(indexes) == len(set(id(m) for m in kept))
+        assert indexes == [ifinfomsg(nlmsg_data(nlmsg_hdr(m))).ifi_index for m in kept]
+
+    kept = dump(True, False)
+    assert len(indexes) == len(kept)
+    assert 1 == len(set(id(m) for m in kept))  # Released and reused for every message.
+    assert 0 == nlmsg_hdr(kept[0]).nlmsg_type
+
+
+def test_drain():
+    """Queued datagrams are read without blocking and dispatched together, up to the message budget."""
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    for _ in range(5):
+        assert 16 == nl_send_simple(sk, 0, NLM_F_REQUEST, None)
+
+    assert 1 == nl_recvmsgs_report(sk, sk.s_cb)
+    nl_socket_enable_drain(sk, max_msgs=3)
+    assert 3 == nl_recvmsgs_report(sk, sk.s_cb)
+    nl_socket_enable_drain(sk, max_msgs=0)
+    assert 1 == nl_recvmsgs_report(sk, sk.s_cb)
+    nl_socket_free(sk)
+
+
+def test_drain_exported():
+    """A receive buffer that is still exported is replaced instead of resized when drained datagrams need more room."""
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_enable_drain(sk)
+    assert 16 == nl_send_simple(sk, 0, NLM_F_REQUEST, None)
+    assert 1 == nl_recvmsgs_report(sk, sk.s_cb)
+
+    view = memoryview(sk.s_rxbuf)  # E.g. nla_get_ndarray() of an NL_MSG_NOCOPY message.
+    for _ in range(3):
+        assert 16 == nl_send_simple(sk, 0, NLM_F_REQUEST, None)
+    assert 3 == nl_recvmsgs_report(sk, sk.s_cb)
+    assert view.obj is not sk.s_rxbuf
+    view.release()
+    nl_socket_free(sk)
+
+
+def test_drain_early_return():
+    """Datagrams drained behind an error reply or an NL_STOP are dispatched by the next call instead of being lost."""
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_enable_drain(sk)
+    msg = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_family=socket.AF_UNSPEC, ifi_index=0x7fffffff)
+    for _ in range(3):
+        assert 32 == nl_send_simple(sk, RTM_GETLINK, NLM_F_REQUEST, msg, msg.SIZEOF)
+    errors = [nl_recvmsgs_report(sk, sk.s_cb)]
+    assert 2 == len(sk.s_rxpending)  # Checked before reading again, which would block if the replies were lost.
+    errors += [nl_recvmsgs_report(sk, sk.s_cb) for _ in range(2)]
+    assert 3 * errors[:1] == errors
+    assert errors[0] < 0
+    assert not sk.s_rxpending
+
+    sources = list()
+    nl_socket_modify_cb(sk, NL_CB_ACK, NL_CB_CUSTOM, lambda m, _: sources.append(m.nm_src.nl_pid) or NL_STOP, None)
+    for _ in range(3):
+        assert 16 == nl_send_simple(sk, 0, NLM_F_REQUEST, None)
+    assert 1 == nl_recvmsgs_report(sk, sk.s_cb)
+    assert 1 == len(sources)
+    assert 2 == len(sk.s_rxpending)
+    assert 1 == nl_recvmsgs_report(sk, sk.s_cb)
+    assert 1 == len(sk.s_rxpending)
+    assert 0 == nl_wait_for_ack(sk)  # The last ACK is already queued, nothing is read from the socket.
+    assert [0, 0] == sources  # Sent by the kernel.
+    assert not sk.s_rxpending
+    nl_socket_free(sk)
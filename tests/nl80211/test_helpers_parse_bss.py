@@ -1,14 +1,33 @@
 from datetime import timedelta
 import base64
 
-from libnl.attr import nla_parse, nla_parse_nested
+from libnl.attr import nla_parse, nla_parse_nested, nla_view
 from libnl.genl.genl import genlmsg_attrdata, genlmsg_attrlen
 from libnl.linux_private.genetlink import genlmsghdr
-from libnl.nl80211.helpers import parse_bss
+from libnl.nl80211.helpers import bss_record, bss_table, parse_bss, parse_bss_record
 from libnl.nl80211.iw_scan import bss_policy
 from libnl.nl80211.nl80211 import NL80211_ATTR_MAX, NL80211_BSS_MAX, NL80211_ATTR_BSS
 
 
+def no_security_bss():
+    """Returns the BSS attributes of the capture in test_no_security() parsed into a dictionary, and a view of the
+    message attributes."""
+    data = bytearray(base64.b64decode(
+        b'IgEAAAgALgCJnxAACAADAAgAAAAMAJkAAQAAAAMAAACgAS8ACgABAAANZyO4RgAADAADAIAxD2CHAQAAowAGAAAJQ2FibGVXaUZpAQiEi5YME'
+        b'hgkMAMBAQUEAAEAAAcGVVNPAQskKgEAMgNIYGwtGi0AA////wAAAAAAAAAAAAAAAAAABAbm5w0APRYBAAEAAAAAAAAAAAAAAAAAAAAAAAAASg'
+        b'4UAAoALAHIABQABQAZAH8GAQAAAgAA3RgAUPICAQEHAAOkAAAnpAAAQkNeAGIyLwDdCQADfwEBAAD/fwAMAA0AgDEPYIcBAACjAAsAAAlDYWJ'
+        b'sZVdpRmkBCISLlgwSGCQwAwEBBQQAAQAABwZVU08BCyQqAQAyA0hgbC0aLQAD////AAAAAAAAAAAAAAAAAAAEBubnDQA9FgEAAQAAAAAAAAAA'
+        b'AAAAAAAAAAAAAABKDhQACgAsAcgAFAAFABkAfwYBAAACAADdGABQ8gIBAQcAA6QAACekAABCQ14AYjIvAN0JAAN/AQEAAP9/AAYABABkAAAAB'
+        b'gAFACEEAAAIAAIAbAkAAAgADAAAAAAACAAKAGwgAAAIAAcAOOb//w=='
+    ))
+    gnlh = genlmsghdr(data)
+    tb = {i: None for i in range(NL80211_ATTR_MAX + 1)}
+    nla_parse(tb, NL80211_ATTR_MAX, genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), None)
+    bss = dict()
+    nla_parse_nested(bss, NL80211_BSS_MAX, tb[NL80211_ATTR_BSS], bss_policy)
+    return bss, nla_view(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), NL80211_ATTR_MAX)
+
+
 def test_no_security():
     """BSS 00:0d:67:23:b8:46(on wlan0)
     TSF: 1680943821184 usec (19d, 10:55:43)
@@ -68,19 +87,7 @@ def test_no_security():
          * VI: CW 7-15, AIFSN 2, TXOP 3008 usec
          * VO: CW 3-7, AIFSN 2, TXOP 1504 usec
     """
-    data = bytearray(base64.b64decode(
-        b'IgEAAAgALgCJnxAACAADAAgAAAAMAJkAAQAAAAMAAACgAS8ACgABAAANZyO4RgAADAADAIAxD2CHAQAAowAGAAAJQ2FibGVXaUZpAQiEi5YME'
-        b'hgkMAMBAQUEAAEAAAcGVVNPAQskKgEAMgNIYGwtGi0AA////wAAAAAAAAAAAAAAAAAABAbm5w0APRYBAAEAAAAAAAAAAAAAAAAAAAAAAAAASg'
-        b'4UAAoALAHIABQABQAZAH8GAQAAAgAA3RgAUPICAQEHAAOkAAAnpAAAQkNeAGIyLwDdCQADfwEBAAD/fwAMAA0AgDEPYIcBAACjAAsAAAlDYWJ'
-        b'sZVdpRmkBCISLlgwSGCQwAwEBBQQAAQAABwZVU08BCyQqAQAyA0hgbC0aLQAD////AAAAAAAAAAAAAAAAAAAEBubnDQA9FgEAAQAAAAAAAAAA'
-        b'AAAAAAAAAAAAAABKDhQACgAsAcgAFAAFABkAfwYBAAACAADdGABQ8gIBAQcAA6QAACekAABCQ14AYjIvAN0JAAN/AQEAAP9/AAYABABkAAAAB'
-        b'gAFACEEAAAIAAIAbAkAAAgADAAAAAAACAAKAGwgAAAIAAcAOOb//w=='
-    ))
-    gnlh = genlmsghdr(data)
-    tb = {i: None for i in range(NL80211_ATTR_MAX + 1)}
-    nla_parse(tb, NL80211_ATTR_MAX, genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0), None)
-    bss = dict()
-    nla_parse_nested(bss, NL80211_BSS_MAX, tb[NL80211_ATTR_BSS], bss_policy)
+    bss = no_security_bss()[0]
     bss_parsed = parse_bss(bss)
     assert '00:0d:67:23:b8:46' == bss_parsed['bssid']
     assert timedelta(microseconds=1680943821184) == bss_parsed['tsf']
@@ -94,3 +101,55 @@ def test_no_security():
     assert 1 == bss_parsed['channel']
     assert ['36.0', '48.0', '54.0'] == sorted(bss_parsed['extended_supported_rates'])
     assert 20 == bss_parsed['channel_width']
+
+
+def test_no_security_view():
+    bss, view = no_security_bss()
+    bss_view = view.nested(NL80211_ATTR_BSS, NL80211_BSS_MAX)
+    assert 0 == bss_view.validate(bss_policy)
+    assert parse_bss(bss) == parse_bss(bss_view)
+
+
+def test_no_security_wanted():
+    bss = no_security_bss()[0]
+    bss_ssid = parse_bss(bss, {0})
+    assert u'CableWiFi' == bss_ssid['ssid']
+    assert {'SSID': u'CableWiFi'} == bss_ssid['information_elements']
+    assert bss_ssid['supported_rates'] is None
+
+
+def test_no_security_record():
+    bss, view = no_security_bss()
+    bss_parsed = parse_bss(bss)
+    record = parse_bss_record(bss)
+    assert 0x000d6723b846 == record.bssid
+    assert (2412, -6600, 1680943821184, 0x0421, b'CableWiFi') == (record.frequency, record.signal_mbm, record.tsf,
+                                                                 record.capability, record.ssid)
+    assert record.status is None and record.status_name is None
+    assert bss_parsed['bssid'] == record.bssid_str
+    assert bss_parsed['signal'] == record.signal
+    assert bss_parsed['capability'] == record.capability_names
+    assert bss_parsed['ssid'] == record.ssid_str
+    assert record == parse_bss_record(view.nested(NL80211_ATTR_BSS, NL80211_BSS_MAX))
+
+
+def test_bss_table():
+    table = bss_table(max_age_ms=10000)
+    first = bss_record(0x000d6723b846, 2412, -6600, None, 0x0421, 1000, 100, 4630, None, b'CableWiFi')
+    second = bss_record(0x000d6723b847, 5180, -7000, None, 0x0011, 2000, 100, 100, None, b'Other')
+    delta = table.merge([first, second], wiphy=0)
+    assert ([first, second], [], []) == delta
+    assert 2 == len(table)
+
+    moved = first._replace(tsf=1500, seen_ms_ago=100)  # Only volatile fields changed.
+    delta = table.merge([moved, second._replace(signal_mbm=-5000)], wiphy=0)
+    assert ([], [(second._replace(signal_mbm=-5000), ('signal_mbm',))], []) == delta
+    assert moved is table.entries[(0, first.bssid)]
+
+    other = table.merge([first], wiphy=1)  # Another radio, same BSS.
+    assert [first] == other.added and 3 == len(table)
+
+    delta = table.merge([moved._replace(seen_ms_ago=20000)], wiphy=0)  # Too old, and `second` not in the dump.
+    assert [] == delta.added + delta.changed
+    assert sorted([moved, second._replace(signal_mbm=-5000)]) == sorted(delta.removed)
+    assert [first] == list(table)
@@ -0,0 +1,79 @@
+import pytest
+
+import libnl.nl80211.iw_scan
+from libnl.misc import bytearray_ptr
+from libnl.nl80211.iw_scan import each_ie, get_ies, ie_cache, ms_oui
+
+
+def test_get_ies():
+    wps = bytearray(b'\x00\x50\xf2\x04' b'\x10\x11\x00\x04test' b'\x10\x4a\x00\x01\x10')
+    ies = bytearray(b'\x00\x04wifi' b'\x03\x01\x06' b'\xc8\x02\xab\xcd' b'\x05\x00') + bytearray([221, len(wps)]) + wps
+    expected = {
+        'SSID': 'wifi',
+        'DS Parameter set': 6,
+        'Unknown IE (200)': 'ab cd',
+        '<invalid: no data>': bytearray(),
+        'WPS': {'Device name': bytearray(b'test'), 'bogus tail data': '74 65 73 74 10 4a 00 01 10'},
+    }
+    assert expected == get_ies(ies)
+    assert isinstance(get_ies(ies)['WPS']['Device name'], bytearray)  # Copied out of the view.
+
+    message = bytearray(b'\xff' * 12) + ies
+    assert expected == get_ies(bytearray_ptr(message, 12))
+    assert {'SSID': 'wi'} == get_ies(bytearray_ptr(message, 12, 12 + 4))  # Truncated element.
+
+
+def test_each_ie():
+    ies = bytearray(b'\xff\xff' b'\x00\x04wifi' b'\x05\x00' b'\x30\x09\x01')  # Last element claims too much.
+    assert [(0, 2, 4), (5, 8, 0)] == list(each_ie(ies, 2, len(ies)))
+    assert [(0, 2, 4)] == list(each_ie(ies, 2, 8))
+
+
+def test_get_ies_wanted():
+    wpa = bytearray(b'\x00\x50\xf2\x01\x01\x00\x00\x50\xf2\x02')
+    wmm = bytearray(b'\x00\x50\xf2\x02\x00\x01\x00')
+    ies = (bytearray(b'\x00\x04wifi' b'\x03\x01\x06' b'\xc8\x02\xab\xcd') + bytearray([221, len(wpa)]) + wpa +
+           bytearray([221, len(wmm)]) + wmm)
+    everything = get_ies(ies)
+    assert 5 == len(everything)
+
+    assert {'SSID': 'wifi'} == get_ies(ies, {0})
+    assert {'DS Parameter set': 6, 'Unknown IE (200)': 'ab cd'} == get_ies(ies, {3, 200})
+    assert {'WPA': everything['WPA']} == get_ies(ies, {(ms_oui, 1)})
+    assert {'WPA': everything['WPA'], 'WMM': everything['WMM']} == get_ies(ies, {221})
+    assert dict() == get_ies(ies, set())
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache_ = ie_cache(max_size=2)
+    monkeypatch.setattr(libnl.nl80211.iw_scan, 'ies_cache', cache_)
+    return cache_
+
+
+def test_ies_cache(cache):
+    wps = bytearray(b'\x00\x50\xf2\x04' b'\x10\x11\x00\x04test')
+    first = bytearray(b'\x00\x04wifi') + bytearray([221, len(wps)]) + wps
+    answers = get_ies(first)
+    assert (0, 1, 1) == (cache.hits, cache.misses, len(cache))
+
+    answers['WPS']['Device name'][:] = b'evil'
+    answers['SSID'] = 'evil'
+    assert get_ies(bytearray(first)) == get_ies(bytearray_ptr(bytearray(b'\0\0') + first, 2))
+    assert 'wifi' == get_ies(first)['SSID']
+    assert bytearray(b'test') == get_ies(first)['WPS']['Device name']
+    assert (4, 1, 1) == (cache.hits, cache.misses, len(cache))
+
+    assert {'SSID': 'wifi'} == get_ies(first, {0})  # Filtered results are cached separately.
+    assert (4, 2, 2) == (cache.hits, cache.misses, len(cache))
+    get_ies(bytearray(b'\x00\x03lan'))
+    assert (2, 1) == (len(cache), cache.evictions)
+    get_ies(first, {0})
+    assert 5 == cache.hits
+    get_ies(first)  # Least recently used, evicted.
+    assert (5, 4, 2) == (cache.hits, cache.misses, cache.evictions)
+
+    cache.clear()
+    cache.max_size = 0
+    get_ies(first)
+    assert (0, 0, 0) == (len(cache), cache.hits, cache.misses)
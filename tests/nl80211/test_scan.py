@@ -0,0 +1,210 @@
+import os
+import socket
+import time
+
+import pytest
+
+import libnl.nl80211.scan
+from libnl.attr import nla_nest_end, nla_nest_start, nla_put, nla_put_u32, nla_view
+from libnl.errno_ import NLE_AGAIN, NLE_BUSY, NLE_INTR
+from libnl.error import NLError
+from libnl.genl.genl import genl_connect, genlmsg_attrdata, genlmsg_attrlen, genlmsg_put
+from libnl.linux_private.genetlink import genlmsghdr
+from libnl.msg import nlmsg_alloc, nlmsg_data, nlmsg_hdr
+from libnl.mux import nl_mux_request
+from libnl.nl80211 import nl80211
+from libnl.nl80211.helpers import bss_record
+from libnl.nl80211.scan import nl80211_scan, nl80211_scan_msg
+from libnl.socket_ import nl_socket_alloc, nl_socket_free
+
+
+def nl80211_msg(cmd, wiphy=0, if_index=3, bssid=None):
+    msg = nlmsg_alloc()
+    genlmsg_put(msg, 0, 0, 28, 0, 0, cmd, 0)
+    nla_put_u32(msg, nl80211.NL80211_ATTR_WIPHY, wiphy)
+    nla_put_u32(msg, nl80211.NL80211_ATTR_IFINDEX, if_index)
+    if bssid is not None:
+        nest = nla_nest_start(msg, nl80211.NL80211_ATTR_BSS)
+        nla_put(msg, nl80211.NL80211_BSS_BSSID, 6, bytearray(bssid))
+        nla_put_u32(msg, nl80211.NL80211_BSS_FREQUENCY, 2412)
+        nla_nest_end(msg, nest)
+    return msg
+
+
+class fake_mux(object):
+    """Stand-in for nl_mux, answering requests from a script instead of the kernel.
+
+    `script` holds one (error, replies, events) or (error, replies, events, batched) tuple per request, in the order
+    they are sent. Answering the request and delivering each event are separate steps, unless `batched` is True in
+    which case the events are delivered in the same step as the answer (like one drained read). A byte written to a
+    socketpair makes the socket readable for select() while steps are queued and each receive() call runs one step.
+    """
+
+    def __init__(self, script):
+        self.sk = nl_socket_alloc()
+        self.sk.socket_instance, self._wakeup = socket.socketpair()
+        self.script = list(script)
+        self.sent = list()
+        self._steps = list()
+        self._listeners = list()
+
+    def close(self):
+        self.sk.socket_instance.close()
+        self._wakeup.close()
+
+    def _step(self, func):
+        self._steps.append(func)
+        self._wakeup.send(b'\0')
+
+    def add_listener(self, func):
+        self._listeners.append(func)
+
+    def send(self, msg, keep_replies=True):
+        self.sent.append(genlmsghdr(nlmsg_data(nlmsg_hdr(msg))).cmd)
+        request = nl_mux_request(len(self.sent), list() if keep_replies else None)
+        error, replies, events, batched = (self.script.pop(0) + (False, ))[:4]
+
+        def emit(event):
+            for func in self._listeners:
+                func(event)
+
+        def answer():
+            if request.replies is not None:
+                request.replies.extend(replies)
+            request.complete(error)
+            for event in events if batched else ():
+                emit(event)
+        self._step(answer)
+        for event in () if batched else events:
+            self._step(lambda e=event: emit(e))
+        return request
+
+    def receive(self):
+        self.sk.socket_instance.recv(1)
+        self._steps.pop(0)()
+        return 1
+
+
+@pytest.fixture
+def mux(request, monkeypatch):
+    """Returns a function creating the fake_mux that nl80211_scan() uses."""
+    muxes = list()
+
+    def create(script):
+        muxes.append(fake_mux(script))
+        return muxes[-1]
+    monkeypatch.setattr(libnl.nl80211.scan, 'nl_mux', lambda _: muxes[-1])
+    monkeypatch.setattr(libnl.nl80211.scan, 'nl_socket_add_membership', lambda *_: 0)
+    monkeypatch.setattr(libnl.nl80211.scan, 'nl_socket_drop_membership', lambda *_: 0)
+
+    def fin():
+        for mux_ in muxes:
+            mux_.close()
+    request.addfinalizer(fin)
+    return create
+
+
+def test_scan_msg():
+    gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(nl80211_scan_msg(28, 3))))
+    assert nl80211.NL80211_CMD_TRIGGER_SCAN == gnlh.cmd
+    attrs = nla_view(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0))
+    assert [nl80211.NL80211_ATTR_IFINDEX, nl80211.NL80211_ATTR_SCAN_SSIDS] == list(attrs)
+    assert 3 == attrs.u32(nl80211.NL80211_ATTR_IFINDEX)
+    assert 0 == attrs.nested(nl80211.NL80211_ATTR_SCAN_SSIDS).len(1)  # Wildcard SSID.
+    assert nl80211.NL80211_ATTR_SCAN_FREQUENCIES not in attrs
+
+    gnlh = genlmsghdr(nlmsg_data(nlmsg_hdr(nl80211_scan_msg(28, 3, freqs=[2412, 5180], ssids=[b'one', b'two']))))
+    attrs = nla_view(genlmsg_attrdata(gnlh, 0), genlmsg_attrlen(gnlh, 0))
+    ssids = attrs.nested(nl80211.NL80211_ATTR_SCAN_SSIDS)
+    assert [b'one', b'two'] == [ssids.data(1), ssids.data(2)]
+    freqs = attrs.nested(nl80211.NL80211_ATTR_SCAN_FREQUENCIES)
+    assert [2412, 5180] == [freqs.u32(1), freqs.u32(2)]
+
+
+@pytest.mark.skipif('not os.path.exists("/sys/class/net/wlan0") or os.getuid() != 0')
+def test_scan(ifacesi):
+    sk = nl_socket_alloc()
+    genl_connect(sk)
+    if_index = dict((n, i) for i, n in ifacesi)['wlan0']
+    results = nl80211_scan(sk, if_index, timeout=30)
+    assert results
+    assert all(isinstance(r, bss_record) for r in results)
+    nl_socket_free(sk)
+
+
+def test_scan_busy(mux):
+    results = [nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS, bssid=b'\x00\x0d\x67\x23\xb8\x46')]
+    fake = mux([
+        (0, [nl80211_msg(nl80211.NL80211_CMD_NEW_INTERFACE, wiphy=1)], []),
+        (-NLE_BUSY, [], [
+            nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS, wiphy=0, if_index=5),  # Another wiphy, ignored.
+            nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS, wiphy=1, if_index=4),  # Same wiphy, other interface.
+        ]),
+        (0, [], [nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS, wiphy=1)]),
+        (0, results, []),
+    ])
+    start = time.time()
+    records = nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, timeout=5, retry_interval=5)
+    assert time.time() - start < 1  # Triggered again on the event, without waiting for retry_interval.
+    assert [nl80211.NL80211_CMD_GET_INTERFACE, nl80211.NL80211_CMD_TRIGGER_SCAN, nl80211.NL80211_CMD_TRIGGER_SCAN,
+            nl80211.NL80211_CMD_GET_SCAN] == fake.sent
+    assert [0x000d6723b846] == [r.bssid for r in records]
+
+
+def test_scan_busy_retry(mux):
+    fake = mux([
+        (-NLE_BUSY, [], []),  # Busy without a scan running, no notification follows.
+        (-NLE_BUSY, [], []),
+        (0, [], [nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS)]),
+        (0, [], []),
+    ])
+    assert [] == nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=5, retry_interval=0.05)
+    assert [nl80211.NL80211_CMD_TRIGGER_SCAN] * 3 + [nl80211.NL80211_CMD_GET_SCAN] == fake.sent
+
+    fake = mux([(-NLE_BUSY, [], [])] * 10)
+    with pytest.raises(NLError) as exc:
+        nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=0.2, retry_interval=0.05)
+    assert NLE_AGAIN == exc.value.error
+    assert 2 <= len(fake.sent) < 10
+
+
+def test_scan_aborted(mux):
+    fake = mux([
+        (0, [], [
+            nl80211_msg(nl80211.NL80211_CMD_SCAN_ABORTED, wiphy=1, if_index=5),  # Another wiphy, ignored.
+            nl80211_msg(nl80211.NL80211_CMD_SCAN_ABORTED),
+        ]),
+    ])
+    with pytest.raises(NLError) as exc:
+        nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=5)
+    assert NLE_INTR == exc.value.error
+    assert [nl80211.NL80211_CMD_TRIGGER_SCAN] == fake.sent
+
+
+def test_scan_ack_with_event(mux):
+    fake = mux([
+        (0, [], [nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS)], True),  # ACK and completion in one read.
+        (0, [], []),
+    ])
+    start = time.time()
+    assert [] == nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=5)
+    assert time.time() - start < 1
+    assert [nl80211.NL80211_CMD_TRIGGER_SCAN, nl80211.NL80211_CMD_GET_SCAN] == fake.sent
+
+    fake = mux([
+        (0, [], [nl80211_msg(nl80211.NL80211_CMD_NEW_SCAN_RESULTS)]),  # Queued before the trigger, a previous scan.
+        (0, [], [nl80211_msg(nl80211.NL80211_CMD_SCAN_ABORTED)]),
+    ])
+    fake.send(nl80211_msg(nl80211.NL80211_CMD_TRIGGER_SCAN))
+    with pytest.raises(NLError) as exc:
+        nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=5)
+    assert NLE_INTR == exc.value.error
+
+
+def test_scan_timeout(mux):
+    fake = mux([(0, [], [])])
+    start = time.time()
+    with pytest.raises(NLError) as exc:
+        nl80211_scan(fake.sk, 3, driver_id=28, mcid=4, wiphy=0, timeout=0.2)
+    assert NLE_AGAIN == exc.value.error
+    assert 0.2 <= time.time() - start < 2
@@ -0,0 +1,92 @@
+import socket
+
+import pytest
+
+from libnl.errno_ import NLE_NODEV
+from libnl.error import NLError
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_DUMP, NLM_F_REQUEST
+from libnl.linux_private.rtnetlink import RTM_GETLINK, RTM_NEWLINK, ifinfomsg, rtgenmsg
+from libnl.msg import nlmsg_alloc_simple, nlmsg_append, nlmsg_hdr
+from libnl.nl import nl_connect
+from libnl.socket_ import nl_socket_alloc, nl_socket_free
+
+asyncio = pytest.importorskip('asyncio')
+nl_async = pytest.importorskip('libnl.asyncio_').nl_async
+
+
+def getlink(index=None):
+    if index is None:
+        msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP)
+        hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+    else:
+        msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST)
+        hdr = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_index=index)
+    nlmsg_append(msg, hdr, hdr.SIZEOF, 4)
+    return msg
+
+
+@pytest.fixture
+def nla(request):
+    loop = asyncio.new_event_loop()
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nla_ = nl_async(sk, loop)
+
+    def fin():
+        nla_.close()
+        nl_socket_free(sk)
+        loop.close()
+    request.addfinalizer(fin)
+    return nla_
+
+
+def test_concurrent_requests(nla, ifacesi):
+    futures = [nla.send_request(getlink(i)) for i, _ in ifacesi]
+    futures.append(nla.send_request(getlink()))
+    nla.loop.run_until_complete(asyncio.wait(futures))
+
+    for (index, _), future in zip(ifacesi, futures):
+        replies = future.result()
+        assert 1 == len(replies)
+        assert index == ifinfomsg(nlmsg_hdr(replies[0]).bytearray[16:]).ifi_index
+    assert len(ifacesi) == len(futures[-1].result())
+
+
+def test_errors(nla, ifacesi):
+    future = nla.wait_for_ack(getlink(max(i for i, _ in ifacesi) + 1000))
+    with pytest.raises(NLError) as exc:
+        nla.loop.run_until_complete(future)
+    assert NLE_NODEV == exc.value.error
+
+
+@pytest.mark.skipif('sys.version_info < (3, 5)')
+def test_dump(nla, ifaces):
+    iterator = nla.dump(getlink())
+    assert iterator is iterator.__aiter__()
+    types = list()
+    while True:
+        try:
+            types.append(nlmsg_hdr(nla.loop.run_until_complete(iterator.__anext__())).nlmsg_type)
+        except StopAsyncIteration:
+            break
+    assert [RTM_NEWLINK] * len(ifaces) == types
+
+
+@pytest.mark.skipif('sys.version_info < (3, 5)')
+def test_dump_cancelled_anext(nla, ifaces):
+    iterator = nla.dump(getlink())
+    first = iterator.__anext__()
+    with pytest.raises(RuntimeError):
+        iterator.__anext__()
+    first.cancel()
+
+    with pytest.raises(asyncio.TimeoutError):  # Times out before the loop reads the socket.
+        nla.loop.run_until_complete(asyncio.wait_for(iterator.__anext__(), 0))
+    nla.loop.run_until_complete(asyncio.sleep(0.1))  # Replies arrive while the cancelled future is still stored.
+    types = list()
+    while True:
+        try:
+            types.append(nlmsg_hdr(nla.loop.run_until_complete(iterator.__anext__())).nlmsg_type)
+        except StopAsyncIteration:
+            break
+    assert [RTM_NEWLINK] * len(ifaces) == types
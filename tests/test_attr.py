@@ -2,11 +2,16 @@ import base64
 import ctypes
 import socket
 import string
+import struct
+
+import pytest
 
 import libnl.attr
+import libnl.errno_
+import libnl.msg
 from libnl.linux_private.netlink import NETLINK_ROUTE
 from libnl.misc import msghdr
-from libnl.msg import nlmsg_alloc, nlmsg_hdr, nlmsg_find_attr, nlmsg_for_each_attr, nlmsg_total_size
+from libnl.msg import nlmsg_alloc, nlmsg_hdr, nlmsg_find_attr, nlmsg_for_each_attr, nlmsg_parse, nlmsg_total_size
 from libnl.msg_ import nlmsg_datalen
 from libnl.nl import nl_sendmsg, nl_connect, nl_complete_msg
 from libnl.socket_ import nl_socket_alloc, nl_socket_free
@@ -367,3 +372,193 @@ def test_nested():
         (9, 2, 666),
     ]
     assert expected == actual
+
+
+def test_message_grows():
+    msg = nlmsg_alloc()
+    assert 128 == msg.nm_size
+    nla = libnl.attr.nla_reserve(msg, 1, 4)
+    nla.nla_type = 1
+    payload = bytes(bytearray(range(256))) * 40
+    assert 0 == libnl.attr.nla_put(msg, 2, len(payload), payload)
+    assert 10240 < msg.nm_size
+    assert len(nlmsg_hdr(msg).bytearray) == msg.nm_size
+    assert 1 == nla.nla_type  # Views created before growing are still valid.
+    attrs = list(nlmsg_for_each_attr(nlmsg_hdr(msg), 0, ctypes.c_int()))
+    assert [1, 2] == [libnl.attr.nla_type(a) for a in attrs]
+    assert payload == bytes(libnl.attr.nla_data(attrs[1])[:len(payload)])
+
+    assert 8192 == nlmsg_alloc(8192).nm_size
+
+
+def test_message_grow_exported():
+    msg = nlmsg_alloc()
+    view = memoryview(nlmsg_hdr(msg).bytearray)
+    assert -libnl.errno_.NLE_NOMEM == libnl.attr.nla_put(msg, 1, 256, bytes(bytearray(256)))
+    assert 128 == msg.nm_size
+    view.release()
+    assert 0 == libnl.attr.nla_put(msg, 1, 256, bytes(bytearray(256)))
+
+
+def test_nest_start_end():
+    expected = nlmsg_alloc()
+    sub = nlmsg_alloc()
+    libnl.attr.nla_put_string(sub, 1, b'Just tell me why!')
+    libnl.attr.nla_put_u32(sub, 2, 42)
+    libnl.attr.nla_put_nested(expected, 5, sub)
+    libnl.attr.nla_put_u16(expected, 9, 666)
+
+    msg = nlmsg_alloc()
+    outer = libnl.attr.nla_nest_start(msg, 5)
+    libnl.attr.nla_put_string(msg, 1, b'Just tell me why!')
+    inner = libnl.attr.nla_nest_start(msg, 2)
+    assert 0 == libnl.attr.nla_nest_end(msg, inner)  # Empty containers are removed.
+    libnl.attr.nla_put_u32(msg, 2, 42)
+    assert 0 == libnl.attr.nla_nest_end(msg, outer)
+    cancelled = libnl.attr.nla_nest_start(msg, 7)
+    libnl.attr.nla_put_u32(msg, 1, 0xdeadbeef)
+    libnl.attr.nla_nest_cancel(msg, cancelled)
+    libnl.attr.nla_put_u16(msg, 9, 666)
+
+    length = nlmsg_hdr(expected).nlmsg_len
+    assert length == nlmsg_hdr(msg).nlmsg_len
+    assert nlmsg_hdr(expected).bytearray[:length] == nlmsg_hdr(msg).bytearray[:length]
+    assert 36 == outer.nla_len
+    assert not any(nlmsg_hdr(msg).bytearray[length:])
+
+
+def test_nla_index():
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u8(msg, 1, 250)
+    libnl.attr.nla_put_u16(msg, 2, 666)
+    libnl.attr.nla_put_u32(msg, 3, 0xdeadbeef)
+    libnl.attr.nla_put_u64(msg, 4, 2 ** 40)
+    libnl.attr.nla_put_string(msg, 5, b'Just tell me why!')
+    libnl.attr.nla_put_flag(msg, 6)
+    libnl.attr.nla_put_u32(msg, 3, 7)  # Duplicate, last one wins.
+    libnl.attr.nla_put_u32(msg, 9, 9)  # Above maxtype.
+    nlh = nlmsg_hdr(msg)
+
+    index = libnl.attr.nla_index(7)
+    assert 0 == nlmsg_parse(nlh, 0, index, 7, None)
+    assert [1, 2, 3, 4, 5, 6] == list(index)
+    assert (250, 666, 7, 2 ** 40) == (index.u8(1), index.u16(2), index.u32(3), index.u64(4))
+    assert b'Just tell me why!' == index.string(5)
+    assert 18 == index.len(5)
+    assert index.flag(6) and not index.flag(7) and 9 not in index
+    assert index.u32(7) is None and -1 == index.u32(7, -1)
+    assert b'\x07\x00\x00\x00' == index.data(3)
+
+    tb = dict((i, None) for i in range(8))
+    assert 0 == nlmsg_parse(nlh, 0, tb, 7, None)
+    assert [1, 2, 3, 4, 5, 6] == [t for t in tb if tb[t]]
+    for type_ in index:
+        assert tb[type_].bytearray.slice == index.nla(type_).bytearray.slice
+    assert 7 == libnl.attr.nla_get_u32(index.nla(3))
+    assert index.nla(7) is None
+
+
+def test_policy_compile():
+    policy = {i: 0 for i in range(5)}
+    policy.update({
+        1: libnl.attr.nla_policy(type_=libnl.attr.NLA_U32),
+        2: libnl.attr.nla_policy(type_=libnl.attr.NLA_STRING, maxlen=8),
+        3: libnl.attr.nla_policy(minlen=6),
+        4: libnl.attr.nla_policy(),
+    })
+    compiled = libnl.attr.nla_policy_compile(policy)
+    assert policy == compiled
+    assert [0, 4, 1, 6, 0] == compiled.minlen
+    assert (1, 2, 3) == compiled.checked
+
+    def parse(*attrs):
+        msg = nlmsg_alloc()
+        for type_, data in attrs:
+            libnl.attr.nla_put(msg, type_, len(data), data)
+        results = list()
+        for pol in (policy, compiled):
+            tb = dict()
+            results.append((nlmsg_parse(nlmsg_hdr(msg), 0, tb, 4, pol), sorted(tb)))
+        assert results[0] == results[1]
+        return results[0][0]
+
+    assert 0 == parse((1, b'\0\0\0\0'), (2, b'abc\0'), (3, b'\0' * 6), (4, b''), (7, b'x'))
+    assert -libnl.attr.NLE_RANGE == parse((1, b'\0\0'))
+    assert -libnl.attr.NLE_RANGE == parse((2, b'abcdefgh\0'))
+    assert -libnl.attr.NLE_INVAL == parse((2, b'abc'))
+    assert -libnl.attr.NLE_RANGE == parse((3, b'\0' * 5))
+
+    # Every attribute is validated, not only the last one of each type.
+    assert -libnl.attr.NLE_RANGE == parse((1, b'\0\0'), (1, b'\0\0\0\0'))
+    assert -libnl.attr.NLE_INVAL == parse((2, b'abc'), (2, b'abc\0'))
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put(msg, 1, 2, b'\0\0')
+    libnl.attr.nla_put_u32(msg, 1, 7)
+    view = libnl.attr.nla_view(libnl.msg.nlmsg_attrdata(nlmsg_hdr(msg), 0), libnl.msg.nlmsg_attrlen(nlmsg_hdr(msg), 0))
+    assert -libnl.attr.NLE_RANGE == view.validate(compiled)
+    assert 7 == view.u32(1)
+
+
+def test_nla_view():
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u32(msg, 1, 0xdeadbeef)
+    outer = libnl.attr.nla_nest_start(msg, 2)
+    for i in range(1, 4):
+        grp = libnl.attr.nla_nest_start(msg, i)
+        libnl.attr.nla_put_u32(msg, 1, i * 10)
+        libnl.attr.nla_put_string(msg, 2, b'group' + str(i).encode('ascii'))
+        libnl.attr.nla_nest_end(msg, grp)
+    libnl.attr.nla_nest_end(msg, outer)
+    libnl.attr.nla_put_u16(msg, 3, 666)
+    nlh = nlmsg_hdr(msg)
+
+    view = libnl.attr.nla_view(libnl.msg.nlmsg_attrdata(nlh, 0), libnl.msg.nlmsg_attrlen(nlh, 0), 3)
+    assert 'indexed=False' in repr(view)
+    assert 0xdeadbeef == view.u32(1)
+    assert 'indexed=True' in repr(view)
+    assert [1, 2, 3] == list(view)
+    assert 666 == libnl.attr.nla_get_u16(view.get(3))
+    assert view.get(4) is None and view.nested(4) is None
+
+    groups = view[2]
+    assert groups is view.nested(2)
+    assert 'indexed=False' in repr(groups)
+    assert [(1, 10, b'group1'), (2, 20, b'group2'), (3, 30, b'group3')] == [
+        (t, g.u32(1), g.string(2)) for t, g in groups.each()]
+    assert b'group2' == groups[2].string(2)
+    assert 0 == groups[2].validate({1: libnl.attr.nla_policy(type_=libnl.attr.NLA_U32)})
+
+    nested = libnl.attr.nla_view_nested(view.get(2), 1)
+    assert [1] == list(nested)
+
+
+def test_array():
+    counters = list(range(1, 24)) + [2 ** 64 - 1]
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put(msg, 1, 8 * len(counters), bytearray(struct.pack('=24Q', *counters)))
+    libnl.attr.nla_put(msg, 2, 14, bytearray(struct.pack('=3i2x', -1, 0, 1000)))
+    nlh = nlmsg_hdr(msg)
+
+    stats = libnl.attr.nla_get_array(nlmsg_find_attr(nlh, 0, 1), 'Q')
+    assert counters == stats.tolist()
+    signed = nlmsg_find_attr(nlh, 0, 2)
+    assert [-1, 0, 1000] == libnl.attr.nla_get_array(signed, 'i').tolist()  # Trailing 2 bytes ignored.
+    assert [0xffff, 0xffff, 0, 0, 1000, 0, 0] == libnl.attr.nla_get_array(signed, 'H').tolist()
+    with pytest.raises(ValueError):
+        libnl.attr.nla_get_array(signed, 'x')
+
+    view = libnl.attr.nla_view(libnl.msg.nlmsg_attrdata(nlh, 0), libnl.msg.nlmsg_attrlen(nlh, 0))
+    assert stats == view.array(1, 'Q')
+    assert view.array(3, 'Q') is None
+
+
+@pytest.mark.skipif('libnl.attr.numpy is None')
+def test_ndarray():
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put(msg, 1, 12, bytearray(struct.pack('=3I', 5, 6, 7)))
+    nlh = nlmsg_hdr(msg)
+
+    counters = libnl.attr.nla_get_ndarray(nlmsg_find_attr(nlh, 0, 1), 'I')
+    assert [5, 6, 7] == counters.tolist()
+    struct.pack_into('=I', nlh.bytearray, 24, 60)  # Shares memory with the message.
+    assert [5, 60, 7] == counters.tolist()
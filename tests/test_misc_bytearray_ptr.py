@@ -246,3 +246,39 @@ def test_oob_negative():
     assert bytearray(b'opqrstu!!!') == bytearray(infant)
     assert bytearray(b'lmnbcopqrstu!!!!!!!!') == bytearray(parent)
     assert bytearray(b'!hijklmnbcopqrstu!!!!!!!!!!!!!') == bytearray(origin)
+
+
+def test_oob_negative_top_level():
+    origin = bytearray(b'abcdefghij')
+    offset = bytearray_ptr(origin, -3, oob=True)
+    assert 3 == len(offset)
+    assert bytearray(b'hij') == offset.copy()
+    assert bytearray(b'hij') == bytearray(offset)
+    assert ord('h') == offset[0]
+    assert ord('j') == offset[-1]
+    assert bytearray(b'ij') == offset[1:]
+
+    offset = bytearray_ptr(origin, -13, oob=True)
+    assert 10 == len(offset)
+    assert origin == offset.copy()
+
+
+def test_indexing_tracks_pointee():
+    origin = bytearray(b'0123456789')
+    ptr = bytearray_ptr(bytearray_ptr(origin, 2), 2, 5)
+    assert 3 == len(ptr)
+    assert ord('4') == ptr[0]
+    assert ord('6') == ptr[-1]
+    assert bytearray(b'45') == ptr[:-1]
+    assert bytearray(b'46') == ptr[::2]
+    assert bytearray() == ptr[2:1]
+    with pytest.raises(IndexError):
+        ptr[3]
+    with pytest.raises(IndexError):
+        ptr[-4]
+
+    origin[4:7] = bytearray(b'abc')
+    assert bytearray(b'abc') == bytearray(ptr)
+    del origin[5:]
+    assert 1 == len(ptr)
+    assert bytearray(b'a') == ptr[:]
@@ -0,0 +1,62 @@
+import pytest
+
+from libnl.linux_private.genetlink import genlmsghdr
+from libnl.linux_private.netlink import nlattr, nlmsgerr, nlmsghdr, sockaddr_nl
+from libnl.linux_private.rtnetlink import ifinfomsg
+from libnl.misc import bytearray_ptr, ucred
+
+
+def test_offsets():
+    assert (slice(0, 4), slice(4, 6), slice(6, 8), slice(8, 12), slice(12, 16)) == nlmsghdr._SLICERS
+    assert slice(8, 12) == nlmsghdr()._get_slicers(3)
+    assert slice(4, 20) == nlmsgerr._SLICERS[1]
+    assert nlmsgerr._FIELDS[1] is None
+
+
+def test_round_trip():
+    nlh = nlmsghdr(nlmsg_len=20, nlmsg_type=18, nlmsg_flags=0x301, nlmsg_seq=1443846038, nlmsg_pid=4294967295)
+    assert bytearray(b'\x14\x00\x00\x00\x12\x00\x01\x03\x96\x57\x0f\x56\xff\xff\xff\xff') == nlh.bytearray
+    assert (20, 18, 0x301, 1443846038, 4294967295) == (
+        nlh.nlmsg_len, nlh.nlmsg_type, nlh.nlmsg_flags, nlh.nlmsg_seq, nlh.nlmsg_pid)
+
+    addr = sockaddr_nl(nl_family=16, nl_pid=1234, nl_groups=5)
+    assert (16, 0, 1234, 5) == (addr.nl_family, addr.nl_pad, addr.nl_pid, addr.nl_groups)
+
+    ghdr = genlmsghdr(cmd=3, version=1)
+    assert bytearray(b'\x03\x01\x00\x00') == ghdr.bytearray
+
+    creds = ucred(pid=1, uid=2, gid=3)
+    assert (1, 2, 3) == (creds.pid, creds.uid, creds.gid)
+
+
+def test_truncation_and_sign():
+    nla = nlattr(bytearray(4), nla_len=65536 + 8, nla_type=-1)
+    assert 8 == nla.nla_len
+    assert 65535 == nla.nla_type
+
+    ifi = ifinfomsg(bytearray(16), ifi_index=-2, ifi_flags=-1)
+    assert -2 == ifi.ifi_index
+    assert 4294967295 == ifi.ifi_flags
+
+    err = nlmsgerr(bytearray(b'\xfe\xff\xff\xff') + nlmsghdr(nlmsg_type=16).bytearray)
+    assert -2 == err.error
+    assert 16 == err.msg.nlmsg_type
+
+
+def test_bytearray_ptr():
+    pointee = bytearray(b'\xaa' * 4) + nlmsghdr(nlmsg_len=16, nlmsg_seq=7).bytearray
+    nlh = nlmsghdr(bytearray_ptr(bytearray_ptr(pointee, 2), 2))
+    assert 16 == nlh.nlmsg_len
+    assert 7 == nlh.nlmsg_seq
+
+    nlh.nlmsg_pid = 0x01020304
+    assert bytearray(b'\x04\x03\x02\x01') == pointee[16:20]
+    assert bytearray(b'\xaa' * 4) == pointee[:4]
+
+    short = nlmsghdr(bytearray_ptr(pointee, 4, 10))  # Truncated header, the pointee continues past its end.
+    assert 16 == short.nlmsg_len
+    with pytest.raises(ValueError):
+        assert short.nlmsg_seq
+    with pytest.raises(ValueError):
+        short.nlmsg_pid = 1
+    assert bytearray(b'\x04\x03\x02\x01') == pointee[16:20]
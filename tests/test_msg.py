@@ -0,0 +1,74 @@
+import pytest
+
+import libnl.msg
+from libnl.linux_private.netlink import NLM_F_DUMP, NLMSG_DONE, nlmsghdr, sockaddr_nl
+from libnl.msg import (nlmsg_alloc, nlmsg_alloc_simple, nlmsg_convert, nlmsg_free, nlmsg_get, nlmsg_hdr,
+                       nlmsg_set_src, nl_msg_pool)
+from libnl.netlink_private.netlink import BUG
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool_ = nl_msg_pool(max_size=2)
+    monkeypatch.setattr(libnl.msg, 'msg_pool', pool_)
+    return pool_
+
+
+def test_pool_recycles(pool):
+    msg = nlmsg_alloc_simple(NLMSG_DONE, NLM_F_DUMP)
+    nlmsg_set_src(msg, sockaddr_nl(nl_family=16, nl_pid=1234))
+    nlmsg_hdr(msg).nlmsg_seq = 99
+    assert (0, 1) == (pool.hits, pool.misses)
+
+    nlmsg_get(msg)
+    nlmsg_free(msg)
+    assert 0 == len(pool)
+    nlmsg_free(msg)
+    assert 1 == len(pool)
+    with pytest.raises(BUG):
+        nlmsg_free(msg)
+
+    recycled = nlmsg_alloc()
+    assert recycled is msg
+    assert (1, 1) == (pool.hits, pool.misses)
+    assert 1 == recycled.nm_refcnt
+    assert -1 == recycled.nm_protocol
+    assert (0, 0) == (recycled.nm_src.nl_family, recycled.nm_src.nl_pid)
+    assert (16, 0, 0, 0) == (nlmsg_hdr(recycled).nlmsg_len, nlmsg_hdr(recycled).nlmsg_type,
+                             nlmsg_hdr(recycled).nlmsg_flags, nlmsg_hdr(recycled).nlmsg_seq)
+
+
+def test_pool_bounded(pool):
+    msgs = [nlmsg_alloc() for _ in range(3)]
+    for msg in msgs:
+        nlmsg_free(msg)
+    assert 2 == len(pool)
+
+    converted = nlmsg_convert(nlmsghdr(nlmsg_len=16, nlmsg_type=NLMSG_DONE, nlmsg_seq=5))
+    assert converted in msgs
+    assert (NLMSG_DONE, 5) == (nlmsg_hdr(converted).nlmsg_type, nlmsg_hdr(converted).nlmsg_seq)
+    assert (1, 3) == (pool.hits, pool.misses)
+
+
+
+def test_pool_exported(pool):
+    msg = nlmsg_alloc(64)
+    nlmsg_hdr(msg).nlmsg_seq = 7
+    view = memoryview(nlmsg_hdr(msg).bytearray)
+    nlmsg_free(msg)
+    assert 1 == len(pool)
+    assert msg.nm_nlh is None  # The exported buffer is not kept, nor zeroed.
+    assert 7 == nlmsghdr(bytearray(view)).nlmsg_seq
+    view.release()
+
+    msg = nlmsg_alloc(64)
+    buf = nlmsg_hdr(msg).bytearray
+    nlmsg_free(msg)
+    view = memoryview(buf)  # Exported after the message was recycled.
+    converted = nlmsg_convert(nlmsghdr(nlmsg_len=16, nlmsg_type=NLMSG_DONE, nlmsg_seq=5))
+    assert converted is msg
+    assert nlmsg_hdr(converted).bytearray is not buf
+    assert (16, NLMSG_DONE, 5) == (len(nlmsg_hdr(converted).bytearray), nlmsg_hdr(converted).nlmsg_type,
+                                   nlmsg_hdr(converted).nlmsg_seq)
+    assert 64 == len(view)
+    view.release()
@@ -0,0 +1,126 @@
+import socket
+
+import pytest
+
+import libnl.mux
+
+from libnl.errno_ import NLE_INVAL, NLE_NODEV
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_DUMP, NLM_F_REQUEST, NLMSG_NOOP
+from libnl.linux_private.rtnetlink import RTM_GETLINK, ifinfomsg, rtgenmsg
+from libnl.misc import ucred
+from libnl.msg import nlmsg_alloc_simple, nlmsg_append, nlmsg_hdr
+from libnl.mux import nl_mux
+from libnl.netlink_private.types import NL_MSG_CRED_PRESENT
+from libnl.nl import nl_connect, nl_send_batch
+from libnl.socket_ import nl_socket_alloc, nl_socket_enable_msg_nocopy, nl_socket_free, nl_socket_set_buffer_size
+
+
+def getlink(index=None):
+    if index is None:
+        msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST | NLM_F_DUMP)
+        hdr = rtgenmsg(rtgen_family=socket.AF_PACKET)
+    else:
+        msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST)
+        hdr = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_index=index)
+    nlmsg_append(msg, hdr, hdr.SIZEOF, 4)
+    return msg
+
+
+def test_pipelined(ifacesi):
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    mux = nl_mux(sk)
+    done = list()
+
+    requests = [mux.send(getlink(i)) for i, _ in ifacesi]
+    bad = mux.send(getlink(max(i for i, _ in ifacesi) + 1000))
+    dump = mux.send(getlink(), keep_replies=False, on_reply=done.append)
+    assert len(ifacesi) + 2 == len(mux.pending)
+    assert len(set(r.seq for r in requests + [bad, dump])) == len(ifacesi) + 2
+    dump.add_done_callback(done.append)
+
+    assert 0 == mux.wait()
+    assert not mux.pending
+    for (index, _), request in zip(ifacesi, requests):
+        assert request.done
+        assert 0 == request.error
+        assert [index] == [ifinfomsg(nlmsg_hdr(m).bytearray[16:]).ifi_index for m in request.replies]
+    assert -NLE_NODEV == bad.error
+    assert dump.replies is None
+    assert len(ifacesi) + 1 == len(done)
+    assert dump is done[-1]
+    nl_socket_free(sk)
+
+
+def test_nocopy(ifacesi, monkeypatch):
+    copies = list()
+    copy = libnl.mux.nlmsg_copy
+    monkeypatch.setattr(libnl.mux, 'nlmsg_copy', lambda m: copies.append(m) or copy(m))
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_enable_msg_nocopy(sk)
+    mux = nl_mux(sk)
+
+    assert 0 == mux.wait([mux.send(getlink(), keep_replies=False)])
+    assert not copies  # Nobody keeps the replies.
+    dump = mux.send(getlink())
+    assert 0 == mux.wait([dump])
+    assert len(ifacesi) == len(copies) == len(dump.replies)
+    assert [i for i, _ in ifacesi] == [ifinfomsg(nlmsg_hdr(m).bytearray[16:]).ifi_index for m in dump.replies]
+    nl_socket_free(sk)
+
+
+def test_send_batch(ifacesi, log):
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_set_buffer_size(sk, 1024 * 1024, 0)  # Room for all replies.
+    mux = nl_mux(sk)
+    msgs = [getlink(ifacesi[i % len(ifacesi)][0]) for i in range(40)]
+    msgs.append(getlink(max(i for i, _ in ifacesi) + 1000))
+
+    del log[:]
+    requests = mux.send_batch(msgs, keep_replies=False)
+    assert 1 == len([l for l in log if l.startswith('nl_send_batch: sent')])
+    assert 0 == mux.wait()
+    assert [0] * 40 + [-NLE_NODEV] == [r.error for r in requests]
+    nl_socket_free(sk)
+
+
+def test_send_batch_split(log):
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    nl_socket_set_buffer_size(sk, 1024 * 1024, 1)  # Kernel minimum send buffer, a few KiB.
+    mux = nl_mux(sk)
+    msgs = [nlmsg_alloc_simple(NLMSG_NOOP, NLM_F_REQUEST) for _ in range(1000)]
+
+    del log[:]
+    requests = mux.send_batch(msgs, keep_replies=False)
+    sends = len([l for l in log if l.startswith('nl_send_batch: sent')])
+    assert 1 < sends < 100
+    assert 0 == mux.wait()
+    assert [0] * 1000 == [r.error for r in requests]
+    nl_socket_free(sk)
+
+
+def test_send_batch_checked_first(log):
+    """Nothing is sent if any message of the batch carries credentials or goes to another peer."""
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    msgs = [nlmsg_alloc_simple(NLMSG_NOOP, NLM_F_REQUEST) for _ in range(3)]
+    del log[:]
+
+    msgs[2].nm_creds = ucred(pid=1)
+    msgs[2].nm_flags |= NL_MSG_CRED_PRESENT
+    with pytest.raises(NotImplementedError):
+        nl_send_batch(sk, msgs)
+    msgs[2].nm_flags &= ~NL_MSG_CRED_PRESENT
+
+    msgs[1].nm_dst.nl_family = socket.AF_NETLINK
+    msgs[1].nm_dst.nl_pid = 0x7fffffff
+    assert -NLE_INVAL == nl_send_batch(sk, msgs)
+    assert not [l for l in log if l.startswith('nl_send_batch: sent')]
+
+    msgs[0].nm_dst.nl_family = msgs[2].nm_dst.nl_family = socket.AF_NETLINK
+    msgs[0].nm_dst.nl_pid = msgs[2].nm_dst.nl_pid = 0x7fffffff
+    assert -NLE_INVAL != nl_send_batch(sk, msgs)  # Same peer for all of them, fails with ECONNREFUSED or similar.
+    nl_socket_free(sk)
@@ -0,0 +1,133 @@
+import libnl.attr
+from libnl.genl.ctrl import ctrl_schema
+from libnl.linux_private.genetlink import (CTRL_ATTR_FAMILY_ID, CTRL_ATTR_FAMILY_NAME, CTRL_ATTR_MCAST_GROUPS,
+                                           CTRL_ATTR_MCAST_GRP_ID, CTRL_ATTR_MCAST_GRP_NAME)
+from libnl.linux_private.if_link import IFLA_ADDRESS, IFLA_IFNAME, IFLA_MTU, IFLA_OPERSTATE
+from libnl.linux_private.rtnetlink import RTM_NEWLINK, ifinfomsg
+from libnl.msg import nlmsg_alloc, nlmsg_alloc_simple, nlmsg_append, nlmsg_attrdata, nlmsg_attrlen, nlmsg_hdr
+from libnl.nl80211 import nl80211
+from libnl.nl80211.helpers import parse_bss
+from libnl.nl80211.schema import bss_schema, sta_info_schema
+from libnl.route.link import link_schema
+from libnl.schema import NLA_S16, NLA_S32, NLA_S64, NLA_S8, nla_schema
+from tests.nl80211.test_helpers_parse_bss import no_security_bss
+
+
+def test_decode():
+    schema = nla_schema('sample', {
+        4: ('name', libnl.attr.NLA_STRING),
+        1: ('number', libnl.attr.NLA_U32),
+        2: ('big', libnl.attr.NLA_U64),
+        3: ('enabled', libnl.attr.NLA_FLAG),
+        5: ('raw', libnl.attr.NLA_UNSPEC),
+        6: ('inner', libnl.attr.NLA_NESTED, nla_schema('inner', {1: ('value', libnl.attr.NLA_U16)})),
+    })
+    assert ('number', 'big', 'enabled', 'name', 'raw', 'inner') == schema.record._fields
+    assert 6 == schema.maxtype
+
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u32(msg, 1, 0xdeadbeef)
+    libnl.attr.nla_put_string(msg, 4, b'wlan0')
+    libnl.attr.nla_put_u8(msg, 9, 1)  # Not in the schema, skipped.
+    libnl.attr.nla_put(msg, 5, 3, b'\x01\x02\x03')
+    nest = libnl.attr.nla_nest_start(msg, 6)
+    libnl.attr.nla_put_u16(msg, 1, 443)
+    libnl.attr.nla_nest_end(msg, nest)
+    nlh = nlmsg_hdr(msg)
+
+    record = schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+    assert 0xdeadbeef == record.number
+    assert record.big is None and record.enabled is None
+    assert b'wlan0' == record.name
+    assert b'\x01\x02\x03' == record.raw
+    assert 443 == record.inner.value
+
+    tb = dict((i, None) for i in range(10))
+    assert 0 == libnl.attr.nla_parse(tb, 9, nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0), None)
+    assert record == schema.decode_tb(tb)
+    assert record.inner == schema.attrs[6][2].decode_nested(tb[6])
+
+
+def test_short_integer():
+    schema = nla_schema('sample', {1: ('number', libnl.attr.NLA_U32), 2: ('small', libnl.attr.NLA_U16)})
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put(msg, 1, 2, b'\x01\x00')  # Malformed, followed by another attribute.
+    libnl.attr.nla_put_u16(msg, 2, 7)
+    libnl.attr.nla_put(msg, 1, 0, b'')  # Malformed, at the end of the buffer.
+    nlh = nlmsg_hdr(msg)
+    assert (None, 7) == schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put(msg, 2, 1, b'\x01')
+    nlh = nlmsg_hdr(msg)
+    assert (None, None) == schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+
+
+def test_nested_array():
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u16(msg, CTRL_ATTR_FAMILY_ID, 28)
+    libnl.attr.nla_put_string(msg, CTRL_ATTR_FAMILY_NAME, b'nl80211')
+    groups = libnl.attr.nla_nest_start(msg, CTRL_ATTR_MCAST_GROUPS)
+    for i, name in enumerate((b'config', b'scan', b'regulatory'), 1):
+        grp = libnl.attr.nla_nest_start(msg, i)
+        libnl.attr.nla_put_u32(msg, CTRL_ATTR_MCAST_GRP_ID, i + 2)
+        libnl.attr.nla_put_string(msg, CTRL_ATTR_MCAST_GRP_NAME, name)
+        libnl.attr.nla_nest_end(msg, grp)
+    libnl.attr.nla_nest_end(msg, groups)
+    nlh = nlmsg_hdr(msg)
+
+    record = ctrl_schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+    assert 28 == record.family_id
+    assert b'nl80211' == record.family_name
+    assert record.ops is None
+    assert [(b'config', 3), (b'scan', 4), (b'regulatory', 5)] == [(g.name, g.id) for g in record.mcast_groups]
+
+
+def test_signed():
+    schema = nla_schema('signed', {
+        1: ('s8', NLA_S8),
+        2: ('s16', NLA_S16),
+        3: ('s32', NLA_S32),
+        4: ('s64', NLA_S64),
+        5: ('u32', libnl.attr.NLA_U32),
+    })
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u8(msg, 1, 0xc4)
+    libnl.attr.nla_put_u16(msg, 2, 0x8000)
+    libnl.attr.nla_put_u32(msg, 3, 0xffffe638)
+    libnl.attr.nla_put_u64(msg, 4, 0xffffffffffffffff)
+    libnl.attr.nla_put_u32(msg, 5, 0xffffe638)
+    nlh = nlmsg_hdr(msg)
+
+    record = schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+    assert (-60, -32768, -6600, -1, 0xffffe638) == record
+
+    msg = nlmsg_alloc()
+    libnl.attr.nla_put_u8(msg, nl80211.NL80211_STA_INFO_SIGNAL, 0xc4)
+    libnl.attr.nla_put_u8(msg, nl80211.NL80211_STA_INFO_SIGNAL_AVG, 0x7f)
+    nlh = nlmsg_hdr(msg)
+    record = sta_info_schema.decode(nlmsg_attrdata(nlh, 0), nlmsg_attrlen(nlh, 0))
+    assert (-60, 127) == (record.signal, record.signal_avg)
+
+
+def test_link():
+    msg = nlmsg_alloc_simple(RTM_NEWLINK, 0)
+    ifi = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_index=2)
+    nlmsg_append(msg, ifi, ifi.SIZEOF, 4)
+    libnl.attr.nla_put_string(msg, IFLA_IFNAME, b'eth0')
+    libnl.attr.nla_put_u32(msg, IFLA_MTU, 1500)
+    libnl.attr.nla_put(msg, IFLA_ADDRESS, 6, b'\x02\x00\x00\x00\x00\x01')
+    libnl.attr.nla_put_u8(msg, IFLA_OPERSTATE, 6)
+    nlh = nlmsg_hdr(msg)
+
+    record = link_schema.decode(nlmsg_attrdata(nlh, ifi.SIZEOF), nlmsg_attrlen(nlh, ifi.SIZEOF))
+    assert b'eth0' == record.ifname
+    assert 1500 == record.mtu
+    assert b'\x02\x00\x00\x00\x00\x01' == record.address
+    assert 6 == record.operstate
+    assert record.qdisc is None and record.stats is None
+
+
+def test_bss():
+    bss, view = no_security_bss()
+    assert parse_bss(bss) == parse_bss(bss_schema.decode_nested(view.get(nl80211.NL80211_ATTR_BSS)))
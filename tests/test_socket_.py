@@ -20,6 +20,11 @@ def match(expected, log, is_regex=False):
     return True
 
 
+def freed(log):
+    assert match('nlmsg_free: Returned message reference 0x[a-f0-9]+, 0 remaining', log, True)
+    return match('nlmsg_free: msg 0x[a-f0-9]+: Freed', log, True)
+
+
 def test_nl_socket_alloc():
     """// gcc a.c $(pkg-config --cflags --libs libnl-genl-3.0) && ./a.out
     #include <netlink/msg.h>
@@ -231,6 +236,7 @@ def test_nl_socket_modify_cb(log, ifaces):
     assert match('nlmsg_reserve: msg 0x[a-f0-9]+: Reserved 4 \(1\) bytes, pad=4, nlmsg_len=20', log, True)
     assert match('nlmsg_append: msg 0x[a-f0-9]+: Appended 1 bytes with padding 4', log, True)
     assert match('nl_sendmsg: sent 20 bytes', log)
+    assert freed(log)
     assert not log
 
     assert 0 == nl_socket_modify_cb(sk, NL_CB_VALID, NL_CB_CUSTOM, callback, 95)
@@ -340,6 +346,7 @@ def test_nl_socket_modify_cb_error_verbose(log):
     assert match('nlmsg_reserve: msg 0x[a-f0-9]+: Reserved 4 \(1\) bytes, pad=4, nlmsg_len=20', log, True)
     assert match('nlmsg_append: msg 0x[a-f0-9]+: Appended 1 bytes with padding 4', log, True)
     assert match('nl_sendmsg: sent 20 bytes', log)
+    assert freed(log)
     assert not log
 
     assert 0 == nl_socket_modify_err_cb(sk, NL_CB_CUSTOM, callback, got_something)
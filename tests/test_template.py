@@ -0,0 +1,65 @@
+import socket
+
+import pytest
+
+from libnl.attr import nla_get_u32, nla_put_string, nla_put_u32, nla_reserve
+from libnl.linux_private.if_link import IFLA_EXT_MASK, IFLA_IFNAME
+from libnl.linux_private.netlink import NETLINK_ROUTE, NLM_F_ACK, NLM_F_REQUEST, nlattr
+from libnl.linux_private.rtnetlink import RTM_GETLINK, ifinfomsg
+from libnl.msg import nlmsg_alloc_simple, nlmsg_append, nlmsg_find_attr, nlmsg_hdr
+from libnl.nl import nl_connect, nl_wait_for_ack
+from libnl.socket_ import nl_socket_alloc, nl_socket_free
+from libnl.template import nl_msg_template, nl_send_template
+
+
+def getlink(name, ext_mask):
+    msg = nlmsg_alloc_simple(RTM_GETLINK, NLM_F_REQUEST)
+    hdr = ifinfomsg(bytearray(ifinfomsg.SIZEOF), ifi_family=socket.AF_UNSPEC)
+    nlmsg_append(msg, hdr, hdr.SIZEOF, 4)
+    nla_put_u32(msg, IFLA_EXT_MASK, ext_mask)
+    nla_put_string(msg, IFLA_IFNAME, name)
+    return msg
+
+
+def test_stamp():
+    template = nl_msg_template(getlink(b'lo', 0), ifinfomsg.SIZEOF, dict(ext_mask=(IFLA_EXT_MASK, 'I')))
+    expected = getlink(b'lo', 9)
+    length = nlmsg_hdr(expected).nlmsg_len
+    assert length == len(template.data)
+
+    msg = template.stamp(ext_mask=9)
+    assert nlmsg_hdr(expected).bytearray[:length] == nlmsg_hdr(msg).bytearray[:length]
+    assert 9 == nla_get_u32(nlmsg_find_attr(nlmsg_hdr(msg), ifinfomsg.SIZEOF, IFLA_EXT_MASK))
+
+    nlmsg_hdr(msg).nlmsg_seq = 5
+    assert msg is template.stamp()
+    assert 0 == nlmsg_hdr(msg).nlmsg_seq
+    assert 0 == nla_get_u32(nlmsg_find_attr(nlmsg_hdr(msg), ifinfomsg.SIZEOF, IFLA_EXT_MASK))
+
+
+def test_foreign_attribute():
+    msg = getlink(b'lo', 0)
+    with pytest.raises(ValueError):
+        nl_msg_template(msg, fields=dict(ext_mask=(nla_reserve(getlink(b'lo', 0), IFLA_EXT_MASK, 4), 'I')))
+    with pytest.raises(ValueError):
+        nl_msg_template(msg, fields=dict(ext_mask=(nlattr(bytearray(8), nla_len=8, nla_type=IFLA_EXT_MASK), 'I')))
+
+    attr = nla_reserve(msg, IFLA_EXT_MASK, 4)
+    template = nl_msg_template(msg, fields=dict(ext_mask=(attr, 'I')))
+    assert 9 == nla_get_u32(nlattr(nlmsg_hdr(template.stamp(ext_mask=9)).bytearray[attr.bytearray.slice.start:]))
+
+
+def test_send_template():
+    sk = nl_socket_alloc()
+    nl_connect(sk, NETLINK_ROUTE)
+    template = nl_msg_template(getlink(b'lo', 0), ifinfomsg.SIZEOF, dict(ext_mask=(IFLA_EXT_MASK, 'I')))
+
+    seqs = list()
+    for ext_mask in (0, 1, 0):
+        assert 0 < nl_send_template(sk, template, ext_mask=ext_mask)
+        nlh = nlmsg_hdr(template.msg)
+        assert NLM_F_REQUEST | NLM_F_ACK == nlh.nlmsg_flags & (NLM_F_REQUEST | NLM_F_ACK)
+        seqs.append(nlh.nlmsg_seq)
+        assert 0 == nl_wait_for_ack(sk)
+    assert len(set(seqs)) == 3
+    nl_socket_free(sk)